@@ -0,0 +1,296 @@
+"""Cross-user planner and badge rollups for the admin analytics page.
+
+Rollups keeps one small summary per user (tasks created and completed per
+day, badges earned, last active day) together with the storage version it
+was built from. refresh() asks the backend for every user's version in one
+pass (store.user_versions(): a directory scan for CSV, a read of the
+trigger-maintained user_changes table for SQLite). It rescans only the users
+whose version changed, on a process pool when there are many. Their old
+summaries are subtracted from the running totals and the new ones added, so
+a refresh costs time in proportion to the changed users, not all of them.
+
+The scan runs outside the lock that guards the totals, so the views stay
+readable while it runs. refresh_async(max_age) starts a refresh on a
+background thread when the last one is older than max_age; the admin page
+calls it and shows the totals from the last finished refresh.
+
+Summaries are pickled to cache_path after each refresh that changed
+something, so a restart does not need a cold scan. The pickle is loaded on
+a background thread; refreshes wait for it.
+
+    python analytics.py bench --users 100000   # cold scan vs incremental refresh
+"""
+
+import argparse
+import logging
+import os
+import pickle
+import random
+import shutil
+import tempfile
+import threading
+import time
+from collections import Counter
+from datetime import date, datetime, timedelta
+
+import pools
+
+logger = logging.getLogger(__name__)
+
+_COUNTERS = ("created_by_day", "completed_by_day", "badges", "last_active")
+
+
+def _days(timestamps):
+    # ISO timestamps -> "YYYY-MM-DD"; missing or malformed values become None.
+    return [t[:10] if isinstance(t, str) and len(t) >= 10 else None for t in timestamps.tolist()]
+
+
+def summarize_user(store, username):
+    """Summary of one user's planner and badge history."""
+    tasks = store.load_tasks(username, cached=False)
+    badges = store.load_badges(username, cached=False)
+    created_days = _days(tasks['timestamp'])
+    updated_days = _days(tasks['last_updated'])
+    completed = [done == True for done in tasks['completed'].tolist()]
+    active = max(filter(None, updated_days + _days(badges['date'])), default=None)
+    return {
+        "tasks": len(tasks),
+        "completed": sum(completed),
+        "created_by_day": dict(Counter(filter(None, created_days))),
+        "completed_by_day": dict(Counter(day for day, done in zip(updated_days, completed) if day and done)),
+        "badges": dict(Counter(badges['badge'].tolist())),
+        "last_active": {active: 1} if active else {},
+    }
+
+
+def _summarize_batch(store, batch):
+    # Module-level so it can be shipped to process-pool workers.
+    results = []
+    for username, version in batch:
+        try:
+            summary = summarize_user(store, username)
+        except Exception:
+            logger.exception("Analytics scan failed for %s", username)
+            continue
+        summary["version"] = version
+        results.append((username, summary))
+    return results
+
+
+class Rollups:
+    """Incrementally maintained totals over every user's planner and badges."""
+
+    def __init__(self, store, cache_path=None, workers=None, batch_size=1000):
+        self.store = store
+        self.cache_path = cache_path
+        self.workers = workers
+        self.batch_size = batch_size
+        self.summaries = {}
+        self.totals = self._empty_totals()
+        self.last_refresh = None
+        self._lock = threading.Lock()  # guards summaries and totals
+        self._refresh_lock = threading.Lock()  # one refresh at a time
+        self._loaded = threading.Event()
+        threading.Thread(target=self._load, name="analytics-load", daemon=True).start()
+
+    @staticmethod
+    def _empty_totals():
+        return {"users": 0, "tasks": 0, "completed": 0, **{name: Counter() for name in _COUNTERS}}
+
+    def _apply(self, summary, sign):
+        self.totals["users"] += sign
+        self.totals["tasks"] += sign * summary["tasks"]
+        self.totals["completed"] += sign * summary["completed"]
+        for name in _COUNTERS:
+            counter = self.totals[name]
+            for key, n in summary[name].items():
+                counter[key] += sign * n
+                if not counter[key]:
+                    del counter[key]
+
+    def _load(self):
+        try:
+            if not self.cache_path or not os.path.exists(self.cache_path):
+                return
+            try:
+                with open(self.cache_path, "rb") as f:
+                    summaries = pickle.load(f)
+            except (OSError, pickle.UnpicklingError, EOFError):
+                logger.warning("Ignoring unreadable analytics cache %s", self.cache_path)
+                return
+            with self._lock:
+                self.summaries = summaries
+                for summary in summaries.values():
+                    self._apply(summary, +1)
+        finally:
+            self._loaded.set()
+
+    def _save(self):
+        tmp = f"{self.cache_path}.tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump(self.summaries, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, self.cache_path)
+
+    def refresh(self, executor="process"):
+        """Rescan users whose data changed; returns counts and elapsed seconds.
+
+        Fewer than batch_size changed users are scanned in-process, since
+        starting a pool would cost more than it saves.
+        """
+        self._loaded.wait()
+        with self._refresh_lock:
+            return self._refresh(executor)
+
+    def _refresh(self, executor):
+        # Called with _refresh_lock held.
+        start = time.perf_counter()
+        versions = self.store.user_versions()
+        with self._lock:
+            known = {u: summary["version"] for u, summary in self.summaries.items()}
+        stale = [(u, v) for u, v in versions.items() if known.get(u) != v]
+        removed = [u for u in known if u not in versions]
+
+        if len(stale) < self.batch_size or executor == "inline":
+            results = _summarize_batch(self.store, stale)
+        else:
+            batches = [stale[i:i + self.batch_size] for i in range(0, len(stale), self.batch_size)]
+            with pools.executor("process", self.workers) as pool:
+                results = [r for batch in pool.map(_summarize_batch, [self.store] * len(batches), batches)
+                           for r in batch]
+
+        with self._lock:
+            for username in removed:
+                self._apply(self.summaries.pop(username), -1)
+            for username, summary in results:
+                old = self.summaries.get(username)
+                if old is not None:
+                    self._apply(old, -1)
+                self._apply(summary, +1)
+                self.summaries[username] = summary
+        if self.cache_path and (results or removed):
+            self._save()  # only refreshes change summaries, and this one holds _refresh_lock
+        self.last_refresh = {
+            "users": len(versions),
+            "rescanned": len(stale),
+            "removed": len(removed),
+            "seconds": round(time.perf_counter() - start, 3),
+            "finished": time.time(),
+        }
+        return self.last_refresh
+
+    def refresh_async(self, max_age):
+        """Start a background refresh if the last one finished over max_age seconds ago.
+
+        Returns True if a refresh was started; does nothing while one is
+        already running.
+        """
+        last = self.last_refresh
+        if last is not None and time.time() - last["finished"] < max_age:
+            return False
+        if not self._refresh_lock.acquire(blocking=False):
+            return False
+        threading.Thread(target=self._refresh_in_background, name="analytics-refresh", daemon=True).start()
+        return True
+
+    @property
+    def refreshing(self):
+        return self._refresh_lock.locked()
+
+    def _refresh_in_background(self):
+        # Runs with _refresh_lock already taken by refresh_async.
+        try:
+            self._loaded.wait()
+            self._refresh("process")
+        except Exception:
+            logger.exception("Analytics refresh failed")
+        finally:
+            self._refresh_lock.release()
+
+    # Views over the totals
+    def daily_completion(self, days=30, today=None):
+        """[(day, created, completed, rate)] for the last `days` days."""
+        today = today or date.today()
+        rows = []
+        with self._lock:
+            for offset in range(days - 1, -1, -1):
+                day = (today - timedelta(days=offset)).isoformat()
+                created = self.totals["created_by_day"].get(day, 0)
+                done = self.totals["completed_by_day"].get(day, 0)
+                rows.append((day, created, done, round(done / created, 3) if created else 0.0))
+        return rows
+
+    def active_users(self, days, today=None):
+        """Users whose last planner or badge activity was within `days` days."""
+        cutoff = ((today or date.today()) - timedelta(days=days - 1)).isoformat()
+        with self._lock:
+            return sum(n for day, n in self.totals["last_active"].items() if day >= cutoff)
+
+    def badge_distribution(self):
+        with self._lock:
+            return dict(self.totals["badges"].most_common())
+
+    def counts(self):
+        """(users, tasks, completed) as of the last finished refresh."""
+        with self._lock:
+            return self.totals["users"], self.totals["tasks"], self.totals["completed"]
+
+
+# ---------- Benchmark ----------
+def write_synthetic_users(root, users, tasks=10, seed=0):
+    """Write planner and badge CSVs for `users` synthetic users into root."""
+    rng = random.Random(seed)
+    today = datetime.now()
+    badge_names = ["🏅 Week 1 Champ", "🏆 Month Champ", "🔥 Week Streak"]
+    for i in range(users):
+        lines = ["task,completed,timestamp,last_updated"]
+        for j in range(tasks):
+            when = (today - timedelta(days=rng.randint(0, 40), minutes=rng.randint(0, 1440))).isoformat()
+            lines.append(f"Task {j},{rng.random() < 0.4},{when},{when}")
+        with open(os.path.join(root, f"planner_user{i}.csv"), "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+        if rng.random() < 0.3:
+            with open(os.path.join(root, f"badges_user{i}.csv"), "w", encoding="utf-8") as f:
+                f.write(f"badge,date\n{rng.choice(badge_names)},{today.isoformat()}\n")
+
+
+def bench(users=100_000, changed=0.01, workers=None, seed=0):
+    from storage import CSVStorage
+
+    root = tempfile.mkdtemp(prefix="health_calc_analytics_")
+    try:
+        start = time.perf_counter()
+        write_synthetic_users(root, users, seed=seed)
+        results = {"users": users, "write fixtures (s)": round(time.perf_counter() - start, 1)}
+
+        rollups = Rollups(CSVStorage(root), workers=workers)
+        results["cold scan (s)"] = rollups.refresh()["seconds"]
+        results["no-op refresh (s)"] = rollups.refresh()["seconds"]
+
+        rng = random.Random(seed + 1)
+        touched = rng.sample(range(users), max(1, int(users * changed)))
+        for i in touched:
+            with open(os.path.join(root, f"planner_user{i}.csv"), "a", encoding="utf-8") as f:
+                f.write(f"Extra,True,{datetime.now().isoformat()},{datetime.now().isoformat()}\n")
+        refresh = rollups.refresh()
+        results[f"incremental refresh, {refresh['rescanned']} changed (s)"] = refresh["seconds"]
+        results["active users (7 days)"] = rollups.active_users(7)
+        return results
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Admin analytics tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+    bench_p = sub.add_parser("bench", help="compare a cold full scan with an incremental refresh")
+    bench_p.add_argument("--users", type=int, default=100_000)
+    bench_p.add_argument("--changed", type=float, default=0.01, help="fraction of users modified")
+    bench_p.add_argument("--workers", type=int)
+    args = parser.parse_args(argv)
+
+    for key, value in bench(args.users, args.changed, args.workers).items():
+        print(f"{key}: {value}")
+
+
+if __name__ == "__main__":
+    main()
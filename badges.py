@@ -0,0 +1,200 @@
+"""Incremental badge engine for the Wellness Planner.
+
+Each user has a small counters dict (completions in the current ISO week and
+month, the current daily streak and a lifetime total) that is updated in
+constant time whenever a task is completed. Badge rules are declared in
+BADGE_RULES and indexed by (counter, threshold), so a completion only looks
+up the rules whose threshold it has just reached; adding tiers costs nothing
+at evaluation time.
+
+Week and month counters restart with each new window, so those badges can be
+earned again every week or month.
+
+    python badges.py bench --events 100000   # per-event cost as history grows
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import NamedTuple
+
+
+class BadgeRule(NamedTuple):
+    badge: str
+    counter: str  # "week", "month", "streak" or "total"
+    threshold: int
+    description: str
+
+
+BADGE_RULES = [
+    BadgeRule("🏅 Week 1 Champ", "week", 5, "Complete 5 tasks in one week"),
+    BadgeRule("🏆 Month Champ", "month", 20, "Complete 20 tasks in one month"),
+    BadgeRule("🔥 Week Streak", "streak", 7, "Complete a task 7 days in a row"),
+]
+
+
+def _index_rules(rules):
+    index = defaultdict(list)
+    for rule in rules:
+        index[(rule.counter, rule.threshold)].append(rule)
+    return dict(index)
+
+
+_RULES_AT = _index_rules(BADGE_RULES)
+
+
+def week_key(day):
+    year, week, _ = day.isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+def month_key(day):
+    return f"{day.year}-{day.month:02d}"
+
+
+def new_counters():
+    return {
+        "week": None, "week_count": 0,
+        "month": None, "month_count": 0,
+        "streak": 0, "last_day": None,
+        "total": 0,
+    }
+
+
+def record_completion(counters, when, rules_at=_RULES_AT):
+    """Apply one completion at datetime `when`; returns the badges it unlocks.
+
+    counters is updated in place.
+    """
+    day = when.date()
+    week, month = week_key(day), month_key(day)
+    if counters["week"] != week:
+        counters["week"], counters["week_count"] = week, 0
+    if counters["month"] != month:
+        counters["month"], counters["month_count"] = month, 0
+
+    updated = {}
+    last_day = counters["last_day"]
+    if last_day != day.isoformat():
+        yesterday = (day - timedelta(days=1)).isoformat()
+        counters["streak"] = counters["streak"] + 1 if last_day == yesterday else 1
+        counters["last_day"] = day.isoformat()
+        updated["streak"] = counters["streak"]
+
+    counters["week_count"] += 1
+    counters["month_count"] += 1
+    counters["total"] += 1
+    updated["week"] = counters["week_count"]
+    updated["month"] = counters["month_count"]
+    updated["total"] = counters["total"]
+
+    unlocked = []
+    for counter, value in updated.items():
+        unlocked.extend(rule.badge for rule in rules_at.get((counter, value), ()))
+    return unlocked
+
+
+def current_counts(counters, today):
+    """Counter values as of `today`, treating windows that have ended as zero."""
+    yesterday = (today - timedelta(days=1)).isoformat()
+    return {
+        "week": counters["week_count"] if counters["week"] == week_key(today) else 0,
+        "month": counters["month_count"] if counters["month"] == month_key(today) else 0,
+        "streak": counters["streak"] if counters["last_day"] in (today.isoformat(), yesterday) else 0,
+        "total": counters["total"],
+    }
+
+
+# ---------- Benchmark ----------
+def _completion_times(events, seed):
+    """Completion datetimes a few per day, with gaps, so every window rolls over."""
+    rng = random.Random(seed)
+    when = datetime(2020, 1, 1, 8)
+    times = []
+    for _ in range(events):
+        when += timedelta(minutes=rng.choice([5, 30, 90, 240, 24 * 60, 3 * 24 * 60]))
+        times.append(when)
+    return times
+
+
+def _legacy_recount(completed, badge_history):
+    """The per-rerun work the planner did before this engine: O(history)."""
+    done = completed[completed["completed"] == True]  # noqa: E712
+    unlocked = [badge for badge, need in (("🏅 Week 1 Champ", 5), ("🏆 Month Champ", 20)) if len(done) >= need]
+    return [badge for badge in unlocked if badge not in badge_history["badge"].values]
+
+
+def _apply(store, counters, when, username="bench_user"):
+    if store is None:
+        return len(record_completion(counters, when))
+    counters = store.load_badge_counters(username) or new_counters()
+    unlocked = record_completion(counters, when)
+    store.save_badge_counters(username, counters)
+    if unlocked:
+        store.add_badges(username, [[badge, when.isoformat()] for badge in unlocked])
+    return len(unlocked)
+
+
+def bench(events=100_000, window=1_000, checkpoints=(1_000, 10_000, 100_000), seed=0):
+    """Mean cost per completion event at several history sizes.
+
+    "engine" is record_completion alone; "csv" and "sqlite" add what the
+    planner does per event (load counters, record, save counters, append any
+    unlocked badges). "legacy" recounts a completed-task frame and badge
+    history of that size, as the page did on every rerun before.
+    """
+    import pandas as pd
+    from storage import BADGE_COLUMNS, CSVStorage, SQLiteStorage
+
+    times = _completion_times(events, seed)
+    checkpoints = [c for c in checkpoints if c <= events]
+    results = []
+    with tempfile.TemporaryDirectory() as root:
+        stores = {"engine": None, "csv": CSVStorage(root), "sqlite": SQLiteStorage(os.path.join(root, "bench.db"))}
+        for mode, store in stores.items():
+            counters, unlocked_total, i = new_counters(), 0, 0
+            row = {"mode": mode}
+            for checkpoint in checkpoints:
+                # Untimed up to the start of the window, then time `window` events.
+                for when in times[i:checkpoint - window]:
+                    unlocked_total += _apply(store, counters, when)
+                start = time.perf_counter()
+                for when in times[max(i, checkpoint - window):checkpoint]:
+                    unlocked_total += _apply(store, counters, when)
+                elapsed = time.perf_counter() - start
+                row[f"us/event @{checkpoint}"] = round(elapsed * 1e6 / min(window, checkpoint - i), 1)
+                i = checkpoint
+            row["badges unlocked"] = unlocked_total
+            results.append(row)
+
+        row = {"mode": "legacy"}
+        for checkpoint in checkpoints:
+            completed = pd.DataFrame({"completed": [True] * checkpoint})
+            history = pd.DataFrame([["🏅 Week 1 Champ", "2020-01-01"]] * (checkpoint // 50), columns=BADGE_COLUMNS)
+            runs = max(1, min(200, 200_000 // checkpoint))
+            start = time.perf_counter()
+            for _ in range(runs):
+                _legacy_recount(completed, history)
+            row[f"us/event @{checkpoint}"] = round((time.perf_counter() - start) * 1e6 / runs, 1)
+        results.append(row)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Badge engine tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+    bench_p = sub.add_parser("bench", help="per-event cost as completion history grows")
+    bench_p.add_argument("--events", type=int, default=100_000)
+    bench_p.add_argument("--window", type=int, default=1_000, help="events timed at each checkpoint")
+    args = parser.parse_args(argv)
+
+    for row in bench(args.events, args.window):
+        print(", ".join(f"{key}: {value}" for key, value in row.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,639 @@
+"""Multi-session benchmark for the dashboard, driven by Streamlit's AppTest.
+
+    python bench.py run --sessions 8 --iterations 3 --baseline bench_baseline.json
+    python bench.py run --users 5000 --tasks 50 --feedback 100000 --out bench.json
+    python bench.py compare bench.json bench_baseline.json --tolerance 0.15
+    python bench.py startup --repeat 3
+    python bench.py planner --tasks 10 1000 10000
+
+"run" seeds a throwaway data directory with synthetic users, planners and
+feedback, then drives health_calc.py headlessly through realistic flows
+(register/login, add and complete planner tasks, every calculator, Health
+Charts, feedback). Each session runs in its own process, so sessions
+overlap without touching AppTest's process-wide runtime; the price is that
+they do not share st.cache_resource the way sessions on one server do, so
+per-process warm-up (the first load) is paid once per session. The
+background planner reset is switched off
+(HEALTH_CALC_RESET_INTERVAL=0), since its first pass would otherwise land
+in the middle of the measurements.
+
+The report is JSON: latency percentiles per flow, overall throughput, peak
+RSS and bytes read/written through file I/O (from /proc, so Linux only).
+"compare" (or run --baseline) flags flows whose p50 or p95 grew by more
+than the tolerance and exits with status 1 if any did. bench_baseline.json
+is a sample report (8 sessions, 3 iterations, default fixtures, one CPU);
+its "meta" block records the machine and commit it came from, so compare
+against a baseline from the same machine.
+
+"startup" measures cold starts: for each tool, a fresh interpreter times
+health_calc.py's module-level imports, the first paint of the page and the
+first visit to the tool, and notes which heavy libraries were loaded by then.
+
+"planner" times Wellness Planner reruns for one user with 10, 1k and 10k
+tasks: an idle rerun, ticking a checkbox, switching the status filter and
+turning the page. Next to the full AppTest round trip it shows the app's own
+"tool: My Wellness Planner" span and the number of task widgets built.
+"""
+
+import argparse
+import atexit
+import hashlib
+import json
+import multiprocessing
+import os
+import platform
+import queue
+import random
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+APP = os.path.join(os.path.dirname(os.path.abspath(__file__)), "health_calc.py")
+PASSWORD = "bench-pass"
+HEIGHTS = ["5'4", "5'7", "5 ft 10 in", "6'1", "160 cm", "172.5 cm", "185 cm"]
+GOALS = ["Weight Loss", "Muscle Gain", "General Fitness", "Flexibility & Stress Relief"]
+SYMPTOMS = ["headache", "fatigue", "cold", "fever", "nausea", "sore throat"]
+
+
+# ---------- Fixtures ----------
+def seed_fixtures(users, tasks, feedback, seed=0):
+    """Fill the storage backend selected by the environment with synthetic data."""
+    import pandas as pd
+    from storage import FEEDBACK_COLUMNS, TASK_COLUMNS, open_storage
+
+    rng = random.Random(seed)
+    store = open_storage()
+    # Legacy SHA-256 hashes keep seeding fast; credentials.py upgrades each
+    # one to the configured KDF on that user's first login.
+    hashed = hashlib.sha256(PASSWORD.encode()).hexdigest()
+    now = datetime.now()
+    for i in range(users):
+        username = f"bench_user_{i}"
+        store.add_user(username, hashed)
+        if tasks:
+            rows = [
+                [f"Task {j}", rng.random() < 0.3, (now - timedelta(minutes=rng.randint(0, 60))).isoformat(),
+                 now.isoformat()]
+                for j in range(tasks)
+            ]
+            store.save_tasks(username, pd.DataFrame(rows, columns=TASK_COLUMNS))
+    for start in range(0, feedback, 10_000):
+        store.add_feedback_batch([
+            dict(zip(FEEDBACK_COLUMNS, (f"user{rng.randint(0, 999)}", rng.randint(1, 5),
+                                        rng.choice(["Great app", "Too slow", "Love the charts", ""]))))
+            for _ in range(min(10_000, feedback - start))
+        ])
+
+
+# ---------- AppTest Helpers ----------
+def _by_label(elements, label):
+    for element in elements:
+        if element.label == label:
+            return element
+    raise LookupError(f"No widget labelled {label!r}")
+
+
+def _choose_tool(at, tool):
+    _by_label(at.selectbox, "Choose a tool").select(tool).run()
+
+
+def _check(at):
+    if at.exception:
+        raise RuntimeError(at.exception[0].value)
+
+
+# ---------- Flows ----------
+# Each flow takes (at, session) and drives the app through one interaction;
+# session is a dict holding the session's username and random generator.
+def flow_register(at, session):
+    username = f"bench_new_{os.getpid()}_{session['id']}_{session['iteration']}"
+    at.text_input(key="reg_user").input(username)
+    at.text_input(key="reg_pass").input(PASSWORD)
+    _by_label(at.button, "Register").click().run()
+
+
+def flow_login(at, session):
+    at.text_input(key="login_user").input(session["username"])
+    at.text_input(key="login_pass").input(PASSWORD)
+    _by_label(at.button, "Login").click().run()
+    if not at.session_state["logged_in"]:
+        raise RuntimeError(f"login failed for {session['username']}")
+
+
+def flow_planner_add(at, session):
+    _choose_tool(at, "My Wellness Planner")
+    _by_label(at.text_input, "Add a new wellness task").input(f"Bench task {session['rng'].random():.6f}")
+    _by_label(at.button, "Add Task").click().run()
+
+
+def flow_planner_complete(at, session):
+    _choose_tool(at, "My Wellness Planner")
+    for box in at.checkbox:
+        if box.key and box.key.startswith("task_") and not box.value:
+            box.check().run()
+            break
+
+
+def flow_ibw(at, session):
+    _choose_tool(at, "Ideal Body Weight Calculator")
+    _by_label(at.text_input, "Enter your height (e.g., 5'7, 5 ft 7 in or 170 cm)").input(
+        session["rng"].choice(HEIGHTS))
+    _by_label(at.selectbox, "Select your gender").select(session["rng"].choice(["male", "female"]))
+    _by_label(at.button, "Calculate IBW").click().run()
+
+
+def flow_exercise(at, session):
+    _choose_tool(at, "Exercise Planner")
+    _by_label(at.number_input, "Enter your age").set_value(session["rng"].randint(18, 70))
+    _by_label(at.selectbox, "Select your gender").select(session["rng"].choice(["male", "female"]))
+    _by_label(at.text_input, "Enter your height (e.g., 5'7, 5 ft 7 in or 170 cm)").input(
+        session["rng"].choice(HEIGHTS))
+    _by_label(at.number_input, "Enter your weight in kg").set_value(70.0)
+    _by_label(at.selectbox, "What's your fitness goal?").select(session["rng"].choice(GOALS))
+    _by_label(at.button, "Get Plan").click().run()
+
+
+def flow_nutrition(at, session):
+    _choose_tool(at, "Nutrition Analyzer")
+    _by_label(at.number_input, "Enter your age").set_value(session["rng"].randint(18, 70))
+    _by_label(at.selectbox, "Select your gender").select(session["rng"].choice(["male", "female"]))
+    _by_label(at.text_input, "Enter your height (e.g., 5'7, 5 ft 7 in or 170 cm)").input(
+        session["rng"].choice(HEIGHTS))
+    _by_label(at.number_input, "Enter your weight in kg").set_value(65.0)
+    _by_label(at.button, "Analyze Diet Plan").click().run()
+
+
+def flow_symptoms(at, session):
+    _choose_tool(at, "Symptom Checker")
+    picker = _by_label(at.multiselect, "Select symptoms")
+    picker.set_value(session["rng"].sample(SYMPTOMS, 2)).run()
+
+
+def flow_charts(at, session):
+    _choose_tool(at, "📊 Health Charts")
+
+
+def flow_feedback(at, session):
+    _by_label(at.slider, "Rate your experience (1-5)").set_value(session["rng"].randint(1, 5))
+    _by_label(at.text_area, "Comments").input("Benchmark feedback")
+    _by_label(at.button, "Submit Feedback").click().run()
+
+
+FLOWS = [
+    ("login", flow_login),
+    ("planner add", flow_planner_add),
+    ("planner complete", flow_planner_complete),
+    ("ibw", flow_ibw),
+    ("exercise", flow_exercise),
+    ("nutrition", flow_nutrition),
+    ("symptoms", flow_symptoms),
+    ("charts", flow_charts),
+    ("feedback", flow_feedback),
+]
+
+
+# ---------- Runner ----------
+def _io_bytes():
+    try:
+        with open("/proc/self/io") as f:
+            fields = dict(line.split(": ") for line in f.read().splitlines())
+        return int(fields["rchar"]), int(fields["wchar"])
+    except OSError:
+        return 0, 0
+
+
+def _timed(samples, name, fn, *args):
+    start = time.perf_counter()
+    try:
+        fn(*args)
+        ok = True
+    except Exception as exc:
+        ok = False
+        samples.setdefault("errors", []).append(f"{name}: {exc}")
+    samples.setdefault(name, []).append(((time.perf_counter() - start) * 1000, ok))
+
+
+def run_session(sid, iterations, users, register, timeout, seed, start_barrier):
+    """One session's flows, start to finish; returns its raw samples."""
+    from streamlit.testing.v1 import AppTest
+
+    samples = {}
+    rng = random.Random(seed * 100_003 + sid)
+    session = {"id": sid, "rng": rng, "iteration": 0,
+               "username": f"bench_user_{rng.randrange(users)}" if users else None}
+    at = AppTest.from_file(APP, default_timeout=timeout)
+    try:
+        start_barrier.wait(timeout=timeout)
+    except threading.BrokenBarrierError:
+        pass  # another session failed to start; run anyway
+    _timed(samples, "first load", lambda: (at.run(), _check(at)))
+    for iteration in range(iterations):
+        session["iteration"] = iteration
+        if register:
+            _timed(samples, "register", lambda: (flow_register(at, session), _check(at)))
+        for name, flow in FLOWS:
+            if name == "login" and session["username"] is None:
+                continue
+            _timed(samples, name, lambda: (flow(at, session), _check(at)))
+    return samples
+
+
+def run_worker(sid, iterations, users, register, timeout, seed, start_barrier, results):
+    """Run one session in this process and put its raw samples and resource use on results."""
+    read_before, written_before = _io_bytes()
+    samples = run_session(sid, iterations, users, register, timeout, seed, start_barrier)
+    read_after, written_after = _io_bytes()
+    results.put({
+        "samples": {k: v for k, v in samples.items() if k != "errors"},
+        "errors": samples.get("errors", [])[:20],
+        "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        "read_bytes": read_after - read_before,
+        "written_bytes": written_after - written_before,
+    })
+
+
+def run_sessions(sessions, iterations, users, register, timeout, seed):
+    """Start every session in its own process together; returns one result per session."""
+    ctx = multiprocessing.get_context()
+    barrier, results = ctx.Barrier(sessions), ctx.Queue()
+    procs = [ctx.Process(target=run_worker, args=(sid, iterations, users, register, timeout, seed, barrier,
+                                                  results))
+             for sid in range(sessions)]
+    for proc in procs:
+        proc.start()
+    collected = []
+    while len(collected) < sessions:
+        try:
+            collected.append(results.get(timeout=1))
+        except queue.Empty:
+            if not any(proc.is_alive() for proc in procs) and results.empty():
+                break
+    for proc in procs:
+        proc.join()
+    # A session that died without reporting shows up as an error, not a hang.
+    for proc in procs:
+        if proc.exitcode:
+            collected.append({"samples": {}, "errors": [f"session process exited with code {proc.exitcode}"],
+                              "peak_rss_kb": 0, "read_bytes": 0, "written_bytes": 0})
+    return collected
+
+
+def _percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(q * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def summarize(results, wall_seconds):
+    merged = {}
+    for result in results:
+        for name, values in result["samples"].items():
+            merged.setdefault(name, []).extend(values)
+
+    flows = {}
+    total = 0
+    for name, values in merged.items():
+        latencies = sorted(ms for ms, _ in values)
+        total += len(values)
+        flows[name] = {
+            "count": len(values),
+            "errors": sum(not ok for _, ok in values),
+            "mean_ms": round(sum(latencies) / len(latencies), 2),
+            "p50_ms": round(_percentile(latencies, 0.50), 2),
+            "p95_ms": round(_percentile(latencies, 0.95), 2),
+            "p99_ms": round(_percentile(latencies, 0.99), 2),
+            "max_ms": round(latencies[-1], 2),
+        }
+    return {
+        "flows": flows,
+        "wall_s": round(wall_seconds, 3),
+        "throughput_flows_per_s": round(total / wall_seconds, 2) if wall_seconds else 0.0,
+        "peak_rss_mb": round(max(r["peak_rss_kb"] for r in results) / 1024, 1),
+        "read_bytes": sum(r["read_bytes"] for r in results),
+        "written_bytes": sum(r["written_bytes"] for r in results),
+        "errors": [e for r in results for e in r["errors"]][:20],
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(APP)).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def run(args):
+    data_dir = args.data_dir or tempfile.mkdtemp(prefix="health_calc_bench_")
+    os.environ["HEALTH_CALC_DATA_DIR"] = data_dir
+    os.environ.setdefault("HEALTH_CALC_DB", os.path.join(data_dir, "health_calc.db"))
+    os.environ.setdefault("HEALTH_CALC_RESET_INTERVAL", "0")
+    if not args.data_dir and not args.keep_data:
+        # The app's feedback writer drains its queue at exit; atexit runs
+        # last-registered first, so this removal comes after it.
+        atexit.register(shutil.rmtree, data_dir, ignore_errors=True)
+    start = time.perf_counter()
+    seed_fixtures(args.users, args.tasks, args.feedback, args.seed)
+    seed_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    results = run_sessions(args.sessions, args.iterations, args.users, args.register, args.timeout, args.seed)
+    report = summarize(results, time.perf_counter() - start)
+
+    report["meta"] = {
+        "time": datetime.now().isoformat(timespec="seconds"),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "storage": os.environ.get("HEALTH_CALC_STORAGE", "csv"),
+        "seed_s": round(seed_seconds, 3),
+        **{k: getattr(args, k) for k in ("sessions", "iterations", "users", "tasks", "feedback",
+                                         "register", "seed")},
+    }
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print_report(report)
+    print(f"\nWrote {args.out}")
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            return compare(report, json.load(f), args.tolerance)
+    return 0
+
+
+# ---------- Startup ----------
+TOOLS = [
+    "Ideal Body Weight Calculator",
+    "Exercise Planner",
+    "Nutrition Analyzer",
+    "Symptom Checker",
+    "📊 Health Charts",
+    "My Wellness Planner",
+    "📬 View Feedback",
+    "📈 User Analytics",
+]
+ADMIN_TOOLS = {"📬 View Feedback", "📈 User Analytics"}
+HEAVY_MODULES = ("pandas", "numpy", "matplotlib")
+
+
+def app_imports():
+    """health_calc.py's module-level import statements, as source."""
+    import ast
+
+    with open(APP, encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    return "\n".join(ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom)))
+
+
+def _heavy_loaded():
+    return [name for name in HEAVY_MODULES if name in sys.modules]
+
+
+def startup_probe(tool, timeout):
+    """Cold-start timings for one tool; meant to run in a fresh interpreter."""
+    sys.path.insert(0, os.path.dirname(APP))
+    start = time.perf_counter()
+    exec(app_imports(), {})
+    result = {"tool": tool, "import_ms": round((time.perf_counter() - start) * 1000, 1)}
+
+    from streamlit.testing.v1 import AppTest
+
+    start = time.perf_counter()
+    at = AppTest.from_file(APP, default_timeout=timeout)
+    at.run()
+    _check(at)
+    result["first_paint_ms"] = round((time.perf_counter() - start) * 1000, 1)
+    result["heavy_after_first_paint"] = _heavy_loaded()
+
+    if tool in ADMIN_TOOLS:
+        _by_label(at.text_input, "Enter admin password").input("Admin2233")
+        _by_label(at.button, "Login as Admin").click().run()
+    elif tool == "My Wellness Planner":
+        flow_login(at, {"username": "bench_user_0"})
+    start = time.perf_counter()
+    _choose_tool(at, tool)
+    _check(at)
+    result["tool_first_visit_ms"] = round((time.perf_counter() - start) * 1000, 1)
+    result["heavy_after_tool"] = _heavy_loaded()
+    return result
+
+
+def startup(args):
+    data_dir = tempfile.mkdtemp(prefix="health_calc_startup_")
+    env = dict(os.environ, HEALTH_CALC_DATA_DIR=data_dir,
+               HEALTH_CALC_DB=os.path.join(data_dir, "health_calc.db"), HEALTH_CALC_RESET_INTERVAL="0")
+    os.environ.update(env)
+    try:
+        seed_fixtures(users=10, tasks=20, feedback=1_000)
+        rows = []
+        for tool in args.tools or TOOLS:
+            runs = []
+            for _ in range(args.repeat):
+                proc = subprocess.run(
+                    [sys.executable, os.path.abspath(__file__), "startup-probe", tool, "--timeout", str(args.timeout)],
+                    capture_output=True, text=True, env=env, cwd=data_dir,
+                )
+                if proc.returncode:
+                    raise RuntimeError(f"{tool}: {proc.stderr.strip().splitlines()[-1:]}")
+                runs.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+            median = {key: sorted(r[key] for r in runs)[len(runs) // 2]
+                      for key in ("import_ms", "first_paint_ms", "tool_first_visit_ms")}
+            rows.append({**runs[-1], **median})
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+    print(f"{'tool':<30}{'import ms':>11}{'paint ms':>10}{'tool ms':>10}  heavy modules loaded")
+    for row in rows:
+        print(f"{row['tool']:<30}{row['import_ms']:>11.1f}{row['first_paint_ms']:>10.1f}"
+              f"{row['tool_first_visit_ms']:>10.1f}  {', '.join(row['heavy_after_tool']) or '-'}")
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(rows, f, indent=2, ensure_ascii=False)
+    return 0
+
+
+# ---------- Planner ----------
+def _planner_actions(at):
+    """Name and callable for each planner interaction timed by "planner"."""
+    def toggle():
+        box = next(b for b in at.checkbox if b.key and b.key.startswith("task_"))
+        (box.uncheck() if box.value else box.check()).run()
+
+    def status():
+        radio = _by_label(at.radio, "Show")
+        radio.set_value("Expired" if radio.value == "All" else "All").run()
+
+    def page():
+        pages = [n for n in at.number_input if n.label == "Page"]
+        if pages:
+            pages[0].set_value(2 if pages[0].value == 1 else 1).run()
+        else:
+            at.run()
+
+    return [("rerun", at.run), ("toggle", toggle), ("status filter", status), ("page", page)]
+
+
+def planner(args):
+    import metrics
+    from streamlit.testing.v1 import AppTest
+
+    data_dir = tempfile.mkdtemp(prefix="health_calc_planner_")
+    os.environ["HEALTH_CALC_DATA_DIR"] = data_dir
+    os.environ["HEALTH_CALC_DB"] = os.path.join(data_dir, "health_calc.db")
+    os.environ.setdefault("HEALTH_CALC_RESET_INTERVAL", "0")
+    rows = []
+    try:
+        import pandas as pd
+        from storage import TASK_COLUMNS, open_storage
+
+        store = open_storage()
+        rng = random.Random(args.seed)
+        now = datetime.now()
+        for tasks in args.tasks:
+            username = f"bench_planner_{tasks}"
+            store.add_user(username, hashlib.sha256(PASSWORD.encode()).hexdigest())
+            store.save_tasks(username, pd.DataFrame([
+                [f"Task {j}", rng.random() < 0.3, (now - timedelta(minutes=rng.randint(0, 60))).isoformat(),
+                 now.isoformat()]
+                for j in range(tasks)
+            ], columns=TASK_COLUMNS))
+
+        for tasks in args.tasks:
+            at = AppTest.from_file(APP, default_timeout=args.timeout)
+            at.run()
+            flow_login(at, {"username": f"bench_planner_{tasks}"})
+            _choose_tool(at, "My Wellness Planner")
+            _check(at)
+            metrics.enable()
+            for name, action in _planner_actions(at):
+                metrics.reset()
+                latencies = []
+                for _ in range(args.reruns):
+                    start = time.perf_counter()
+                    action()
+                    latencies.append((time.perf_counter() - start) * 1000)
+                    _check(at)
+                latencies.sort()
+                rows.append({
+                    "tasks": tasks, "action": name,
+                    "p50_ms": round(_percentile(latencies, 0.50), 1),
+                    "p95_ms": round(_percentile(latencies, 0.95), 1),
+                    "planner_mean_ms": metrics.histogram("tool: My Wellness Planner").stats()["mean (ms)"],
+                    "widgets": sum(1 for b in at.checkbox if b.key and b.key.startswith("task_")),
+                })
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+    print(f"{'tasks':>7}  {'action':<15}{'p50 ms':>9}{'p95 ms':>9}{'planner ms':>12}{'widgets':>9}")
+    for row in rows:
+        print(f"{row['tasks']:>7}  {row['action']:<15}{row['p50_ms']:>9.1f}{row['p95_ms']:>9.1f}"
+              f"{row['planner_mean_ms']:>12.1f}{row['widgets']:>9}")
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(rows, f, indent=2)
+    return 0
+
+
+# ---------- Reporting ----------
+def print_report(report):
+    print(f"{'flow':<18}{'count':>7}{'errors':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for name, s in report["flows"].items():
+        print(f"{name:<18}{s['count']:>7}{s['errors']:>8}{s['p50_ms']:>10.1f}{s['p95_ms']:>10.1f}{s['p99_ms']:>10.1f}")
+    print(f"\n{report['throughput_flows_per_s']} flows/s over {report['wall_s']} s, "
+          f"peak RSS {report['peak_rss_mb']} MB, read {report['read_bytes']} B, "
+          f"written {report['written_bytes']} B")
+    for error in report["errors"]:
+        print(f"  error: {error}")
+
+
+def compare(report, baseline, tolerance):
+    """Print per-flow changes against baseline; returns 1 if any flow regressed."""
+    regressed = []
+    print(f"\n{'flow':<18}{'p50 base':>10}{'p50 now':>10}{'p95 base':>10}{'p95 now':>10}")
+    for name, now in report["flows"].items():
+        base = baseline["flows"].get(name)
+        if base is None:
+            print(f"{name:<18}{'-':>10}{now['p50_ms']:>10.1f}{'-':>10}{now['p95_ms']:>10.1f}  (new)")
+            continue
+        slower = [q for q in ("p50_ms", "p95_ms") if now[q] > base[q] * (1 + tolerance)]
+        print(f"{name:<18}{base['p50_ms']:>10.1f}{now['p50_ms']:>10.1f}{base['p95_ms']:>10.1f}"
+              f"{now['p95_ms']:>10.1f}{'  REGRESSED' if slower else ''}")
+        if slower:
+            regressed.append(name)
+    base_tput = baseline.get("throughput_flows_per_s") or 0
+    if base_tput and report["throughput_flows_per_s"] < base_tput * (1 - tolerance):
+        regressed.append("throughput")
+    print(f"throughput: {base_tput} -> {report['throughput_flows_per_s']} flows/s")
+    if regressed:
+        print(f"Regressions beyond {tolerance:.0%}: {', '.join(regressed)}")
+        return 1
+    print(f"No regressions beyond {tolerance:.0%}.")
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the dashboard with simulated sessions")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run_p = sub.add_parser("run", help="seed fixtures, drive the app and write a report")
+    run_p.add_argument("--sessions", type=int, default=4)
+    run_p.add_argument("--iterations", type=int, default=3, help="passes through every flow per session")
+    run_p.add_argument("--users", type=int, default=200, help="fixture users")
+    run_p.add_argument("--tasks", type=int, default=20, help="planner tasks per fixture user")
+    run_p.add_argument("--feedback", type=int, default=5_000, help="fixture feedback entries")
+    run_p.add_argument("--register", action="store_true", help="also register a new user per iteration")
+    run_p.add_argument("--seed", type=int, default=0)
+    run_p.add_argument("--timeout", type=float, default=30.0, help="seconds allowed per script run")
+    run_p.add_argument("--data-dir", help="use this directory instead of a temporary one (kept)")
+    run_p.add_argument("--keep-data", action="store_true", help="keep the temporary data directory")
+    run_p.add_argument("--out", default="bench.json")
+    run_p.add_argument("--baseline", help="compare against this report afterwards")
+    run_p.add_argument("--tolerance", type=float, default=0.15)
+
+    cmp_p = sub.add_parser("compare", help="compare two reports")
+    cmp_p.add_argument("report")
+    cmp_p.add_argument("baseline")
+    cmp_p.add_argument("--tolerance", type=float, default=0.15)
+
+    startup_p = sub.add_parser("startup", help="cold-start import and first-paint time per tool")
+    startup_p.add_argument("--tools", nargs="+", help="tool names (default: all)")
+    startup_p.add_argument("--repeat", type=int, default=3, help="fresh interpreters per tool (median)")
+    startup_p.add_argument("--timeout", type=float, default=60.0)
+    startup_p.add_argument("--out", help="also write the rows as JSON")
+
+    probe_p = sub.add_parser("startup-probe")  # internal: one cold start, run by "startup"
+    probe_p.add_argument("tool")
+    probe_p.add_argument("--timeout", type=float, default=60.0)
+
+    planner_p = sub.add_parser("planner", help="Wellness Planner rerun latency by task count")
+    planner_p.add_argument("--tasks", type=int, nargs="+", default=[10, 1_000, 10_000])
+    planner_p.add_argument("--reruns", type=int, default=20, help="timed reruns per action")
+    planner_p.add_argument("--seed", type=int, default=0)
+    planner_p.add_argument("--timeout", type=float, default=60.0)
+    planner_p.add_argument("--out", help="also write the rows as JSON")
+
+    args = parser.parse_args(argv)
+    if args.command == "run":
+        return run(args)
+    if args.command == "startup":
+        return startup(args)
+    if args.command == "planner":
+        return planner(args)
+    if args.command == "startup-probe":
+        print(json.dumps(startup_probe(args.tool, args.timeout), ensure_ascii=False))
+        return 0
+    with open(args.report, encoding="utf-8") as f:
+        report = json.load(f)
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    print_report(report)
+    return compare(report, baseline, args.tolerance)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,93 @@
+"""Bounded LRU cache with hit/miss counters and memory accounting.
+
+Every LRUCache registers itself in CACHES so the admin panel in
+health_calc.py can show how each one is doing.
+"""
+
+import sys
+import threading
+from collections import OrderedDict
+
+CACHES = []
+
+
+def sizeof(value):
+    """Best-effort size in bytes of a cached value."""
+    if hasattr(value, "memory_usage"):  # pandas DataFrame
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, (bytes, bytearray, str)):
+        return len(value)
+    if isinstance(value, tuple):
+        return sys.getsizeof(value) + sum(sizeof(v) for v in value)
+    return sys.getsizeof(value)
+
+
+class LRUCache:
+    """Maps a key to (version, value); a lookup with a stale version is a miss.
+
+    Entries are evicted least-recently-used first once either max_entries or
+    max_bytes is exceeded.
+    """
+
+    def __init__(self, name, max_entries=256, max_bytes=64 * 1024 * 1024):
+        self.name = name
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.nbytes = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        CACHES.append(self)
+
+    def get(self, key, version=None):
+        """Return the cached value, or None on a miss."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] != version:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, value, version=None):
+        size = sizeof(value)
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self.nbytes -= old[2]
+            if size > self.max_bytes:
+                return
+            self._data[key] = (version, value, size)
+            self.nbytes += size
+            while len(self._data) > self.max_entries or self.nbytes > self.max_bytes:
+                _, (_, _, evicted_size) = self._data.popitem(last=False)
+                self.nbytes -= evicted_size
+                self.evictions += 1
+
+    def get_or_compute(self, key, compute, version=None):
+        value = self.get(key, version)
+        if value is None:
+            value = compute()
+            self.put(key, value, version)
+        return value
+
+    def invalidate(self, key):
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self.nbytes -= old[2]
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "cache": self.name,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "entries": len(self._data),
+            "evictions": self.evictions,
+            "bytes": self.nbytes,
+        }
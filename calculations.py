@@ -0,0 +1,320 @@
+"""Health formulas shared by the dashboard and the batch tools.
+
+Nothing here imports Streamlit, so other systems can call the formulas
+directly. The scalar functions back the UI; the *_batch functions take NumPy
+arrays (or pandas Series) and score a whole cohort in one vectorized pass.
+NumPy and pandas are imported inside the batch code only, so the calculator
+pages keep their fast cold start.
+
+Score a cohort file chunk by chunk without loading it all into memory:
+
+    python calculations.py ibw people.csv ibw.csv
+    python calculations.py bmr people.parquet bmr.parquet --chunksize 500000
+
+"ibw" needs height_in and gender columns; "bmr" needs weight (kg),
+height_cm, age and gender. Either command accepts a free-text height column
+instead (5'7, 5 ft 7 in, 170 cm), which is run through parse_heights().
+Parquet input/output needs pyarrow.
+
+Compare the scalar formulas with the batch ones on synthetic cohorts:
+
+    python calculations.py bench --rows 10000 1000000 10000000
+"""
+
+import argparse
+import functools
+import os
+import re
+import sys
+import time
+from typing import NamedTuple
+
+BASE_HEIGHT_IN = 60
+IBW_BASE_KG = {"male": 50.0, "female": 45.5}
+IBW_KG_PER_INCH = 2.3
+ACTIVITY_FACTOR = 1.2  # sedentary multiplier applied to BMR
+SYMPTOM_SCORE_MAX = 50
+
+# Markdown bullet points for each fitness goal in the Exercise Planner.
+EXERCISE_PLANS = {
+    "Weight Loss": [
+        "**Cardio:** 5 days/week – 30 to 45 minutes/session",
+        "**Strength Training:** 2–3 days/week",
+        "**Diet Tip:** Stay in calorie deficit.",
+        "**Recovery:** 7–8 hours sleep, hydration (2.5–3 L/day)",
+    ],
+    "Muscle Gain": [
+        "**Strength Training:** 4–5 days/week",
+        "**Protein Intake:** Include dal, paneer, eggs, chicken, sprouts",
+        "**Rest & Recovery:** Sleep 8 hrs/night",
+        "**Cardio:** Light cardio 2x/week",
+    ],
+    "General Fitness": [
+        "**Routine Mix:** Cardio + strength + flexibility (3–4x/week)",
+        "**Examples:** Walking, yoga, home circuits",
+        "**Diet:** Whole grains, local veggies, pulses",
+    ],
+    "Flexibility & Stress Relief": [
+        "**Yoga & Stretching:** 4–5x/week",
+        "**Breathing & Meditation:** Daily",
+        "**Supplemental:** Walks, music meditation",
+    ],
+}
+
+
+# ---------- Height Parsing ----------
+# Both patterns are anchored at the start and ignore trailing text, matching
+# what the old re.match-based parser accepted. A bare feet value must not be
+# followed by a sign or stray quote, so garbled input like 5'-3 or 5' -3 is
+# rejected rather than read as 5 ft. The guard skips whitespace itself, or
+# backtracking the \s* before it would step around it.
+_FEET_INCHES_RE = re.compile(
+    r"""^(\d+)\s*(?:'|ft\.?|feet|foot)\s*(?:(\d+)\s*(?:"|''|in(?:ch(?:es)?)?)?|(?!\s*[-+"]))""", re.I
+)
+_CM_RE = re.compile(r"^(\d+(?:\.\d+)?)\s*cm", re.I)
+
+
+class Height(NamedTuple):
+    inches: float
+    cm: float
+
+
+class HeightParseError(ValueError):
+    def __init__(self, text, reason):
+        super().__init__(f"Cannot parse height {text!r}: {reason}")
+        self.text = text
+        self.reason = reason
+
+
+@functools.lru_cache(maxsize=4096)
+def _parse_height(text):
+    # Returns the error instead of raising it so failures are memoized too.
+    stripped = text.strip()
+    if not stripped:
+        return HeightParseError(text, "empty")
+    match = _FEET_INCHES_RE.match(stripped)
+    if match:
+        inches = int(match.group(1)) * 12 + int(match.group(2) or 0)
+        return Height(inches, round(inches * 2.54, 2))
+    match = _CM_RE.match(stripped)
+    if match:
+        cm = float(match.group(1))
+        return Height(cm / 2.54, cm)
+    return HeightParseError(text, "unrecognized format")
+
+
+def parse_height(text):
+    """Parse 5'7, 5'7", 5 ft 7 in, 5ft or 170 cm into a Height.
+
+    Raises HeightParseError (a ValueError) when the text is not a height.
+    """
+    result = _parse_height(text)
+    if isinstance(result, HeightParseError):
+        raise result
+    return result
+
+
+def parse_heights(values):
+    """Vectorized parse_height over a Series or array of strings.
+
+    Returns a DataFrame with inches, cm and error columns; error holds the
+    failure reason (or None) and inches/cm are NaN on those rows.
+    """
+    import numpy as np
+    import pandas as pd
+
+    text = pd.Series(values).fillna("").astype(str).str.strip()
+    feet_inches = text.str.extract(_FEET_INCHES_RE).astype(float)
+    cm_given = text.str.extract(_CM_RE)[0].astype(float)
+
+    is_imperial = feet_inches[0].notna()
+    inches = (feet_inches[0] * 12 + feet_inches[1].fillna(0)).where(is_imperial, cm_given / 2.54)
+    cm = (inches * 2.54).round(2).where(is_imperial, cm_given)
+    error = np.where(inches.isna(), np.where(text == "", "empty", "unrecognized format"), None)
+    # An explicit object Series keeps None as None; pandas would otherwise
+    # infer a string column and turn it into NaN.
+    error = pd.Series(error, index=text.index, dtype=object)
+    return pd.DataFrame({"inches": inches, "cm": cm, "error": error}, index=text.index)
+
+
+# ---------- Scalar Formulas ----------
+def ideal_body_weight(height_in, gender):
+    """Devine IBW in kg; any gender other than "male" uses the female base."""
+    base = IBW_BASE_KG["male"] if gender == "male" else IBW_BASE_KG["female"]
+    if height_in > BASE_HEIGHT_IN:
+        return base + IBW_KG_PER_INCH * (height_in - BASE_HEIGHT_IN)
+    return base
+
+
+def bmr(weight_kg, height_cm, age, gender):
+    """Mifflin-St Jeor basal metabolic rate in kcal/day."""
+    return 10 * weight_kg + 6.25 * height_cm - 5 * age + (5 if gender == "male" else -161)
+
+
+def caloric_needs(weight_kg, height_cm, age, gender):
+    """Daily caloric need for a sedentary adult, truncated to whole kcal."""
+    return int(bmr(weight_kg, height_cm, age, gender) * ACTIVITY_FACTOR)
+
+
+def exercise_plan(goal):
+    """Bullet points for a fitness goal; raises KeyError for unknown goals."""
+    return EXERCISE_PLANS[goal]
+
+
+# ---------- Vectorized Formulas ----------
+def ideal_body_weight_batch(height_in, gender):
+    import numpy as np
+
+    height_in = np.asarray(height_in, dtype=float)
+    base = np.where(np.asarray(gender) == "male", IBW_BASE_KG["male"], IBW_BASE_KG["female"])
+    return base + IBW_KG_PER_INCH * np.maximum(height_in - BASE_HEIGHT_IN, 0)
+
+
+def bmr_batch(weight_kg, height_cm, age, gender):
+    import numpy as np
+
+    offset = np.where(np.asarray(gender) == "male", 5, -161)
+    return (10 * np.asarray(weight_kg, dtype=float)
+            + 6.25 * np.asarray(height_cm, dtype=float)
+            - 5 * np.asarray(age, dtype=float)
+            + offset)
+
+
+def caloric_needs_batch(weight_kg, height_cm, age, gender):
+    """Like caloric_needs, but rows with missing inputs come back as NaN."""
+    import numpy as np
+
+    return np.trunc(bmr_batch(weight_kg, height_cm, age, gender) * ACTIVITY_FACTOR)
+
+
+# ---------- Streaming CLI ----------
+def score_ibw(df):
+    if "height_in" not in df.columns:
+        df["height_in"] = parse_heights(df["height"])["inches"].to_numpy()
+    df["ibw_kg"] = ideal_body_weight_batch(df["height_in"], df["gender"])
+    return df
+
+
+def score_bmr(df):
+    if "height_cm" not in df.columns:
+        df["height_cm"] = parse_heights(df["height"])["cm"].to_numpy()
+    df["bmr"] = bmr_batch(df["weight"], df["height_cm"], df["age"], df["gender"])
+    df["caloric_needs"] = caloric_needs_batch(df["weight"], df["height_cm"], df["age"], df["gender"])
+    return df
+
+
+SCORERS = {"ibw": score_ibw, "bmr": score_bmr}
+
+
+def _is_parquet(path):
+    return os.path.splitext(path)[1].lower() in (".parquet", ".pq")
+
+
+def iter_chunks(path, chunksize):
+    import pandas as pd
+
+    if _is_parquet(path):
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, chunksize=chunksize)
+
+
+def score_file(kind, src, dst, chunksize=100_000):
+    """Stream src through the chosen scorer into dst; returns the row count."""
+    scorer = SCORERS[kind]
+    rows = 0
+    writer = None
+    try:
+        for i, chunk in enumerate(iter_chunks(src, chunksize)):
+            chunk = scorer(chunk)
+            if _is_parquet(dst):
+                import pyarrow as pa
+                import pyarrow.parquet as pq
+
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(dst, table.schema)
+                writer.write_table(table)
+            else:
+                chunk.to_csv(dst, mode="w" if i == 0 else "a", header=i == 0, index=False)
+            rows += len(chunk)
+    finally:
+        if writer is not None:
+            writer.close()
+    return rows
+
+
+# ---------- Benchmark ----------
+def synthetic_cohort(rows, seed=0):
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    return {
+        "height_in": rng.uniform(55, 80, rows).round(1),
+        "height_cm": rng.uniform(140, 200, rows).round(1),
+        "weight": rng.uniform(45, 120, rows).round(1),
+        "age": rng.integers(18, 90, rows),
+        "gender": np.where(rng.random(rows) < 0.5, "male", "female").astype(object),
+    }
+
+
+def bench(sizes=(10_000, 1_000_000, 10_000_000), seed=0):
+    """Seconds to score IBW and caloric needs row by row vs in one batch."""
+    import numpy as np
+
+    results = []
+    for rows in sizes:
+        cohort = synthetic_cohort(rows, seed)
+        columns = [cohort[name].tolist() for name in ("height_in", "height_cm", "weight", "age", "gender")]
+        height_in, height_cm, weight, age, gender = columns
+
+        start = time.perf_counter()
+        scalar_ibw = [ideal_body_weight(h, g) for h, g in zip(height_in, gender)]
+        scalar_kcal = [caloric_needs(w, h, a, g) for w, h, a, g in zip(weight, height_cm, age, gender)]
+        scalar_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        batch_ibw = ideal_body_weight_batch(cohort["height_in"], cohort["gender"])
+        batch_kcal = caloric_needs_batch(cohort["weight"], cohort["height_cm"], cohort["age"], cohort["gender"])
+        batch_s = time.perf_counter() - start
+
+        assert np.allclose(batch_ibw, scalar_ibw) and np.array_equal(batch_kcal, scalar_kcal)
+        results.append({
+            "rows": rows,
+            "scalar (s)": round(scalar_s, 3),
+            "vectorized (s)": round(batch_s, 3),
+            "speedup": round(scalar_s / batch_s, 1) if batch_s else None,
+            "vectorized rows/s": round(rows / batch_s) if batch_s else None,
+        })
+    return results
+
+
+def bench_main(argv):
+    parser = argparse.ArgumentParser(prog="calculations.py bench",
+                                     description="Scalar vs vectorized scoring on synthetic cohorts")
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 1_000_000, 10_000_000])
+    args = parser.parse_args(argv)
+    for row in bench(args.rows):
+        print(", ".join(f"{key}: {value}" for key, value in row.items()))
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ["bench"]:
+        return bench_main(argv[1:])
+    parser = argparse.ArgumentParser(description="Score a cohort file with the dashboard formulas")
+    parser.add_argument("kind", choices=sorted(SCORERS))
+    parser.add_argument("src", help="input CSV or Parquet file")
+    parser.add_argument("dst", help="output CSV or Parquet file")
+    parser.add_argument("--chunksize", type=int, default=100_000)
+    args = parser.parse_args(argv)
+
+    rows = score_file(args.kind, args.src, args.dst, args.chunksize)
+    print(f"Scored {rows} rows into {args.dst}")
+
+
+if __name__ == "__main__":
+    main()
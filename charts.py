@@ -0,0 +1,207 @@
+"""Chart rendering for the Health Charts tool.
+
+Charts are drawn on standalone matplotlib Figure objects, which pyplot never
+tracks, so each figure is freed as soon as it has been saved. Rendered PNG or
+SVG bytes are kept in a content-addressed cache keyed by a hash of the chart
+kind, scores and format. The score space is tiny (symptom score 0-50 in steps
+of 5, nutrition and exercise 0 or 25), so prewarm() can render every chart up
+front.
+
+vega_spec() builds an equivalent Vega-Lite spec for st.vega_lite_chart, which
+skips matplotlib entirely.
+
+    python charts.py bench --views 10000   # render latency and RSS per view
+"""
+
+import argparse
+import hashlib
+import io
+import itertools
+import os
+import random
+import threading
+import time
+
+import numpy as np
+from matplotlib.figure import Figure
+
+import metrics
+from cache import LRUCache
+
+LABELS = ['Symptom', 'Nutrition', 'Exercise']
+SYMPTOM_SCORES = range(0, 51, 5)
+NUTRITION_SCORES = (0, 25)
+EXERCISE_SCORES = (0, 25)
+CHART_KINDS = ("pie", "radar")
+
+# Bump when the drawing code changes so old cache entries are not served.
+RENDER_VERSION = 2
+
+CHART_CACHE = LRUCache("charts", max_entries=512, max_bytes=64 * 1024 * 1024)
+
+
+def _draw_pie(fig, scores):
+    ax1 = fig.subplots()
+    if not any(scores):
+        # matplotlib cannot draw a pie of all zeros; a new user starts there.
+        ax1.text(0.5, 0.5, "No scores yet", ha="center", va="center", fontsize=14)
+        ax1.axis('off')
+        return
+    ax1.pie(scores, labels=LABELS, autopct='%1.1f%%', startangle=140)
+    ax1.axis('equal')
+
+
+def _draw_radar(fig, scores):
+    values = list(scores)
+    values += values[:1]
+
+    angles = np.linspace(0, 2 * np.pi, len(LABELS), endpoint=False).tolist()
+    angles += angles[:1]
+
+    ax2 = fig.subplots(subplot_kw=dict(polar=True))
+    ax2.plot(angles, values, color='teal', linewidth=2)
+    ax2.fill(angles, values, color='teal', alpha=0.3)
+    ax2.set_yticklabels([])
+    ax2.set_xticks(angles[:-1])
+    ax2.set_xticklabels(LABELS)
+    ax2.set_title("Health Score Radar", y=1.1)
+
+
+_DRAW = {"pie": _draw_pie, "radar": _draw_radar}
+
+
+def chart_key(kind, scores, fmt="png"):
+    """Content address of a rendered chart."""
+    ident = repr((RENDER_VERSION, kind, tuple(int(s) for s in scores), fmt))
+    return hashlib.sha256(ident.encode()).hexdigest()
+
+
+@metrics.timed("chart render")
+def _render(kind, scores, fmt):
+    fig = Figure()
+    _DRAW[kind](fig, scores)
+    buf = io.BytesIO()
+    fig.savefig(buf, format=fmt, bbox_inches="tight")
+    return buf.getvalue()
+
+
+def render_chart(kind, scores, fmt="png"):
+    """Return the chart as PNG or SVG bytes, rendering it only on a cache miss."""
+    return CHART_CACHE.get_or_compute(chart_key(kind, scores, fmt), lambda: _render(kind, scores, fmt))
+
+
+def all_scores():
+    return itertools.product(SYMPTOM_SCORES, NUTRITION_SCORES, EXERCISE_SCORES)
+
+
+def prewarm(formats=("png",)):
+    """Render every chart kind for every reachable score combination."""
+    for scores in all_scores():
+        for kind in CHART_KINDS:
+            for fmt in formats:
+                render_chart(kind, scores, fmt)
+
+
+def start_prewarm(formats=("png",)):
+    thread = threading.Thread(target=prewarm, args=(formats,), name="chart-prewarm", daemon=True)
+    thread.start()
+    return thread
+
+
+def vega_spec(kind, scores):
+    """Vega-Lite spec for the same chart, for the native rendering path."""
+    data = {"values": [{"category": c, "score": s} for c, s in zip(LABELS, scores)]}
+    if kind == "pie":
+        return {
+            "data": data,
+            "mark": {"type": "arc", "tooltip": True},
+            "encoding": {
+                "theta": {"field": "score", "type": "quantitative"},
+                "color": {"field": "category", "type": "nominal"},
+            },
+        }
+    # Vega-Lite has no polar line mark, so the radar becomes a radial chart.
+    return {
+        "data": data,
+        "mark": {"type": "arc", "stroke": "#fff", "tooltip": True},
+        "encoding": {
+            "theta": {"field": "category", "type": "nominal"},
+            "radius": {"field": "score", "type": "quantitative", "scale": {"domain": [0, 50]}},
+            "color": {"value": "teal"},
+        },
+        "title": "Health Score Radar",
+    }
+
+
+# ---------- Benchmark ----------
+def _rss_mb():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+
+
+def _render_pyplot(kind, scores, fmt):
+    # How the page drew charts before this module: pyplot figures that were
+    # never closed.
+    import matplotlib.pyplot as plt
+
+    fig = plt.figure()
+    _DRAW[kind](fig, scores)
+    fig.savefig(io.BytesIO(), format=fmt, bbox_inches="tight")
+
+
+def bench(views=10_000, render_views=500, leak_views=200, seed=0):
+    """Latency and resident-memory growth per chart view for each render path.
+
+    "cached" is render_chart as the page calls it, "uncached" draws a fresh
+    Figure every time, and "pyplot" is the old unclosed pyplot path. The two
+    paths that render every view are capped at render_views and leak_views
+    (pyplot keeps every figure alive).
+    """
+    import matplotlib
+    matplotlib.use("Agg")
+    matplotlib.rcParams["figure.max_open_warning"] = 0
+
+    rng = random.Random(seed)
+    combos = [s for s in all_scores() if any(s)]
+    requests = [(rng.choice(CHART_KINDS), rng.choice(combos)) for _ in range(views)]
+    results = []
+    for mode, render, count in (
+        ("cached", lambda kind, scores: render_chart(kind, scores), views),
+        ("uncached", lambda kind, scores: _render(kind, scores, "png"), min(views, render_views)),
+        ("pyplot", lambda kind, scores: _render_pyplot(kind, scores, "png"), min(views, leak_views)),
+    ):
+        render(*requests[0])  # import and font-cache costs are not per view
+        rss_start = _rss_mb()
+        latencies = []
+        for kind, scores in requests[:count]:
+            start = time.perf_counter()
+            render(kind, scores)
+            latencies.append((time.perf_counter() - start) * 1000)
+        latencies.sort()
+        growth = _rss_mb() - rss_start
+        results.append({
+            "mode": mode,
+            "views": count,
+            "p50 (ms)": round(latencies[len(latencies) // 2], 2),
+            "p99 (ms)": round(latencies[int(len(latencies) * 0.99)], 2),
+            "RSS growth (MB)": round(growth, 1),
+            "RSS growth per 1k views (MB)": round(growth * 1000 / count, 1),
+        })
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Chart engine tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+    bench_p = sub.add_parser("bench", help="render latency and memory growth over many chart views")
+    bench_p.add_argument("--views", type=int, default=10_000)
+    bench_p.add_argument("--render-views", type=int, default=500, help="views for the uncached path")
+    bench_p.add_argument("--leak-views", type=int, default=200, help="views for the old pyplot path")
+    args = parser.parse_args(argv)
+
+    for row in bench(args.views, args.render_views, args.leak_views):
+        print(", ".join(f"{key}: {value}" for key, value in row.items()))
+
+
+if __name__ == "__main__":
+    main()
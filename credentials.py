@@ -0,0 +1,257 @@
+"""Password hashing and login verification.
+
+Passwords are stored as salted, cost-tunable KDF hashes:
+
+    scrypt$<n>$<r>$<p>$<salt>$<hash>
+    pbkdf2_sha256$<iterations>$<salt>$<hash>
+
+HEALTH_CALC_KDF picks the algorithm for new hashes ("scrypt" or "pbkdf2").
+HEALTH_CALC_SCRYPT_N/_R/_P and HEALTH_CALC_PBKDF2_ITERATIONS set the cost.
+Hashes from before this scheme (bare unsalted SHA-256 hex) and hashes made
+with other settings still verify. They are rehashed with the current
+settings on the user's next successful login.
+
+Credentials runs the KDF on a bounded pool, threads by default. hashlib
+releases the GIL while it hashes, so slow hashes from concurrent logins run
+in parallel instead of queuing behind one another, and the pool caps how
+many CPUs logins can take at once. Successful verifications are remembered
+in an LRUCache under an HMAC of (username, stored hash, password) with a
+per-process key, so a repeat login skips the KDF without keeping anything
+password-derived that is usable outside this process.
+
+    python credentials.py bench --sessions 16   # login throughput at several costs
+"""
+
+import argparse
+import base64
+import binascii
+import hashlib
+import hmac
+import os
+import secrets
+import tempfile
+import threading
+import time
+from typing import NamedTuple
+
+import pools
+from cache import LRUCache
+
+SALT_BYTES = 16
+HASH_BYTES = 32
+# Stored hashes asking for more work than this are treated as malformed
+# rather than tying up a worker (or all its memory) on one login.
+MAX_SCRYPT_N = 2 ** 20
+MAX_SCRYPT_RP = 64  # r * p
+MAX_PBKDF2_ITERATIONS = 10_000_000
+
+
+class KDFParams(NamedTuple):
+    algorithm: str  # "scrypt" or "pbkdf2_sha256"
+    n: int = 2 ** 14  # scrypt CPU/memory cost
+    r: int = 8
+    p: int = 1
+    iterations: int = 600_000  # PBKDF2-HMAC-SHA256 rounds
+
+
+def params_from_env():
+    algorithm = os.environ.get("HEALTH_CALC_KDF", "scrypt").lower()
+    if algorithm in ("pbkdf2", "pbkdf2_sha256"):
+        return KDFParams("pbkdf2_sha256", iterations=int(os.environ.get("HEALTH_CALC_PBKDF2_ITERATIONS", "600000")))
+    if algorithm == "scrypt":
+        return KDFParams(
+            "scrypt",
+            n=int(os.environ.get("HEALTH_CALC_SCRYPT_N", str(2 ** 14))),
+            r=int(os.environ.get("HEALTH_CALC_SCRYPT_R", "8")),
+            p=int(os.environ.get("HEALTH_CALC_SCRYPT_P", "1")),
+        )
+    raise ValueError(f"Unknown KDF: {algorithm!r}")
+
+
+def _b64(data):
+    return base64.b64encode(data).decode().rstrip("=")
+
+
+def _unb64(text):
+    return base64.b64decode(text + "=" * (-len(text) % 4))
+
+
+def _derive(password, salt, params):
+    if params.algorithm == "scrypt":
+        return hashlib.scrypt(
+            password.encode(), salt=salt, n=params.n, r=params.r, p=params.p,
+            maxmem=256 * params.n * params.r * params.p + 1024 * 1024, dklen=HASH_BYTES,
+        )
+    return hashlib.pbkdf2_hmac("sha256", password.encode(), salt, params.iterations, dklen=HASH_BYTES)
+
+
+def _parse(encoded):
+    """(params, salt, hash) of an encoded hash; params is None for legacy SHA-256."""
+    parts = encoded.split("$")
+    if parts[0] == "scrypt" and len(parts) == 6:
+        n, r, p = (int(x) for x in parts[1:4])
+        if not (1 < n <= MAX_SCRYPT_N and r > 0 and p > 0 and r * p <= MAX_SCRYPT_RP):
+            raise ValueError(f"scrypt parameters out of range: n={n} r={r} p={p}")
+        return KDFParams("scrypt", n=n, r=r, p=p), _unb64(parts[4]), _unb64(parts[5])
+    if parts[0] == "pbkdf2_sha256" and len(parts) == 4:
+        iterations = int(parts[1])
+        if not 0 < iterations <= MAX_PBKDF2_ITERATIONS:
+            raise ValueError(f"pbkdf2 iterations out of range: {iterations}")
+        return KDFParams("pbkdf2_sha256", iterations=iterations), _unb64(parts[2]), _unb64(parts[3])
+    return None, b"", encoded
+
+
+def hash_password(password, params):
+    salt = secrets.token_bytes(SALT_BYTES)
+    digest = _b64(_derive(password, salt, params))
+    if params.algorithm == "scrypt":
+        return f"scrypt${params.n}${params.r}${params.p}${_b64(salt)}${digest}"
+    return f"pbkdf2_sha256${params.iterations}${_b64(salt)}${digest}"
+
+
+def verify_password(password, encoded):
+    """Check password against an encoded hash, in constant time for its length.
+
+    A malformed stored hash (bad numbers or base64, out-of-range costs)
+    never matches.
+    """
+    try:
+        params, salt, expected = _parse(encoded)
+        if params is None:
+            legacy = hashlib.sha256(password.encode()).hexdigest()
+            return hmac.compare_digest(legacy, expected)
+        return hmac.compare_digest(_derive(password, salt, params), expected)
+    except (ValueError, TypeError, binascii.Error):
+        return False
+
+
+def needs_rehash(encoded, params):
+    current = _parse(encoded)[0]
+    if current is None or current.algorithm != params.algorithm:
+        return True
+    if params.algorithm == "scrypt":
+        return (current.n, current.r, current.p) != (params.n, params.r, params.p)
+    return current.iterations != params.iterations
+
+
+class Credentials:
+    """Registers users and checks logins against a storage backend."""
+
+    def __init__(self, store, params=None, workers=None, executor="thread", cache=True):
+        self.store = store
+        self.params = params or params_from_env()
+        self.rehashed = 0
+        self._pool = pools.executor(executor, workers or os.cpu_count() or 1, thread_name_prefix="credentials")
+        self._cache = LRUCache("logins", max_entries=10_000 if cache else 0, max_bytes=4 * 1024 * 1024)
+        self._cache_key = secrets.token_bytes(32)
+        self._dummy = None
+        self._dummy_lock = threading.Lock()
+
+    def close(self):
+        self._pool.shutdown(wait=True)
+
+    def _login_key(self, username, stored, password):
+        message = "\0".join((username, stored, password)).encode()
+        return hmac.new(self._cache_key, message, hashlib.sha256).digest()
+
+    def _dummy_hash(self):
+        # Unknown users still pay for one KDF run, so response times do not
+        # reveal which usernames exist.
+        with self._dummy_lock:
+            if self._dummy is None:
+                self._dummy = hash_password(secrets.token_hex(16), self.params)
+            return self._dummy
+
+    def register(self, username, password):
+        self.store.add_user(username, self._pool.submit(hash_password, password, self.params).result())
+
+    def check(self, username, password):
+        """True if password is correct, rehashing legacy or outdated hashes."""
+        stored = self.store.get_password_hash(username)
+        if stored is None:
+            self._pool.submit(verify_password, password, self._dummy_hash()).result()
+            return False
+        key = self._login_key(username, stored, password)
+        if self._cache.get(key) is None:
+            if not self._pool.submit(verify_password, password, stored).result():
+                return False
+            self._cache.put(key, True)
+        if needs_rehash(stored, self.params):
+            stored = self._pool.submit(hash_password, password, self.params).result()
+            self.store.update_password(username, stored)
+            self._cache.put(self._login_key(username, stored, password), True)
+            self.rehashed += 1
+        return True
+
+
+# ---------- Benchmark ----------
+BENCH_SETTINGS = [
+    KDFParams("scrypt", n=2 ** 12),
+    KDFParams("scrypt", n=2 ** 14),
+    KDFParams("scrypt", n=2 ** 15),
+    KDFParams("pbkdf2_sha256", iterations=100_000),
+    KDFParams("pbkdf2_sha256", iterations=600_000),
+]
+
+
+def _label(params):
+    if params.algorithm == "scrypt":
+        return f"scrypt n=2^{params.n.bit_length() - 1} r={params.r} p={params.p}"
+    return f"pbkdf2 {params.iterations} rounds"
+
+
+def bench(sessions=16, logins=64, workers=None, settings=BENCH_SETTINGS):
+    """Concurrent login throughput per cost setting, with the cache disabled."""
+    from storage import CSVStorage
+
+    results = []
+    for params in settings:
+        with tempfile.TemporaryDirectory() as root:
+            creds = Credentials(CSVStorage(root), params=params, workers=workers, cache=False)
+            users = [f"user{i}" for i in range(sessions)]
+            for username in users:
+                creds.register(username, f"pw-{username}")
+
+            latencies = []
+            per_session = max(1, logins // sessions)
+
+            def session(username):
+                for _ in range(per_session):
+                    start = time.perf_counter()
+                    assert creds.check(username, f"pw-{username}")
+                    latencies.append((time.perf_counter() - start) * 1000)
+
+            threads = [threading.Thread(target=session, args=(u,)) for u in users]
+            start = time.perf_counter()
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            elapsed = time.perf_counter() - start
+            creds.close()
+
+        latencies.sort()
+        results.append({
+            "kdf": _label(params),
+            "logins/s": round(len(latencies) / elapsed, 1),
+            "p50 (ms)": round(latencies[len(latencies) // 2], 1),
+            "p95 (ms)": round(latencies[int(len(latencies) * 0.95)], 1),
+        })
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Credential tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+    bench_p = sub.add_parser("bench", help="login throughput under concurrent sessions")
+    bench_p.add_argument("--sessions", type=int, default=16)
+    bench_p.add_argument("--logins", type=int, default=64, help="total logins per setting")
+    bench_p.add_argument("--workers", type=int, help="KDF pool size (default: CPU count)")
+    args = parser.parse_args(argv)
+
+    for row in bench(args.sessions, args.logins, args.workers):
+        print(", ".join(f"{key}: {value}" for key, value in row.items()))
+
+
+if __name__ == "__main__":
+    main()
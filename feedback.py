@@ -0,0 +1,121 @@
+"""Write-behind ingestion for the "Submit Feedback" form.
+
+The UI calls FeedbackWriter.submit(), which only enqueues the entry. A
+background thread drains the queue and hands entries to the storage backend
+in batches, flushing once max_batch entries are waiting or max_delay seconds
+have passed since the first one arrived. close() (also run at interpreter
+exit) drains whatever is still queued.
+"""
+
+import atexit
+import logging
+import queue
+import threading
+import time
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class FeedbackWriter:
+    def __init__(self, store, max_batch=100, max_delay=1.0, fsync=True):
+        self.store = store
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.fsync = fsync
+
+        self.written = 0
+        self.flushes = 0
+        self.failed_flushes = 0
+        self.last_flush_ms = 0.0
+        self.max_flush_ms = 0.0
+
+        self._queue = queue.Queue()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="feedback-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def submit(self, entry):
+        if self._closed:
+            raise RuntimeError("FeedbackWriter is closed")
+        self._queue.put(entry)
+
+    def close(self, timeout=None):
+        """Stop accepting entries and wait for the queue to drain."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+
+    def stats(self):
+        return {
+            "queue depth": self._queue.qsize(),
+            "written": self.written,
+            "flushes": self.flushes,
+            "failed flushes": self.failed_flushes,
+            "last flush (ms)": round(self.last_flush_ms, 2),
+            "max flush (ms)": round(self.max_flush_ms, 2),
+        }
+
+    def _run(self):
+        pending = []
+        stopping = False
+        while not stopping:
+            # Block for the first entry, then gather more until the batch is
+            # full or max_delay has passed.
+            timeout = None if not pending else self.max_delay
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+            if item is _STOP:
+                stopping = True
+            elif item is not None:
+                pending.append(item)
+                deadline = time.monotonic() + self.max_delay
+                while len(pending) < self.max_batch:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        item = self._queue.get(timeout=remaining)
+                    except queue.Empty:
+                        break
+                    if item is _STOP:
+                        stopping = True
+                        break
+                    pending.append(item)
+            if pending:
+                pending = self._flush(pending)
+
+        # Drain anything that was enqueued behind the stop marker.
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not _STOP:
+                pending.append(item)
+        if pending and self._flush(pending):
+            logger.error("Dropping %d feedback entries after a failed final flush", len(pending))
+
+    def _flush(self, batch):
+        """Write batch; returns the entries still pending (empty on success)."""
+        start = time.perf_counter()
+        try:
+            with metrics.span("feedback flush"):
+                self.store.add_feedback_batch(batch, fsync=self.fsync)
+        except Exception:
+            self.failed_flushes += 1
+            logger.exception("Feedback flush of %d entries failed; will retry", len(batch))
+            return batch
+        self.last_flush_ms = (time.perf_counter() - start) * 1000
+        self.max_flush_ms = max(self.max_flush_ms, self.last_flush_ms)
+        self.flushes += 1
+        self.written += len(batch)
+        return []
@@ -1,26 +1,131 @@
 #(Parent)
 
 import streamlit as st
-import requests
-import json
-import matplotlib.pyplot as plt
-import numpy as np
-import pandas as pd
 import os
-import re
-import hashlib
 from datetime import datetime, timedelta
 import time
 
+import metrics
+from cache import CACHES
+from calculations import (
+    HeightParseError, caloric_needs, exercise_plan, ideal_body_weight, parse_height,
+)
+
+# matplotlib, numpy and pandas are imported inside the tools that use them
+# (charts.py and storage.py pull them in), so calculator pages never pay for
+# them on a cold start.
+
 # ---------- Admin Config ----------
 ADMIN_PASSWORD = "Admin2233"  # Change this to a secure password
-USERS_FILE = "users.csv"
+
+# ---------- Chart Config ----------
+# "matplotlib" serves cached PNGs; "vega" draws natively with st.vega_lite_chart.
+CHART_BACKEND = os.environ.get("HEALTH_CALC_CHARTS", "matplotlib")
+CHART_PREWARM = os.environ.get("HEALTH_CALC_CHART_PREWARM", "1") == "1"
+
+# ---------- Analytics Config ----------
+# The admin analytics page refreshes its rollups in the background at most this often.
+ANALYTICS_MAX_AGE = float(os.environ.get("HEALTH_CALC_ANALYTICS_MAX_AGE", "60"))  # seconds
 
 st.set_page_config(page_title="Health Assistant Dashboard", layout="centered")
+rerun_start = time.perf_counter()
 
 st.title("💪 Health Assistant Dashboard")
 st.write("Welcome! Choose a tool from the sidebar.")
 
+# ---------- Storage ----------
+@st.cache_resource
+def get_storage():
+    # One backend per process, shared by every session (see storage.py).
+    from planner_reset import ResetScheduler
+    from storage import open_storage
+    store = open_storage()
+    # Daily planner resets run in the background for all users (see
+    # planner_reset.py); HEALTH_CALC_RESET_INTERVAL=0 turns them off.
+    interval = int(os.environ.get("HEALTH_CALC_RESET_INTERVAL", "900"))
+    if interval > 0:
+        ResetScheduler(store, interval=interval).start()
+    return store
+
+@st.cache_resource
+def get_feedback_writer():
+    # Background writer shared by every session; see feedback.py.
+    from feedback import FeedbackWriter
+    fsync = os.environ.get("HEALTH_CALC_FEEDBACK_FSYNC", "1") == "1"
+    return FeedbackWriter(get_storage(), fsync=fsync)
+
+@st.cache_resource
+def prewarm_charts():
+    # Runs once per process, on the first Health Charts visit; renders every
+    # score combination in the background.
+    import charts
+    if CHART_PREWARM and CHART_BACKEND == "matplotlib":
+        charts.start_prewarm()
+
+@st.cache_resource
+def get_rollups():
+    # Admin analytics summaries, refreshed incrementally (see analytics.py).
+    from analytics import Rollups
+    default_path = os.path.join(os.environ.get("HEALTH_CALC_DATA_DIR", "."), "analytics_summaries.pkl")
+    return Rollups(get_storage(), cache_path=os.environ.get("HEALTH_CALC_ANALYTICS_CACHE", default_path))
+
+@st.cache_resource
+def get_symptom_catalog():
+    # Loaded and indexed once per process; see symptoms.py.
+    from symptoms import load_catalog
+    return load_catalog()
+
+@st.cache_resource
+def start_metrics_export():
+    # Span timings go to HEALTH_CALC_METRICS_FILE if set (see metrics.py).
+    path = os.environ.get("HEALTH_CALC_METRICS_FILE")
+    if path:
+        metrics.start_exporter(path, interval=float(os.environ.get("HEALTH_CALC_METRICS_INTERVAL", "15")))
+
+start_metrics_export()
+
+# ---------- Shared Sessions ----------
+# Scores and selected symptoms are mirrored to a session store so a
+# reconnect to another replica picks them up again (see sessions.py). The
+# signed token rides in the URL as ?session=..., and anyone the link is
+# shared with holds it too. So identity (logged_in, username, is_admin) is
+# never shared: it stays in this browser session, and a reconnect to
+# another replica asks for the password again. Streamlit cannot set a
+# cookie to carry a login safely, so that is the trade-off.
+SHARED_STATE_KEYS = ("nutrition_score", "exercise_score", "selected_symptoms")
+
+@st.cache_resource
+def get_session_store():
+    from sessions import open_session_store
+    return open_session_store()
+
+def restore_session():
+    # Only the first run of a browser session touches the store.
+    if "session_id" in st.session_state:
+        return
+    store = get_session_store()
+    sid = store.verify(st.query_params.get("session"))
+    state = store.load(sid) if sid else None
+    if state is None:
+        from sessions import new_session_id
+        sid = new_session_id()
+        st.query_params["session"] = store.sign(sid)
+    else:
+        # Records saved by older versions may still carry login state.
+        state = {key: value for key, value in state.items() if key in SHARED_STATE_KEYS}
+        st.session_state.update(state)
+        st.session_state.persisted_state = state
+    st.session_state.session_id = sid
+
+def persist_session():
+    state = {key: st.session_state[key] for key in SHARED_STATE_KEYS if key in st.session_state}
+    # Visitors who have not used a tool yet have nothing to save.
+    if state != st.session_state.get("persisted_state", {}):
+        get_session_store().save(st.session_state.session_id, state)
+        st.session_state.persisted_state = state
+
+restore_session()
+
 # ---------- Session State Initialization ----------
 if "logged_in" not in st.session_state:
     st.session_state.logged_in = False
@@ -28,27 +133,32 @@ if "username" not in st.session_state:
     st.session_state.username = ""
 if "is_admin" not in st.session_state:
     st.session_state.is_admin = False
+# The Symptom Checker's multiselect owns this key, and Streamlit drops a
+# widget's state on runs that do not draw it; re-assigning it here keeps the
+# selection while another tool is open.
+if "selected_symptoms" in st.session_state:
+    st.session_state.selected_symptoms = st.session_state.selected_symptoms
 
 # ---------- User Registration & Login ----------
-def hash_password(password):
-    return hashlib.sha256(password.encode()).hexdigest()
-
+@st.cache_resource
+def get_credentials():
+    # Salted KDF hashing on a shared pool, with legacy SHA-256 hashes
+    # upgraded on login; see credentials.py.
+    from credentials import Credentials
+    return Credentials(get_storage())
+
+@metrics.timed("save_user")
 def save_user(username, password):
-    hashed_pw = hash_password(password)
-    df = pd.DataFrame([[username, hashed_pw]], columns=["username", "password"])
-    if os.path.exists(USERS_FILE):
-        df.to_csv(USERS_FILE, mode='a', header=False, index=False)
-    else:
-        df.to_csv(USERS_FILE, index=False)
+    get_credentials().register(username, password)
 
+@metrics.timed("check_user")
 def check_user(username, password):
-    if not os.path.exists(USERS_FILE):
-        return False
-    df = pd.read_csv(USERS_FILE)
-    hashed_pw = hash_password(password)
-    if 'username' not in df.columns or 'password' not in df.columns:
+    from storage import CorruptedStoreError
+    try:
+        return get_credentials().check(username, password)
+    except (CorruptedStoreError, ValueError):
+        # ValueError: a stored hash the KDF could not use.
         return False
-    return ((df['username'] == username) & (df['password'] == hashed_pw)).any()
 
 with st.sidebar.expander("👤 User Login / Register"):
     login_tab, register_tab = st.tabs(["🔓 Login", "📝 Register"])
@@ -70,18 +180,23 @@ with st.sidebar.expander("👤 User Login / Register"):
         password_reg = st.text_input("Choose Password", type="password", key="reg_pass")
         if st.button("Register"):
             if username_reg and password_reg:
-                if os.path.exists(USERS_FILE):
-                    existing = pd.read_csv(USERS_FILE)
-                    if 'username' not in existing.columns:
-                        st.error("Corrupted user file. Please contact admin.")
-                    elif username_reg in existing['username'].values:
+                from storage import CorruptedStoreError
+                try:
+                    exists = get_storage().get_password_hash(username_reg) is not None
+                except CorruptedStoreError:
+                    st.error("Corrupted user file. Please contact admin.")
+                else:
+                    if exists:
                         st.error("Username already exists. Please choose another.")
                     else:
-                        save_user(username_reg, password_reg)
-                        st.success("Registration successful. You can now log in.")
-                else:
-                    save_user(username_reg, password_reg)
-                    st.success("Registration successful. You can now log in.")
+                        from storage import UserExistsError
+                        try:
+                            save_user(username_reg, password_reg)
+                        except UserExistsError:
+                            # Someone registered the same name since the check above.
+                            st.error("Username already exists. Please choose another.")
+                        else:
+                            st.success("Registration successful. You can now log in.")
             else:
                 st.warning("Please enter both username and password.")
 
@@ -105,7 +220,8 @@ if st.session_state.get("is_admin"):
         "Symptom Checker",
         "📊 Health Charts",
         "My Wellness Planner",
-        "📬 View Feedback"
+        "📬 View Feedback",
+        "📈 User Analytics"
     ]
 else:
     tools = [
@@ -120,39 +236,58 @@ else:
 # Sidebar options
 tool = st.sidebar.selectbox("Choose a tool", tools)
 
+if st.session_state.get("is_admin"):
+    with st.sidebar.expander("🧮 Cache Stats"):
+        st.dataframe([cache.stats() for cache in CACHES], hide_index=True)
+    with st.sidebar.expander("⏱️ Timings"):
+        record = st.checkbox("Record timings", value=metrics.enabled())
+        if record != metrics.enabled():
+            metrics.enable(record)
+        if st.button("Reset timings"):
+            metrics.reset()
+        st.dataframe(metrics.snapshot(), hide_index=True)
+
 # ---------- Wellness Planner ----------
+TASK_TIME_LIMIT = timedelta(minutes=30)
+TASKS_PER_PAGE = 25
+@metrics.timed("load_wellness_tasks")
 def load_wellness_tasks():
-    file = f"planner_{st.session_state.username}.csv"
-    if os.path.exists(file):
-        df = pd.read_csv(file)
-        required_cols = ["task", "completed", "timestamp", "last_updated"]
-        for col in required_cols:
-            if col not in df.columns:
-                df[col] = "" if col != "completed" else False
-        return df[required_cols]
-    return pd.DataFrame(columns=["task", "completed", "timestamp", "last_updated"])
+    return get_storage().load_tasks(st.session_state.username)
 
+@metrics.timed("save_wellness_tasks")
 def save_wellness_tasks(df):
-    file = f"planner_{st.session_state.username}.csv"
-    df.to_csv(file, index=False)
+    get_storage().save_tasks(st.session_state.username, df)
+
+@metrics.timed("update_wellness_tasks")
+def update_wellness_tasks(df, positions):
+    # Row-level write for reruns that only toggled a few checkboxes.
+    get_storage().update_tasks(st.session_state.username, df, positions)
 
+# Each tool branch below is timed as one span, "tool: <name>".
+tool_start = time.perf_counter()
 if tool == "My Wellness Planner":
     if not st.session_state.get("logged_in"):
         st.warning("⚠️ Please log in to use the Wellness Planner.")
     else:
+        import numpy as np
+        import pandas as pd
+
         st.header("🧐 My Wellness Planner")
-        df_tasks = load_wellness_tasks()
+        # Completion flags are cleared at the user's local midnight by the
+        # background reset scheduler, so this page only reads.
+        with st.expander("⚙️ Planner Settings"):
+            from zoneinfo import available_timezones
+            current_tz = get_storage().user_timezones().get(st.session_state.username, "")
+            tz_options = [""] + sorted(available_timezones())
+            tz_choice = st.selectbox(
+                "Time zone for the daily reset", tz_options,
+                index=tz_options.index(current_tz) if current_tz in tz_options else 0,
+                format_func=lambda name: name or "Server time",
+            )
+            if tz_choice != current_tz:
+                get_storage().set_user_timezone(st.session_state.username, tz_choice)
 
-        # Auto-reset daily task completion
-        try:
-            last_updated = pd.to_datetime(df_tasks['last_updated'][0]).date()
-            today = datetime.now().date()
-            if last_updated != today:
-                df_tasks['completed'] = False
-                df_tasks['last_updated'] = datetime.now().isoformat()
-                save_wellness_tasks(df_tasks)
-        except:
-            pass
+        df_tasks = load_wellness_tasks()
 
         with st.form("add_task_form"):
             new_task = st.text_input("Add a new wellness task")
@@ -165,45 +300,72 @@ if tool == "My Wellness Planner":
                 save_wellness_tasks(df_tasks)
                 st.success("Task added!")
 
-        for idx, row in df_tasks.iterrows():
+        # Countdown and status for every task in one vectorized pass.
+        deadlines = pd.to_datetime(df_tasks['timestamp'], format="ISO8601", errors="coerce") + TASK_TIME_LIMIT
+        seconds_left = (deadlines - pd.Timestamp(datetime.now())).dt.total_seconds().to_numpy()
+        is_done = (df_tasks['completed'] == True).to_numpy()
+        is_expired = ~is_done & ~(seconds_left > 0)
+        filters = {
+            "All": np.ones(len(df_tasks), dtype=bool),
+            "Pending": ~is_done & ~is_expired,
+            "Completed": is_done,
+            "Expired": is_expired,
+        }
+        status = st.radio(
+            "Show", list(filters), horizontal=True,
+            format_func=lambda name: f"{name} ({int(filters[name].sum())})",
+        )
+        visible = np.flatnonzero(filters[status])
+
+        # Only the current page of tasks gets widgets.
+        pages = max(1, -(-len(visible) // TASKS_PER_PAGE))
+        page = st.number_input("Page", min_value=1, max_value=pages, value=1, step=1) if pages > 1 else 1
+        visible = visible[(page - 1) * TASKS_PER_PAGE:page * TASKS_PER_PAGE]
+
+        saved_completed = df_tasks['completed'].copy()
+        task_texts = df_tasks['task'].to_numpy()
+        for pos in visible:
+            idx = df_tasks.index[pos]
             col1, col2 = st.columns([0.1, 0.9])
             with col1:
-                if st.checkbox("", key=f"task_{idx}", value=row['completed']):
+                if st.checkbox(f"Done: {task_texts[pos]}", key=f"task_{idx}", value=bool(is_done[pos]),
+                               label_visibility="collapsed"):
                     df_tasks.at[idx, 'completed'] = True
             with col2:
-                task_text = row['task']
-                task_time = pd.to_datetime(row['timestamp'])
-                time_left = (task_time + timedelta(minutes=30)) - datetime.now()
-                if time_left.total_seconds() > 0:
-                    st.markdown(f"**{task_text}** ⏳ Time left: `{str(time_left).split('.')[0]}`")
+                if seconds_left[pos] > 0:
+                    time_left = timedelta(seconds=int(seconds_left[pos]))
+                    st.markdown(f"**{task_texts[pos]}** ⏳ Time left: `{time_left}`")
                 else:
-                    st.markdown(f"**{task_text}** ❌ Time's up!")
+                    st.markdown(f"**{task_texts[pos]}** ❌ Time's up!")
 
-        save_wellness_tasks(df_tasks)
+        changed = np.flatnonzero(df_tasks['completed'].ne(saved_completed).to_numpy())
+        if len(changed):
+            update_wellness_tasks(df_tasks, changed)
 
         st.markdown("---")
         st.subheader("🏋 Weekly & Monthly Badges")
-        completed = df_tasks[df_tasks['completed'] == True]
-
-        badge_history_file = f"badges_{st.session_state.username}.csv"
-
-        if os.path.exists(badge_history_file):
-            badge_history = pd.read_csv(badge_history_file)
-        else:
-            badge_history = pd.DataFrame(columns=["badge", "date"])
-
-        unlocked = []
-        if len(completed) >= 5:
-            unlocked.append("🏅 Week 1 Champ")
-        if len(completed) >= 20:
-            unlocked.append("🏆 Month Champ")
-
-        for badge in unlocked:
-            if badge not in badge_history['badge'].values:
-                badge_history.loc[len(badge_history)] = [badge, datetime.now().isoformat()]
+        from badges import BADGE_RULES, current_counts, new_counters, record_completion
+
+        store = get_storage()
+        counters = store.load_badge_counters(st.session_state.username) or new_counters()
+        completions = int(df_tasks['completed'].iloc[changed].eq(True).sum())
+        if completions:
+            now = datetime.now()
+            new_badges = []
+            for _ in range(completions):
+                new_badges += [[badge, now.isoformat()] for badge in record_completion(counters, now)]
+            store.save_badge_counters(st.session_state.username, counters)
+            if new_badges:
+                store.add_badges(st.session_state.username, new_badges)
+            for badge, _ in new_badges:
                 st.success(f"{badge} Badge Unlocked!")
 
-        badge_history.to_csv(badge_history_file, index=False)
+        counts = current_counts(counters, datetime.now().date())
+        st.caption(
+            f"This week: {counts['week']} · This month: {counts['month']} · "
+            f"Streak: {counts['streak']} day(s) · All time: {counts['total']}"
+        )
+        badge_history = store.load_badges(st.session_state.username)
 
         with st.expander("📜 View Badge History"):
             if len(badge_history):
@@ -213,43 +375,17 @@ if tool == "My Wellness Planner":
                 st.info("No badges earned yet.")
 
         with st.expander("🔮 Sneak Peek: Upcoming Badges"):
-            st.markdown("- Complete 5 tasks: 🏅 Week 1 Champ")
-            st.markdown("- Complete 20 tasks: 🏆 Month Champ")
+            for rule in BADGE_RULES:
+                st.markdown(f"- {rule.description}: {rule.badge}")
 
 # Utilities
 
-def height_to_inches(height_str):
+def parse_height_or_none(height_str):
     try:
-        if "'" in height_str:
-            feet, inches = height_str.split("'")
-            inches = inches.replace('"', '').strip()
-            return int(feet) * 12 + int(inches)
-        elif "ft" in height_str:
-            parts = height_str.lower().replace("in", "").split("ft")
-            feet = int(parts[0].strip())
-            inches = int(parts[1].strip()) if len(parts) > 1 else 0
-            return feet * 12 + inches
-    except:
+        return parse_height(height_str)
+    except HeightParseError:
         return None
 
-def convert_height_to_cm(height_str):
-    feet = 0
-    inches = 0
-    match1 = re.match(r"(\d+)'(\d+)", height_str)
-    match2 = re.match(r"(\d+)\s*ft\s*(\d*)\s*in*", height_str)
-
-    if match1:
-        feet = int(match1.group(1))
-        inches = int(match1.group(2))
-    elif match2:
-        feet = int(match2.group(1))
-        inches = int(match2.group(2)) if match2.group(2) else 0
-    else:
-        return None
-
-    total_inches = feet * 12 + inches
-    return round(total_inches * 2.54, 2)
-
 # Initialize scores
 if 'nutrition_score' not in st.session_state:
     st.session_state.nutrition_score = 0
@@ -259,23 +395,19 @@ if 'exercise_score' not in st.session_state:
 # Tool: IBW
 if tool == "Ideal Body Weight Calculator":
     st.header("🏋️ Ideal Body Weight (IBW) Calculator")
-    height_str = st.text_input("Enter your height (e.g., 5'7 or 5 ft 7 in)")
+    height_str = st.text_input("Enter your height (e.g., 5'7, 5 ft 7 in or 170 cm)")
     gen = st.selectbox("Select your gender", options=["-- Select --", "male", "female"])
     if gen == "-- Select --":
         gen = None
 
     if st.button("Calculate IBW"):
-        height_in = height_to_inches(height_str)
-        if height_in is None:
+        height = parse_height_or_none(height_str)
+        if height is None:
             st.error("Please enter a valid height.")
         elif gen is None:
             st.error("Please select a gender.")
         else:
-            base_height = 60
-            if gen == "male":
-                ibw = 50 + 2.3 * (height_in - base_height) if height_in > base_height else 50
-            else:
-                ibw = 45.5 + 2.3 * (height_in - base_height) if height_in > base_height else 45.5
+            ibw = ideal_body_weight(height.inches, gen)
             st.success(f"Your Ideal Body Weight is approximately {ibw:.2f} kg")
 
 # Tool: Exercise Planner
@@ -286,45 +418,20 @@ elif tool == "Exercise Planner":
     if gen == "-- Select --":
         gen = None
 
-    height_str = st.text_input("Enter your height (e.g., 5'7 or 5 ft 7 in)")
+    height_str = st.text_input("Enter your height (e.g., 5'7, 5 ft 7 in or 170 cm)")
     weight = st.number_input("Enter your weight in kg", min_value=10.0, max_value=300.0, step=0.1)
     goal = st.selectbox("What's your fitness goal?", ["Weight Loss", "Muscle Gain", "General Fitness", "Flexibility & Stress Relief"])
 
     if st.button("Get Plan"):
-        height_in = height_to_inches(height_str)
-        if height_in is None:
+        height = parse_height_or_none(height_str)
+        if height is None:
             st.error("Please enter a valid height.")
         elif gen is None:
             st.error("Please select a gender.")
         else:
             st.success("Here’s your recommended fitness plan:")
 
-            if goal == "Weight Loss":
-                st.markdown("""
-                - **Cardio:** 5 days/week – 30 to 45 minutes/session  
-                - **Strength Training:** 2–3 days/week  
-                - **Diet Tip:** Stay in calorie deficit.  
-                - **Recovery:** 7–8 hours sleep, hydration (2.5–3 L/day)  
-                """)
-            elif goal == "Muscle Gain":
-                st.markdown("""
-                - **Strength Training:** 4–5 days/week  
-                - **Protein Intake:** Include dal, paneer, eggs, chicken, sprouts  
-                - **Rest & Recovery:** Sleep 8 hrs/night  
-                - **Cardio:** Light cardio 2x/week  
-                """)
-            elif goal == "General Fitness":
-                st.markdown("""
-                - **Routine Mix:** Cardio + strength + flexibility (3–4x/week)  
-                - **Examples:** Walking, yoga, home circuits  
-                - **Diet:** Whole grains, local veggies, pulses  
-                """)
-            elif goal == "Flexibility & Stress Relief":
-                st.markdown("""
-                - **Yoga & Stretching:** 4–5x/week  
-                - **Breathing & Meditation:** Daily  
-                - **Supplemental:** Walks, music meditation  
-                """)
+            st.markdown("\n".join(f"- {item}  " for item in exercise_plan(goal)))
 
             st.session_state.exercise_score = 25
 
@@ -335,7 +442,7 @@ elif tool == "Nutrition Analyzer":
 
     age = st.number_input("Enter your age", min_value=1, max_value=120, step=1)
     gen = st.selectbox("Select your gender", options=["-- Select --", "male", "female"])
-    height_str = st.text_input("Enter your height (e.g., 5'7 or 5 ft 7 in)")
+    height_str = st.text_input("Enter your height (e.g., 5'7, 5 ft 7 in or 170 cm)")
     weight = st.number_input("Enter your weight in kg", min_value=10.0, max_value=300.0, step=0.1)
     diet_type = st.radio("Are you vegan or non-vegan?", ["non-vegan", "vegan"])
 
@@ -345,14 +452,13 @@ elif tool == "Nutrition Analyzer":
         elif not height_str:
             st.error("Please enter your height.")
         else:
-            height_cm = convert_height_to_cm(height_str)
-            if height_cm is None:
-                st.error("Invalid height format. Please use formats like 5'7 or 5 ft 7 in.")
+            height = parse_height_or_none(height_str)
+            if height is None:
+                st.error("Invalid height format. Please use formats like 5'7, 5 ft 7 in or 170 cm.")
             else:
-                bmr = 10 * weight + 6.25 * height_cm - 5 * age + (5 if gen == "male" else -161)
-                caloric_needs = int(bmr * 1.2)
+                calories = caloric_needs(weight, height.cm, age, gen)
                 st.success("Nutrition analysis complete!")
-                st.write(f"Your estimated daily caloric need is **{caloric_needs} calories**.")
+                st.write(f"Your estimated daily caloric need is **{calories} calories**.")
 
                 st.subheader(f"Here's a sample {diet_type} South Indian-style diet plan:")
                 if diet_type == "non-vegan":
@@ -373,40 +479,31 @@ elif tool == "Nutrition Analyzer":
 # Tool: Symptom Checker
 elif tool == "Symptom Checker":
     st.header("🤔 Symptom Checker")
-    symptoms = ["headache", "fatigue", "cold", "fever", "vomiting", "dizziness", "dehydration", "diarrhea", "sunburn", "heat rash", "muscle cramps", "nausea", "sore throat"]
-
-    symptom_info = {
-        "headache": ("Dehydration, stress", "Drink water, rest."),
-        "fatigue": ("Lack of sleep", "Get proper rest."),
-        "cold": ("Viral Infection", "Take rest, drink fluids."),
-        "fever": ("Infection", "Use paracetamol."),
-        "vomiting": ("Food poisoning", "Use ORS, avoid solid food."),
-        "dizziness": ("Low BP", "Sit down, drink fluids."),
-        "dehydration": ("Low fluids", "Drink ORS."),
-        "diarrhea": ("Contaminated food", "Hydrate."),
-        "sunburn": ("UV exposure", "Use aloe vera."),
-        "heat rash": ("Blocked sweat glands", "Keep cool."),
-        "muscle cramps": ("Overuse", "Stretch, hydrate."),
-        "nausea": ("Indigestion", "Rest, sip fluids."),
-        "sore throat": ("Infection", "Gargle,drink warm fluids.")
-    }
-
-    selected = st.multiselect("Select symptoms", symptoms)
-    st.session_state.selected_symptoms = selected
+    catalog = get_symptom_catalog()
+    # The widget owns st.session_state.selected_symptoms through its key, so
+    # no default is passed; the current selection always leads the options
+    # so it stays valid whatever the search shows.
+    previous = [sym for sym in st.session_state.get("selected_symptoms", []) if sym in catalog.info]
+    st.session_state.selected_symptoms = previous
+    query = st.text_input("Search symptoms (name or synonym)")
+    options = previous + [sym for sym in catalog.search(query, limit=50) if sym not in previous]
+    selected = st.multiselect("Select symptoms", options, key="selected_symptoms")
 
     if selected:
         for sym in selected:
-            cause, solution = symptom_info.get(sym, ("Unknown", "Consult a doctor."))
+            cause, solution = catalog.info[sym]
             st.subheader(sym.capitalize())
             st.write(f"**Cause:** {cause}")
             st.write(f"**Solution:** {solution}")
 
-        symptom_score = max(50 - len(selected) * 5, 0)
-        total_score = symptom_score + st.session_state.nutrition_score + st.session_state.exercise_score
+        sym_score, combinations = catalog.score(selected)
+        for combination in combinations:
+            st.warning(combination.note)
+        total_score = sym_score + st.session_state.nutrition_score + st.session_state.exercise_score
 
         st.markdown("---")
         st.header("🌟 Your Overall Wellness Score")
-        st.write(f"**Symptom Score:** {symptom_score}/50")
+        st.write(f"**Symptom Score:** {sym_score}/50")
         st.write(f"**Nutrition Score:** {st.session_state.nutrition_score}/25")
         st.write(f"**Exercise Score:** {st.session_state.exercise_score}/25")
         st.success(f"✅ Total Score: {total_score}/100")
@@ -414,41 +511,32 @@ elif tool == "Symptom Checker":
 # Tool: 📊 Health Charts
 elif tool == "📊 Health Charts":
     st.header("📊 Visualize Your Health Scores")
+    import charts
+    prewarm_charts()
 
-    symptom_score = max(50 - len(st.session_state.get("selected_symptoms", [])) * 5, 0) if "selected_symptoms" in st.session_state else 50
+    sym_score = get_symptom_catalog().score(st.session_state.get("selected_symptoms", [])).score
     nutrition_score = st.session_state.get("nutrition_score", 0)
     exercise_score = st.session_state.get("exercise_score", 0)
-    total_score = symptom_score + nutrition_score + exercise_score
+    total_score = sym_score + nutrition_score + exercise_score
+
+    scores = (sym_score, nutrition_score, exercise_score)
+
+    def show_chart(kind):
+        if CHART_BACKEND == "vega":
+            st.vega_lite_chart(charts.vega_spec(kind, scores), use_container_width=True)
+        else:
+            st.image(charts.render_chart(kind, scores))
 
     # Pie Chart
     st.subheader("🥧 Score Distribution - Pie Chart")
-    pie_labels = ['Symptom', 'Nutrition', 'Exercise']
-    pie_scores = [symptom_score, nutrition_score, exercise_score]
-    fig1, ax1 = plt.subplots()
-    ax1.pie(pie_scores, labels=pie_labels, autopct='%1.1f%%', startangle=140)
-    ax1.axis('equal')
-    st.pyplot(fig1)
+    show_chart("pie")
 
     # Radar Chart
     st.subheader("📈 Score Balance - Radar Chart")
-    categories = ['Symptom', 'Nutrition', 'Exercise']
-    values = [symptom_score, nutrition_score, exercise_score]
-    values += values[:1]
-
-    angles = np.linspace(0, 2 * np.pi, len(categories), endpoint=False).tolist()
-    angles += angles[:1]
-
-    fig2, ax2 = plt.subplots(subplot_kw=dict(polar=True))
-    ax2.plot(angles, values, color='teal', linewidth=2)
-    ax2.fill(angles, values, color='teal', alpha=0.3)
-    ax2.set_yticklabels([])
-    ax2.set_xticks(angles[:-1])
-    ax2.set_xticklabels(categories)
-    ax2.set_title("Health Score Radar", y=1.1)
-    st.pyplot(fig2)
+    show_chart("radar")
 
     st.markdown("---")
-    st.write(f"**Symptom Score:** {symptom_score}/50")
+    st.write(f"**Symptom Score:** {sym_score}/50")
     st.write(f"**Nutrition Score:** {nutrition_score}/25")
     st.write(f"**Exercise Score:** {exercise_score}/25")
     st.success(f"✅ Total Wellness Score: {total_score}/100")
@@ -456,11 +544,89 @@ elif tool == "📊 Health Charts":
 # Tool: 📬 View Feedback (Admin Only)
 elif tool == "📬 View Feedback" and st.session_state.get("is_admin"):
     st.header("📬 User Feedback")
-    if os.path.exists("feedback.csv"):
-        df = pd.read_csv("feedback.csv")
-        st.dataframe(df)
-    else:
+    with st.expander("📥 Ingestion Metrics"):
+        st.dataframe([get_feedback_writer().stats()], hide_index=True)
+    # The first page is read from the head of the file; the summary needs the
+    # full index, so it is filled in above the table once the page is shown.
+    summary_area = st.container()
+
+    col1, col2, col3 = st.columns([0.25, 0.5, 0.25])
+    rating_filter = col1.selectbox("Rating", ["All", 1, 2, 3, 4, 5])
+    search = col2.text_input("Search comments")
+    page = col3.number_input("Page", min_value=1, value=1, step=1)
+    page_size = 50
+    unfiltered = rating_filter == "All" and not search.strip()
+
+    result = get_storage().query_feedback(
+        rating=None if rating_filter == "All" else rating_filter,
+        search=search.strip() or None,
+        offset=(page - 1) * page_size,
+        limit=page_size,
+    )
+    if unfiltered and page == 1 and result.rows.empty:
         st.info("No feedback received yet.")
+    else:
+        st.dataframe(result.rows, hide_index=True)
+
+    summary = get_storage().feedback_summary()
+    total = result.total
+    if total is None and unfiltered:
+        total = summary["count"]
+    if summary["count"]:
+        with summary_area:
+            col1, col2 = st.columns(2)
+            col1.metric("Responses", summary["count"])
+            col2.metric("Average Rating", f"{summary['average']:.2f}")
+            st.bar_chart({"Responses": list(summary["histogram"].values())})
+            st.caption("Ratings 1 to 5, left to right.")
+    if total is not None and summary["count"]:
+        st.caption(f"{total} matching responses, page {page} of {max(1, -(-total // page_size))}")
+    elif result.has_more:
+        st.caption(f"Page {page}; more matches on the next page.")
+
+# Tool: 📈 User Analytics (Admin Only)
+elif tool == "📈 User Analytics" and st.session_state.get("is_admin"):
+    st.header("📈 User Analytics")
+    rollups = get_rollups()
+    # Refreshed on a background thread at most every ANALYTICS_MAX_AGE
+    # seconds; the page shows the totals from the last finished refresh.
+    rollups.refresh_async(ANALYTICS_MAX_AGE)
+    refresh = rollups.last_refresh
+    if refresh is None:
+        st.info("Analytics are being built in the background. Reload the page in a moment.")
+    else:
+        finished = datetime.fromtimestamp(refresh["finished"]).strftime("%H:%M:%S")
+        st.caption(
+            f"Last refreshed at {finished}: rescanned {refresh['rescanned']} of {refresh['users']} users "
+            f"in {refresh['seconds']:.2f} s." + (" Refreshing now…" if rollups.refreshing else "")
+        )
+
+    users, tasks, completed = rollups.counts()
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Users", users)
+    col2.metric("Tasks", tasks)
+    col3.metric("Completed", f"{completed / tasks:.0%}" if tasks else "–")
+
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Active today", rollups.active_users(1))
+    col2.metric("Active (7 days)", rollups.active_users(7))
+    col3.metric("Active (30 days)", rollups.active_users(30))
+
+    st.subheader("Daily Completions (last 30 days)")
+    daily = rollups.daily_completion(30)
+    st.line_chart({
+        "Created": {day: created for day, created, _, _ in daily},
+        "Completed": {day: done for day, _, done, _ in daily},
+    })
+
+    st.subheader("Badge Distribution")
+    badges = rollups.badge_distribution()
+    if badges:
+        st.bar_chart({"Badges": badges})
+    else:
+        st.info("No badges earned yet.")
+
+metrics.observe(f"tool: {tool}", (time.perf_counter() - tool_start) * 1000)
 
 # Floating Feedback Button
 st.markdown("""
@@ -503,11 +669,10 @@ with st.expander("Submit Feedback"):
             "Comment": comment
         }
 
-        df = pd.DataFrame([feedback_entry])
-
-        if os.path.exists("feedback.csv"):
-            df.to_csv("feedback.csv", mode='a', header=False, index=False)
-        else:
-            df.to_csv("feedback.csv", index=False)
+        with metrics.span("feedback submit"):
+            get_feedback_writer().submit(feedback_entry)
 
         st.success("Thank you for your feedback!")
+
+persist_session()
+metrics.observe("rerun", (time.perf_counter() - rerun_start) * 1000)
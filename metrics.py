@@ -0,0 +1,236 @@
+"""Timing spans for the dashboard's hot paths.
+
+Streamlit re-runs health_calc.py top to bottom on every interaction. The
+spans recorded here (each tool branch, the storage helpers, password checks,
+feedback flushes and chart renders) show where that time goes. Every span
+name gets a Histogram of latencies in milliseconds, registered in METRICS
+for the admin panel.
+
+Recording is off unless HEALTH_CALC_METRICS=1 or enable() is called. While
+it is off, span() returns one shared no-op context manager and timed()
+functions add only a global lookup, so the instrumentation can stay in place.
+
+Set HEALTH_CALC_METRICS_FILE to export periodically: a path ending in .jsonl
+gets one JSON snapshot appended per interval, anything else is rewritten in
+the Prometheus text format.
+
+    python metrics.py   # measure the overhead of disabled spans
+"""
+
+import bisect
+import functools
+import json
+import math
+import os
+import threading
+import time
+
+BUCKETS_MS = (0.1, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, math.inf)
+
+METRICS = {}
+_enabled = os.environ.get("HEALTH_CALC_METRICS", "0") == "1"
+_registry_lock = threading.Lock()
+
+
+def enabled():
+    return _enabled
+
+
+def enable(on=True):
+    """Turn recording on or off for the whole process."""
+    global _enabled
+    _enabled = on
+
+
+def reset():
+    with _registry_lock:
+        METRICS.clear()
+
+
+class Histogram:
+    """Count, sum, max and bucketed distribution of one span's latencies."""
+
+    def __init__(self, name):
+        self.name = name
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.buckets = [0] * len(BUCKETS_MS)
+        self._lock = threading.Lock()
+
+    def observe(self, ms):
+        i = bisect.bisect_left(BUCKETS_MS, ms)
+        with self._lock:
+            self.count += 1
+            self.total_ms += ms
+            self.max_ms = max(self.max_ms, ms)
+            self.buckets[i] += 1
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q-th quantile."""
+        target = q * self.count
+        seen = 0
+        for bound, n in zip(BUCKETS_MS, self.buckets):
+            seen += n
+            if n and seen >= target:
+                return min(bound, self.max_ms)
+        return 0.0
+
+    def stats(self):
+        return {
+            "span": self.name,
+            "count": self.count,
+            "mean (ms)": round(self.total_ms / self.count, 2) if self.count else 0.0,
+            "p50 (ms)": round(self.quantile(0.5), 2),
+            "p95 (ms)": round(self.quantile(0.95), 2),
+            "max (ms)": round(self.max_ms, 2),
+            "total (ms)": round(self.total_ms, 1),
+        }
+
+
+def histogram(name):
+    hist = METRICS.get(name)
+    if hist is None:
+        with _registry_lock:
+            hist = METRICS.setdefault(name, Histogram(name))
+    return hist
+
+
+def observe(name, ms):
+    if _enabled:
+        histogram(name).observe(ms)
+
+
+class _Span:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        histogram(self.name).observe((time.perf_counter() - self.start) * 1000)
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def span(name):
+    """Context manager timing its block under `name` (a no-op when disabled)."""
+    return _Span(name) if _enabled else _NULL_SPAN
+
+
+def timed(name):
+    """Decorator recording every call of the function as a span."""
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            with _Span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def snapshot():
+    """Stats rows for every span, slowest total first."""
+    return sorted((h.stats() for h in list(METRICS.values())), key=lambda row: -row["total (ms)"])
+
+
+# ---------- Export ----------
+def prometheus_text():
+    lines = [
+        "# HELP health_calc_span_ms Latency of instrumented dashboard spans in milliseconds.",
+        "# TYPE health_calc_span_ms histogram",
+    ]
+    for name, hist in sorted(METRICS.items()):
+        label = name.replace("\\", "\\\\").replace('"', '\\"')
+        cumulative = 0
+        for bound, n in zip(BUCKETS_MS, hist.buckets):
+            cumulative += n
+            le = "+Inf" if bound == math.inf else f"{bound:g}"
+            lines.append(f'health_calc_span_ms_bucket{{span="{label}",le="{le}"}} {cumulative}')
+        lines.append(f'health_calc_span_ms_sum{{span="{label}"}} {hist.total_ms:.3f}')
+        lines.append(f'health_calc_span_ms_count{{span="{label}"}} {hist.count}')
+    return "\n".join(lines) + "\n"
+
+
+def export(path):
+    """Append a JSON-lines snapshot (.jsonl) or rewrite a Prometheus text file."""
+    if path.endswith(".jsonl"):
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"time": time.time(), "spans": snapshot()}, ensure_ascii=False) + "\n")
+    else:
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(prometheus_text())
+        os.replace(tmp, path)
+
+
+def start_exporter(path, interval=15.0):
+    """Export to path every `interval` seconds on a daemon thread."""
+    def run():
+        while True:
+            time.sleep(interval)
+            try:
+                export(path)
+            except OSError:
+                pass  # the next interval tries again
+
+    thread = threading.Thread(target=run, name="metrics-exporter", daemon=True)
+    thread.start()
+    return thread
+
+
+# ---------- Overhead Check ----------
+def measure_overhead(calls=1_000_000):
+    """Nanoseconds per call added by span() and timed() while disabled."""
+    was_enabled = _enabled
+    enable(False)
+    try:
+        def bare():
+            pass
+
+        wrapped = timed("overhead")(bare)
+        loop = range(calls)
+
+        start = time.perf_counter_ns()
+        for _ in loop:
+            bare()
+        base = time.perf_counter_ns() - start
+
+        start = time.perf_counter_ns()
+        for _ in loop:
+            wrapped()
+        decorated = time.perf_counter_ns() - start
+
+        start = time.perf_counter_ns()
+        for _ in loop:
+            with span("overhead"):
+                bare()
+        spanned = time.perf_counter_ns() - start
+    finally:
+        enable(was_enabled)
+    return {
+        "timed() ns/call": (decorated - base) / calls,
+        "span() ns/call": (spanned - base) / calls,
+    }
+
+
+if __name__ == "__main__":
+    for label, ns in measure_overhead().items():
+        print(f"{label}: {ns:.1f}")
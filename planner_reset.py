@@ -0,0 +1,250 @@
+"""Background daily reset for every user's Wellness Planner.
+
+Completion flags used to be cleared when a user first opened the planner
+each day, which put the reset in the request path. ResetScheduler instead
+wakes every `interval` seconds and calls run_daily_reset(), which walks all
+planners in parallel batches and clears the flags of any user whose tasks
+were last reset before midnight in that user's time zone. Page loads only
+read the result.
+
+Timestamps in the planner files are naive server-local times, as written by
+the app; they are converted to each user's zone before comparing dates.
+
+Each reset is a store.modify_tasks() call, so a checkbox ticked while the
+planner is being reset is applied after it rather than lost. Only one
+scheduler per data directory runs resets: the others wait on its lock file
+and take over if its process exits.
+
+    python planner_reset.py bench --users 50000   # rollover time and peak memory
+"""
+
+import logging
+import os
+import resource
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+import pools
+from storage import acquire_file_lock
+
+logger = logging.getLogger(__name__)
+
+
+def _zone(name, default):
+    if not name:
+        return default
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        return default
+
+
+def reset_user(store, username, now, tz):
+    """Reset one user's planner if it is stale; returns (reset?, local date)."""
+    today = now.astimezone(tz).date()
+    server_tz = datetime.now().astimezone().tzinfo
+
+    def stale(value):
+        # Unparseable timestamps count as stale instead of skipping the reset.
+        try:
+            last = datetime.fromisoformat(value)
+        except (TypeError, ValueError):
+            return True
+        if last.tzinfo is None:
+            last = last.replace(tzinfo=server_tz)
+        return last.astimezone(tz).date() != today
+
+    def reset(df):
+        # At the day boundary the first row is already stale, so this stops
+        # after one parse; planners are small, and pandas' per-call overhead
+        # would cost more than the loop.
+        if not any(map(stale, df['last_updated'])):
+            return None
+        df['completed'] = False
+        df['last_updated'] = now.astimezone(server_tz).replace(tzinfo=None).isoformat()
+        return df
+
+    return store.modify_tasks(username, reset) is not None, today
+
+
+def _peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _reset_batch(store, batch, now):
+    # Module-level so it can be shipped to process-pool workers.
+    resets = 0
+    checked = []
+    for username, tz in batch:
+        try:
+            was_reset, today = reset_user(store, username, now, tz)
+        except Exception:
+            logger.exception("Daily reset failed for %s", username)
+            continue
+        checked.append((username, today))
+        resets += was_reset
+    return resets, checked, _peak_rss_mb()
+
+
+def run_daily_reset(store, now=None, workers=None, batch_size=500, default_tz=None, checked_on=None,
+                    executor="process"):
+    """Reset every stale planner; returns counts and elapsed seconds.
+
+    Batches of batch_size users run on a process pool by default, since
+    reading and rewriting planners is CPU-bound pandas work that threads
+    cannot overlap; pass executor="thread" to stay in-process.
+
+    checked_on maps username -> the local date that user was last found up
+    to date; users already checked today are skipped, and the dict is
+    updated in place so a long-running scheduler re-reads each planner at
+    most once per day.
+    """
+    start = time.perf_counter()
+    now = now or datetime.now(timezone.utc)
+    default_tz = default_tz or datetime.now().astimezone().tzinfo
+    checked_on = {} if checked_on is None else checked_on
+    zones = store.user_timezones()
+
+    due = []
+    for username in store.list_planner_users():
+        tz = _zone(zones.get(username), default_tz)
+        if checked_on.get(username) != now.astimezone(tz).date():
+            due.append((username, tz))
+
+    resets = 0
+    worker_rss = 0.0
+    if due:
+        batches = [due[i:i + batch_size] for i in range(0, len(due), batch_size)]
+        with pools.executor(executor, workers, thread_name_prefix="planner-reset") as pool:
+            for batch_resets, checked, rss in pool.map(_reset_batch, [store] * len(batches), batches,
+                                                       [now] * len(batches)):
+                resets += batch_resets
+                checked_on.update(checked)
+                worker_rss = max(worker_rss, rss)
+    return {"checked": len(due), "reset": resets, "seconds": time.perf_counter() - start,
+            "worker_peak_rss_mb": round(worker_rss, 1)}
+
+
+class ResetScheduler:
+    """Runs run_daily_reset() on a daemon thread every `interval` seconds.
+
+    The default interval of 15 minutes lands close to midnight in every
+    time zone, including those offset by 30 or 45 minutes.
+    """
+
+    def __init__(self, store, interval=900, workers=None, batch_size=500):
+        self.store = store
+        self.interval = interval
+        self.workers = workers
+        self.batch_size = batch_size
+        self.last_run = None
+        self._leader_fd = None
+        self._checked_on = {}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="planner-reset-scheduler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        if self._leader_fd is not None:
+            os.close(self._leader_fd)
+            self._leader_fd = None
+
+    @property
+    def is_leader(self):
+        return self._leader_fd is not None
+
+    def _lead(self):
+        # Held until the process exits; another replica's scheduler then
+        # gets it on its next wake-up.
+        if self._leader_fd is None:
+            self._leader_fd = acquire_file_lock(self.store.lock_file("reset-scheduler"), blocking=False)
+        return self._leader_fd is not None
+
+    def _run(self):
+        while not self._stop.is_set():
+            if self._lead():
+                try:
+                    self.last_run = run_daily_reset(
+                        self.store, workers=self.workers, batch_size=self.batch_size, checked_on=self._checked_on
+                    )
+                except Exception:
+                    logger.exception("Daily planner reset run failed")
+            self._stop.wait(self.interval)
+
+
+# ---------- Benchmark ----------
+def seed_planners(store, users, tasks, day, seed=0):
+    """Give `users` users `tasks` tasks each, all last reset on `day`; returns usernames."""
+    import random
+
+    from storage import TASK_COLUMNS, CSVStorage
+
+    rng = random.Random(seed)
+    stamp = datetime.combine(day, datetime.min.time()).replace(hour=12).isoformat()
+    names = [f"rollover_user_{i}" for i in range(users)]
+    if isinstance(store, CSVStorage):
+        # Plain writes; to_csv per file would dominate the setup time.
+        header = ",".join(TASK_COLUMNS) + "\n"
+        for name in names:
+            with open(store.planner_file(name), "w", encoding="utf-8") as f:
+                f.write(header + "".join(f"Task {j},{rng.random() < 0.5},{stamp},{stamp}\n" for j in range(tasks)))
+    else:
+        from storage import UPSERT_TASK
+        with store._conn() as conn:
+            conn.executemany(UPSERT_TASK, [
+                (name, j, f"Task {j}", int(rng.random() < 0.5), stamp, stamp) for name in names for j in range(tasks)
+            ])
+    return names
+
+
+def rollover(store, users, tasks=5, workers=None, batch_size=500, executor="process"):
+    """Seed planners last reset yesterday, then reset them all; returns timings and peak RSS."""
+    start = time.perf_counter()
+    seed_planners(store, users, tasks, (datetime.now() - timedelta(days=1)).date())
+    seeded = time.perf_counter() - start
+    rss_before = _peak_rss_mb()
+    result = run_daily_reset(store, workers=workers, batch_size=batch_size, executor=executor)
+    return {
+        "users": users,
+        "seed (s)": round(seeded, 2),
+        "reset (s)": round(result["seconds"], 2),
+        "reset": result["reset"],
+        "ms per user": round(result["seconds"] * 1000 / max(users, 1), 2),
+        "peak RSS, scheduler (MB)": round(_peak_rss_mb(), 1),
+        "RSS growth, scheduler (MB)": round(_peak_rss_mb() - rss_before, 1),
+        "peak RSS, worker (MB)": result["worker_peak_rss_mb"],
+    }
+
+
+def main(argv=None):
+    import argparse
+    import tempfile
+
+    from storage import CSVStorage, SQLiteStorage
+
+    parser = argparse.ArgumentParser(description="Planner reset tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+    bench_p = sub.add_parser("bench", help="reset time and peak memory for a day rollover")
+    bench_p.add_argument("--users", type=int, default=50_000)
+    bench_p.add_argument("--tasks", type=int, default=5)
+    bench_p.add_argument("--backend", choices=["csv", "sqlite"], default="csv")
+    bench_p.add_argument("--workers", type=int)
+    bench_p.add_argument("--executor", choices=["process", "thread"], default="process")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as root:
+        store = CSVStorage(root) if args.backend == "csv" else SQLiteStorage(os.path.join(root, "bench.db"))
+        result = rollover(store, args.users, args.tasks, args.workers, executor=args.executor)
+    for key, value in result.items():
+        print(f"{key}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Resource pools shared by the storage, session and background modules.
+
+ConnectionPool hands out sqlite3 connections to whichever thread asks.
+Streamlit runs every rerun on a new ScriptRunner thread, so a connection per
+thread would open a fresh connection on almost every rerun and never close
+the old ones. The pool keeps at most `size` connections and lends one out for
+the length of a `with` block, which commits on success and rolls back on
+error, like `with sqlite3.Connection`.
+
+executor() builds the worker pools used by the planner reset, the login
+KDF and the analytics scan: a thread pool, or a process pool whose workers
+start from a clean forkserver.
+"""
+
+import multiprocessing
+import queue
+import sqlite3
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
+
+
+class ConnectionPool:
+    def __init__(self, path, size=8, timeout=30):
+        self.path = path
+        self.size = size
+        self.timeout = timeout
+        self.created = 0
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=self.timeout, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _checkout(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            grow = self.created < self.size
+            if grow:
+                self.created += 1
+        if grow:
+            try:
+                return self._connect()
+            except Exception:
+                with self._lock:
+                    self.created -= 1
+                raise
+        return self._idle.get()  # every connection is busy; wait for one
+
+    @contextmanager
+    def connection(self):
+        conn = self._checkout()
+        try:
+            with conn:
+                yield conn
+        finally:
+            self._idle.put(conn)
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+def executor(kind, workers=None, thread_name_prefix=""):
+    """A ThreadPoolExecutor for kind="thread", otherwise a ProcessPoolExecutor."""
+    if kind == "thread":
+        return ThreadPoolExecutor(max_workers=workers, thread_name_prefix=thread_name_prefix)
+    # Forking a process that is running Streamlit's threads is unsafe, so
+    # workers start from a clean forkserver (or spawn where that is missing).
+    method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context(method))
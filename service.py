@@ -0,0 +1,458 @@
+"""Headless JSON-over-HTTP service for the dashboard's calculators.
+
+    python service.py --port 8600 --workers 16
+    python service.py bench --concurrency 1 8 32 128   # throughput and p99
+
+Endpoints (POST a JSON object, or a list of objects for a batch; the reply
+has the same shape):
+
+    /ibw             {"height": "5'7" | "height_in": 67, "gender": "male"}
+    /caloric-needs   {"height": "170 cm" | "height_cm": 170, "weight": 70, "age": 30, "gender": "female"}
+    /exercise-plan   {"goal": "Muscle Gain"}
+    /symptom-score   {"symptoms": ["fever", "cold"]}   (names from the symptom catalog)
+
+GET /health returns batching statistics. Requests run on a bounded thread
+pool. Items arriving within max_wait_ms of each other are micro-batched and
+scored together with the vectorized functions in calculations.py; symptoms
+are scored with the Symptom Checker's catalog (symptoms.py). Invalid
+items come back as {"error": "..."}; a single invalid item gets HTTP 400.
+
+Connections are kept alive (HTTP/1.1), and a kept-alive connection holds
+its pool worker until it closes. So a connection idle for longer than
+--idle-timeout is dropped, and while other connections are waiting for a
+worker every reply carries "Connection: close".
+
+"bench" starts the service in a subprocess and drives it with keep-alive
+clients at each concurrency level, reporting throughput and p50/p99 latency.
+"""
+
+import argparse
+import functools
+import http.client
+import json
+import logging
+import queue
+import socket
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import numpy as np
+
+from calculations import (
+    bmr_batch, caloric_needs_batch, exercise_plan, ideal_body_weight_batch, parse_heights,
+)
+from symptoms import load_catalog
+
+logger = logging.getLogger(__name__)
+
+
+class ItemError(ValueError):
+    """An input item is invalid; the message is returned to the client."""
+
+
+# ---------- Batch Scorers ----------
+def _heights(items, column, unit):
+    """Numeric heights for items, taken from `column` or parsed from "height"."""
+    values = np.full(len(items), np.nan)
+    errors = [None] * len(items)
+    text_rows = []
+    for i, item in enumerate(items):
+        if column in item:
+            try:
+                values[i] = float(item[column])
+            except (TypeError, ValueError):
+                errors[i] = f"{column} must be a number"
+        elif "height" in item:
+            text_rows.append(i)
+        else:
+            errors[i] = f"height or {column} is required"
+    if text_rows:
+        parsed = parse_heights([str(items[i]["height"]) for i in text_rows])
+        for i, value, error in zip(text_rows, parsed[unit], parsed["error"]):
+            if isinstance(error, str):
+                errors[i] = f"Cannot parse height: {error}"
+            else:
+                values[i] = value
+    _reject_non_finite(values, errors, "height")
+    return values, errors
+
+
+def _reject_non_finite(values, errors, field):
+    # NaN and infinity parse as floats but break int() and JSON replies.
+    for i in np.flatnonzero(~np.isfinite(values)):
+        errors[i] = errors[i] or f"{field} must be a finite number"
+
+
+def _numbers(items, field, errors):
+    values = np.full(len(items), np.nan)
+    for i, item in enumerate(items):
+        try:
+            values[i] = float(item[field])
+        except KeyError:
+            errors[i] = errors[i] or f"{field} is required"
+        except (TypeError, ValueError):
+            errors[i] = errors[i] or f"{field} must be a number"
+    _reject_non_finite(values, errors, field)
+    return values
+
+
+def _genders(items, errors):
+    genders = []
+    for i, item in enumerate(items):
+        gender = item.get("gender")
+        if gender not in ("male", "female"):
+            errors[i] = errors[i] or 'gender must be "male" or "female"'
+        genders.append(gender)
+    return np.asarray(genders, dtype=object)
+
+
+def score_ibw(items):
+    height_in, errors = _heights(items, "height_in", "inches")
+    genders = _genders(items, errors)
+    ibw = ideal_body_weight_batch(height_in, genders)
+    _reject_non_finite(ibw, errors, "ibw_kg")
+    return [ItemError(e) if e else {"ibw_kg": round(float(v), 2)} for v, e in zip(ibw, errors)]
+
+
+def score_caloric_needs(items):
+    height_cm, errors = _heights(items, "height_cm", "cm")
+    weight = _numbers(items, "weight", errors)
+    age = _numbers(items, "age", errors)
+    genders = _genders(items, errors)
+    with np.errstate(over="ignore"):  # overflow becomes inf and is rejected below
+        bmr = bmr_batch(weight, height_cm, age, genders)
+        calories = caloric_needs_batch(weight, height_cm, age, genders)
+    _reject_non_finite(calories, errors, "caloric_needs")
+    return [
+        ItemError(e) if e else {"bmr": round(float(b), 2), "caloric_needs": int(c)}
+        for b, c, e in zip(bmr, calories, errors)
+    ]
+
+
+def score_exercise_plan(items):
+    results = []
+    for item in items:
+        try:
+            results.append({"goal": item["goal"], "plan": exercise_plan(item["goal"])})
+        except (KeyError, TypeError):
+            results.append(ItemError("goal must be one of the Exercise Planner goals"))
+    return results
+
+
+@functools.lru_cache(maxsize=None)
+def symptom_catalog():
+    """The Symptom Checker's catalog, loaded once per process."""
+    return load_catalog()
+
+
+def score_symptoms(items):
+    # Scored through the same catalog as the Symptom Checker page, so the
+    # weights and combination rules match what the dashboard shows.
+    catalog = symptom_catalog()
+    results = []
+    for item in items:
+        symptoms = item.get("symptoms")
+        if not isinstance(symptoms, list):
+            results.append(ItemError("symptoms must be a list"))
+            continue
+        unknown = [s for s in symptoms if not isinstance(s, str) or s not in catalog.ids]
+        if unknown:
+            results.append(ItemError(f"unknown symptoms: {', '.join(map(str, unknown))}"))
+            continue
+        results.append({"symptom_score": catalog.score(symptoms).score})
+    return results
+
+
+ENDPOINTS = {
+    "/ibw": score_ibw,
+    "/caloric-needs": score_caloric_needs,
+    "/exercise-plan": score_exercise_plan,
+    "/symptom-score": score_symptoms,
+}
+
+
+# ---------- Micro-batching ----------
+class MicroBatcher:
+    """Collects items from many requests and scores them in one call.
+
+    A batch is cut when max_batch items are waiting or max_wait_ms has
+    passed since its first item arrived.
+    """
+
+    def __init__(self, scorer, max_batch=1024, max_wait_ms=2.0):
+        self.scorer = scorer
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.batches = 0
+        self.items = 0
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name=f"batcher-{scorer.__name__}", daemon=True)
+        self._thread.start()
+
+    def submit(self, items):
+        """Queue items; returns a Future resolving to their results in order."""
+        future = Future()
+        self._queue.put((items, future))
+        return future
+
+    def _run(self):
+        while True:
+            pending = [self._queue.get()]
+            size = len(pending[0][0])
+            deadline = time.monotonic() + self.max_wait
+            while size < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    request = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                pending.append(request)
+                size += len(request[0])
+
+            items = [item for request_items, _ in pending for item in request_items]
+            try:
+                results = self.scorer(items)
+            except Exception as exc:
+                logger.exception("Batch scoring failed")
+                for _, future in pending:
+                    future.set_exception(exc)
+                continue
+            self.batches += 1
+            self.items += len(items)
+            start = 0
+            for request_items, future in pending:
+                future.set_result(results[start:start + len(request_items)])
+                start += len(request_items)
+
+
+# ---------- HTTP Server ----------
+class PooledHTTPServer(HTTPServer):
+    """HTTPServer that handles connections on a bounded thread pool."""
+
+    request_queue_size = 1024  # bursts are the point; don't reset them at accept()
+
+    def __init__(self, address, handler, workers=16, idle_timeout=5.0):
+        super().__init__(address, handler)
+        self.idle_timeout = idle_timeout
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="http-worker")
+        self.batchers = {path: MicroBatcher(scorer) for path, scorer in ENDPOINTS.items()}
+        self.waiting = 0  # accepted connections no worker has picked up yet
+        self._waiting_lock = threading.Lock()
+
+    def process_request(self, request, client_address):
+        with self._waiting_lock:
+            self.waiting += 1
+        self.pool.submit(self._handle, request, client_address)
+
+    def _handle(self, request, client_address):
+        with self._waiting_lock:
+            self.waiting -= 1
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        self.pool.shutdown(wait=True)
+
+
+class CalculatorHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; with Nagle on, the body
+    # waits for the client's delayed ACK (~40 ms) on every kept-alive reply.
+    disable_nagle_algorithm = True
+
+    @property
+    def timeout(self):
+        # Socket timeout while waiting for the next request on this connection.
+        return self.server.idle_timeout
+
+    def log_message(self, format, *args):
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+    def _reply(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        if self.server.waiting:
+            self.send_header("Connection", "close")  # free this worker for a waiting connection
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path != "/health":
+            self._reply(404, {"error": "not found"})
+            return
+        self._reply(200, {
+            path: {"batches": b.batches, "items": b.items}
+            for path, b in self.server.batchers.items()
+        })
+
+    def do_POST(self):
+        batcher = self.server.batchers.get(self.path)
+        if batcher is None:
+            self._reply(404, {"error": "not found"})
+            return
+        try:
+            payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+        except (ValueError, UnicodeDecodeError):
+            self._reply(400, {"error": "body must be JSON"})
+            return
+        single = isinstance(payload, dict)
+        items = [payload] if single else payload
+        if not isinstance(items, list) or not all(isinstance(item, dict) for item in items):
+            self._reply(400, {"error": "body must be an object or a list of objects"})
+            return
+
+        try:
+            results = batcher.submit(items).result() if items else []
+        except Exception:
+            # The batcher has logged it; this client still gets an answer.
+            self._reply(500, {"error": "internal error"})
+            return
+        results = [{"error": str(r)} if isinstance(r, ItemError) else r for r in results]
+        if single:
+            self._reply(400 if "error" in results[0] else 200, results[0])
+        else:
+            self._reply(200, results)
+
+
+# ---------- Load Generator ----------
+BENCH_REQUESTS = [
+    ("/ibw", {"height": "5'7", "gender": "male"}),
+    ("/caloric-needs", {"height": "170 cm", "weight": 70, "age": 30, "gender": "female"}),
+    ("/exercise-plan", {"goal": "Muscle Gain"}),
+    ("/symptom-score", {"symptoms": ["fever", "cold"]}),
+]
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_ready(port, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            conn.request("GET", "/health")
+            conn.getresponse().read()
+            conn.close()
+            return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.05)
+
+
+def _client(port, deadline, batch, latencies, counts):
+    """One keep-alive client sending requests back to back until deadline."""
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    i = 0
+    while time.monotonic() < deadline:
+        path, item = BENCH_REQUESTS[i % len(BENCH_REQUESTS)]
+        body = json.dumps(item if batch == 1 else [item] * batch).encode("utf-8")
+        i += 1
+        start = time.perf_counter()
+        try:
+            conn.request("POST", path, body, {"Content-Type": "application/json"})
+            response = conn.getresponse()
+            response.read()
+            ok = response.status == 200
+        except (OSError, http.client.HTTPException):
+            conn.close()  # reconnects on the next request
+            counts["errors"] += 1
+            continue
+        latencies.append(time.perf_counter() - start)
+        if not ok:
+            counts["errors"] += 1
+        if response.will_close:
+            counts["closed by server"] += 1
+    conn.close()
+
+
+def bench(concurrency=(1, 8, 32, 128), duration=5.0, workers=16, batch=1, idle_timeout=5.0):
+    """Throughput and latency percentiles for each number of concurrent clients."""
+    port = _free_port()
+    server = subprocess.Popen([sys.executable, __file__, "--port", str(port), "--workers", str(workers),
+                               "--idle-timeout", str(idle_timeout)])
+    results = []
+    try:
+        _wait_ready(port)
+        for clients in concurrency:
+            latencies, counts = [], {"errors": 0, "closed by server": 0}
+            deadline = time.monotonic() + duration
+            threads = [threading.Thread(target=_client, args=(port, deadline, batch, latencies, counts))
+                       for _ in range(clients)]
+            start = time.perf_counter()
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            elapsed = time.perf_counter() - start
+            latencies.sort()
+            pick = lambda q: round(latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1000, 2)  # noqa: E731
+            results.append({
+                "clients": clients,
+                "requests": len(latencies),
+                "items/s": round(len(latencies) * batch / elapsed, 1),
+                "p50 (ms)": pick(0.50) if latencies else None,
+                "p99 (ms)": pick(0.99) if latencies else None,
+                **counts,
+            })
+    finally:
+        server.terminate()
+        server.wait()
+    return results
+
+
+def bench_main(argv):
+    parser = argparse.ArgumentParser(prog="service.py bench", description="Load-test the calculator service")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32, 128])
+    parser.add_argument("--duration", type=float, default=5.0, help="seconds per concurrency level")
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--batch", type=int, default=1, help="items per request")
+    parser.add_argument("--idle-timeout", type=float, default=5.0)
+    args = parser.parse_args(argv)
+    for row in bench(args.concurrency, args.duration, args.workers, args.batch, args.idle_timeout):
+        print(", ".join(f"{key}: {value}" for key, value in row.items()))
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ["bench"]:
+        return bench_main(argv[1:])
+    parser = argparse.ArgumentParser(description="Run the calculators as a JSON HTTP service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8600)
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--idle-timeout", type=float, default=5.0,
+                        help="seconds a keep-alive connection may sit idle before it is closed")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    server = PooledHTTPServer((args.host, args.port), CalculatorHandler, workers=args.workers,
+                              idle_timeout=args.idle_timeout)
+    logger.info("Serving calculators on http://%s:%d", args.host, args.port)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
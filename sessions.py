@@ -0,0 +1,273 @@
+"""Session state that survives reconnecting to another Streamlit process.
+
+The wellness scores used to live only in st.session_state, so a user who
+reconnected to a different replica started over. The app now saves them in
+a SessionStore under a random session id. It hands the browser a signed
+token (session id + HMAC) in the URL query string. A process that sees an
+unknown session restores it from the token. The login is not saved, since
+anyone holding the URL could reuse it.
+
+MemorySessionStore keeps state in this process only, which matches the old
+behaviour. SQLiteSessionStore shares state between every process on the host
+through one WAL-mode database. A session expires max_idle seconds after it
+was last saved or loaded, and both stores sweep out expired sessions on a
+save at most every prune_interval seconds. Loads are read-through cached for
+cache_seconds, so a replica may serve state up to that old from another
+process. Its own writes are visible immediately.
+
+The backend is picked with HEALTH_CALC_SESSIONS ("memory" or "sqlite").
+Tokens are signed with HEALTH_CALC_SESSION_SECRET. If it is unset, the
+SQLite backend stores a random secret in the database so every replica
+agrees.
+
+    python sessions.py check --workers 4   # multi-process consistency/latency check
+"""
+
+import argparse
+import base64
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import threading
+import time
+
+from cache import LRUCache
+from pools import ConnectionPool
+
+SESSION_MAX_IDLE = 7 * 24 * 3600  # seconds; older sessions are forgotten
+SESSION_PRUNE_INTERVAL = 600  # seconds between sweeps for expired sessions
+
+SESSION_CACHE = LRUCache("sessions", max_entries=10_000, max_bytes=16 * 1024 * 1024)
+
+SESSION_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    sid TEXT PRIMARY KEY,
+    state TEXT NOT NULL,
+    updated REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS sessions_updated ON sessions (updated);
+CREATE TABLE IF NOT EXISTS session_meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+def new_session_id():
+    return secrets.token_urlsafe(16)
+
+
+class _Signer:
+    def __init__(self, secret):
+        self._secret = secret
+
+    def sign(self, sid):
+        """Token the browser carries: the session id plus its HMAC."""
+        mac = hmac.new(self._secret, sid.encode(), hashlib.sha256).digest()
+        return f"{sid}.{base64.urlsafe_b64encode(mac).rstrip(b'=').decode()}"
+
+    def verify(self, token):
+        """Session id from a token, or None if it is missing or forged."""
+        if not token or token.count(".") != 1:
+            return None
+        sid = token.split(".", 1)[0]
+        return sid if hmac.compare_digest(self.sign(sid), token) else None
+
+
+def _env_secret():
+    secret = os.environ.get("HEALTH_CALC_SESSION_SECRET")
+    return secret.encode() if secret else None
+
+
+class MemorySessionStore(_Signer):
+    """Sessions held in this process; lost on restart and not shared."""
+
+    def __init__(self, max_idle=SESSION_MAX_IDLE, prune_interval=SESSION_PRUNE_INTERVAL):
+        super().__init__(_env_secret() or secrets.token_bytes(32))
+        self.max_idle = max_idle
+        self.prune_interval = prune_interval
+        self._sessions = {}
+        self._lock = threading.Lock()
+        self._last_prune = time.time()
+
+    def load(self, sid):
+        now = time.time()
+        with self._lock:
+            entry = self._sessions.get(sid)
+            if entry is None or now - entry[0] > self.max_idle:
+                return None
+            # A load counts as use, so max_idle runs from the last visit.
+            self._sessions[sid] = (now, entry[1])
+        return json.loads(entry[1])
+
+    def save(self, sid, state):
+        # Stored as JSON so callers never share mutable state with the store.
+        now = time.time()
+        with self._lock:
+            self._sessions[sid] = (now, json.dumps(state))
+            if now - self._last_prune > self.prune_interval:
+                self._last_prune = now
+                expired = [key for key, (updated, _) in self._sessions.items() if now - updated > self.max_idle]
+                for key in expired:
+                    del self._sessions[key]
+
+    def delete(self, sid):
+        with self._lock:
+            self._sessions.pop(sid, None)
+
+
+class SQLiteSessionStore(_Signer):
+    """Sessions in a SQLite database shared by every process on the host."""
+
+    def __init__(self, path="sessions.db", max_idle=SESSION_MAX_IDLE, cache_seconds=1.0,
+                 prune_interval=SESSION_PRUNE_INTERVAL):
+        self.path = path
+        self.max_idle = max_idle
+        self.cache_seconds = cache_seconds
+        self.prune_interval = prune_interval
+        # A load refreshes `updated` only when it is at least this old, so
+        # most loads stay read-only.
+        self.touch_interval = min(60.0, max_idle / 10)
+        self._pool = ConnectionPool(path)
+        self._last_prune = time.time()
+        with self._conn() as conn:
+            conn.executescript(SESSION_SCHEMA)
+            conn.execute("DELETE FROM sessions WHERE updated < ?", (time.time() - max_idle,))
+            conn.execute(
+                "INSERT OR IGNORE INTO session_meta (key, value) VALUES ('secret', ?)",
+                (secrets.token_hex(32),),
+            )
+            stored = conn.execute("SELECT value FROM session_meta WHERE key = 'secret'").fetchone()[0]
+        super().__init__(_env_secret() or bytes.fromhex(stored))
+
+    def _conn(self):
+        # A connection lent from a pool shared by every thread, as in
+        # storage.SQLiteStorage.
+        return self._pool.connection()
+
+    def _cache_key(self, sid):
+        return (self.path, sid)
+
+    def load(self, sid):
+        now = time.time()
+        cached = SESSION_CACHE.get(self._cache_key(sid))
+        if cached is not None and now - cached[0] <= self.cache_seconds:
+            return json.loads(cached[1]) if cached[1] is not None else None
+        with self._conn() as conn:
+            # A load counts as use, so max_idle runs from the last visit.
+            conn.execute(
+                "UPDATE sessions SET updated = ? WHERE sid = ? AND updated BETWEEN ? AND ?",
+                (now, sid, now - self.max_idle, now - self.touch_interval),
+            )
+            row = conn.execute(
+                "SELECT state FROM sessions WHERE sid = ? AND updated >= ?", (sid, now - self.max_idle)
+            ).fetchone()
+        state = row[0] if row else None
+        SESSION_CACHE.put(self._cache_key(sid), (now, state))
+        return json.loads(state) if state is not None else None
+
+    def save(self, sid, state):
+        now = time.time()
+        encoded = json.dumps(state)
+        with self._conn() as conn:
+            conn.execute(
+                "INSERT INTO sessions (sid, state, updated) VALUES (?, ?, ?) "
+                "ON CONFLICT (sid) DO UPDATE SET state = excluded.state, updated = excluded.updated",
+                (sid, encoded, now),
+            )
+            if now - self._last_prune > self.prune_interval:
+                self._last_prune = now
+                conn.execute("DELETE FROM sessions WHERE updated < ?", (now - self.max_idle,))
+        SESSION_CACHE.put(self._cache_key(sid), (now, encoded))
+
+    def delete(self, sid):
+        with self._conn() as conn:
+            conn.execute("DELETE FROM sessions WHERE sid = ?", (sid,))
+        SESSION_CACHE.invalidate(self._cache_key(sid))
+
+
+def open_session_store():
+    """Return the backend selected by HEALTH_CALC_SESSIONS (default: memory)."""
+    backend = os.environ.get("HEALTH_CALC_SESSIONS", "memory").lower()
+    if backend == "memory":
+        return MemorySessionStore()
+    if backend == "sqlite":
+        return SQLiteSessionStore(os.environ.get("HEALTH_CALC_SESSION_DB", "sessions.db"))
+    raise ValueError(f"Unknown session backend: {backend!r}")
+
+
+# ---------- Multi-process Check ----------
+def _check_worker(path, worker, workers, rounds, sids):
+    """Each worker owns every workers-th session and reads all the others."""
+    store = SQLiteSessionStore(path, cache_seconds=0)
+    mismatches = 0
+    latencies = []
+    for r in range(rounds):
+        for i, sid in enumerate(sids):
+            if i % workers == worker:
+                store.save(sid, {"owner": worker, "round": r, "exercise_score": 25})
+        for i, sid in enumerate(sids):
+            start = time.perf_counter()
+            state = store.load(sid)
+            latencies.append((time.perf_counter() - start) * 1e6)
+            # Another worker may be a round ahead or behind, never inconsistent.
+            if state is not None and (state["exercise_score"] != 25 or state["owner"] != i % workers):
+                mismatches += 1
+    return mismatches, latencies
+
+
+def check(workers=4, sessions=200, rounds=20):
+    import tempfile
+    from concurrent.futures import ProcessPoolExecutor
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "sessions.db")
+        store = SQLiteSessionStore(path)
+        sids = [new_session_id() for _ in range(sessions)]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_check_worker, [path] * workers, range(workers), [workers] * workers,
+                                    [rounds] * workers, [sids] * workers))
+        mismatches = sum(m for m, _ in results)
+        final = [store.load(sid) for sid in sids]
+        stale = sum(s is None or s["round"] != rounds - 1 for s in final)
+        latencies = sorted(us for _, lat in results for us in lat)
+
+        cached = SQLiteSessionStore(path)
+        start = time.perf_counter()
+        for _ in range(10):
+            for sid in sids:
+                cached.load(sid)
+        cached_us = (time.perf_counter() - start) * 1e6 / (10 * len(sids))
+
+        token = store.sign(sids[0])
+        forged = store.verify(sids[1] + token[token.index("."):])
+    return {
+        "mismatches": mismatches,
+        "stale after run": stale,
+        "forged token accepted": forged is not None,
+        "uncached load p50 (us)": round(latencies[len(latencies) // 2], 1),
+        "uncached load p99 (us)": round(latencies[int(len(latencies) * 0.99)], 1),
+        "cached load mean (us)": round(cached_us, 2),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Shared session store tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+    check_p = sub.add_parser("check", help="run a multi-process consistency and latency check")
+    check_p.add_argument("--workers", type=int, default=4)
+    check_p.add_argument("--sessions", type=int, default=200)
+    check_p.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    result = check(args.workers, args.sessions, args.rounds)
+    for key, value in result.items():
+        print(f"{key}: {value}")
+    ok = not result["mismatches"] and not result["stale after run"] and not result["forged token accepted"]
+    raise SystemExit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,1334 @@
+"""Persistence backends for the Health Assistant Dashboard.
+
+CSVStorage keeps the original loose-file layout (users.csv,
+planner_<username>.csv, badges_<username>.csv and feedback.csv).
+SQLiteStorage keeps the same data in one WAL-mode database and writes
+planner rows with row-level upserts.
+
+Both backends accept row-level planner updates (update_tasks) and badge
+appends (add_badges), so callers only write what actually changed. The CSV
+backend records row updates in an append-only planner_<username>.journal
+that is replayed on load and folded back into the CSV once it grows past
+JOURNAL_COMPACT_BYTES. CSV reads are cached per file in DATA_CACHE and keyed
+by mtime and size, so an unchanged file is never parsed twice. Password
+rehashes are appended to users.csv (the last row for a user wins), and the
+file is rewritten once more than USERS_COMPACT_ROWS rows are superseded.
+
+Planner writes from the page and from the background reset (which runs in
+worker processes) are serialized per user: CSVStorage holds an flock on
+.locks/planner_<username>.lock, SQLiteStorage an IMMEDIATE transaction.
+modify_tasks() is the read-modify-write entry point for bulk changes.
+
+The backend is picked with the HEALTH_CALC_STORAGE environment variable
+("csv" or "sqlite"). Existing CSV data can be imported into SQLite with:
+
+    python storage.py migrate --csv-dir . --db health_calc.db
+    python storage.py bench-login --users 1000 100000 1000000
+    python storage.py bench-backends --sessions 16   # CSV vs SQLite p50/p99
+    python storage.py bench-feedback --rows 1000000  # time to first feedback page
+"""
+
+import argparse
+import csv
+import fcntl
+import glob
+import hashlib
+import json
+import os
+import pickle
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+from array import array
+from collections import Counter
+from contextlib import contextmanager
+from typing import NamedTuple, Optional
+
+import pandas as pd
+
+from cache import LRUCache
+from pools import ConnectionPool
+
+TASK_COLUMNS = ["task", "completed", "timestamp", "last_updated"]
+BADGE_COLUMNS = ["badge", "date"]
+FEEDBACK_COLUMNS = ["Name", "Rating", "Comment"]
+RATINGS = range(1, 6)
+JOURNAL_COMPACT_BYTES = 64 * 1024
+USERS_COMPACT_ROWS = 1000  # superseded password rows tolerated in users.csv
+# (prefix, suffix) of the per-user files that feed the admin analytics.
+_USER_FILES = (("planner_", ".csv"), ("planner_", ".journal"), ("badges_", ".csv"))
+
+DATA_CACHE = LRUCache("data files", max_entries=512, max_bytes=128 * 1024 * 1024)
+
+
+class CorruptedStoreError(Exception):
+    """Raised when a backing file is missing the columns we need."""
+
+
+class UserExistsError(Exception):
+    """Raised by add_user when the username is already registered."""
+
+
+def acquire_file_lock(path, blocking=True, shared=False):
+    """An fd holding an flock on path, or None if blocking=False and it is taken.
+
+    flock locks belong to the open file, so they exclude other threads of
+    this process as well as other processes, and are not reentrant. Closing
+    the fd releases it.
+    """
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(fd, (fcntl.LOCK_SH if shared else fcntl.LOCK_EX) | (0 if blocking else fcntl.LOCK_NB))
+    except BlockingIOError:
+        os.close(fd)
+        return None
+    except BaseException:
+        os.close(fd)
+        raise
+    return fd
+
+
+@contextmanager
+def file_lock(path, shared=False):
+    fd = acquire_file_lock(path, shared=shared)
+    try:
+        yield
+    finally:
+        os.close(fd)
+
+
+def _file_version(*paths):
+    version = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            version.append(None)
+        else:
+            version.append((stat.st_mtime_ns, stat.st_size))
+    return tuple(version)
+
+
+def _to_bool(value):
+    if isinstance(value, str):
+        return value.strip().lower() == "true"
+    return bool(value) if pd.notna(value) else False
+
+
+class FeedbackPage(NamedTuple):
+    rows: pd.DataFrame
+    total: Optional[int]  # None when a text search makes the count unknown
+    has_more: bool
+
+
+def _summary(histogram):
+    count = sum(histogram.values())
+    total = sum(rating * n for rating, n in histogram.items())
+    return {
+        "count": count,
+        "average": total / count if count else 0.0,
+        "histogram": {rating: histogram.get(rating, 0) for rating in RATINGS},
+    }
+
+
+class FeedbackIndex:
+    """Row-offset index over feedback.csv.
+
+    Only the bytes appended since the last refresh are scanned, and the
+    per-rating row lists and histogram are updated as rows are indexed, so a
+    page of results costs a handful of seeks however large the file is.
+
+    A scan finds record boundaries and ratings with NumPy over 16 MB blocks;
+    only rows whose name is quoted or whose rating is not a single digit go
+    through the csv module. The index is saved next to the file (<path>.idx)
+    every SAVE_EVERY_BYTES of new data, so a restart or another replica loads
+    it and scans only the tail. The unfiltered first pages never wait for a
+    scan: they are read straight from the head of the file.
+    """
+
+    SCAN_BLOCK = 16 * 1024 * 1024
+    SAVE_EVERY_BYTES = 1024 * 1024
+    HEAD_ROWS = 1000  # unfiltered pages within this many rows skip the index
+    _FINGERPRINT_BYTES = 4096
+
+    def __init__(self, path, index_path=None):
+        self.path = path
+        self.index_path = f"{path}.idx" if index_path is None else index_path
+        self._lock = threading.Lock()
+        self._reset()
+        self._saved_bytes = 0
+        self._loaded = False
+
+    def _reset(self):
+        self.offsets = array("q")
+        self.by_rating = {rating: array("q") for rating in RATINGS}
+        self.histogram = Counter()
+        self.indexed_bytes = 0
+        self.columns = None
+
+    @staticmethod
+    def _read_record(f):
+        """Read one CSV record (quoted fields may span lines) as raw bytes."""
+        record = f.readline()
+        if not record.endswith(b"\n"):
+            return record
+        while record.count(b'"') % 2:
+            line = f.readline()
+            record += line
+            if not line.endswith(b"\n"):
+                break
+        return record
+
+    def _parse(self, record):
+        fields = next(csv.reader([record.decode("utf-8")]))
+        return dict(zip(self.columns, fields))
+
+    # Persistence
+    def _fingerprint(self, f, end):
+        # The first and last indexed bytes; a replaced file will not match.
+        f.seek(0)
+        head = f.read(min(end, self._FINGERPRINT_BYTES))
+        f.seek(max(0, end - self._FINGERPRINT_BYTES))
+        tail = f.read(min(end, self._FINGERPRINT_BYTES))
+        return hashlib.sha1(head + tail).hexdigest()
+
+    def _load(self):
+        self._loaded = True
+        try:
+            with open(self.index_path, "rb") as f:
+                saved = pickle.load(f)
+            with open(self.path, "rb") as f:
+                if os.fstat(f.fileno()).st_size < saved["indexed_bytes"] or \
+                        self._fingerprint(f, saved["indexed_bytes"]) != saved["fingerprint"]:
+                    return
+        except (OSError, EOFError, KeyError, pickle.UnpicklingError):
+            return
+        self.offsets = saved["offsets"]
+        self.by_rating = saved["by_rating"]
+        self.histogram = saved["histogram"]
+        self.indexed_bytes = self._saved_bytes = saved["indexed_bytes"]
+        self.columns = saved["columns"]
+
+    def _save(self):
+        with open(self.path, "rb") as f:
+            fingerprint = self._fingerprint(f, self.indexed_bytes)
+        tmp = f"{self.index_path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp, "wb") as f:
+                pickle.dump({
+                    "fingerprint": fingerprint, "indexed_bytes": self.indexed_bytes, "columns": self.columns,
+                    "offsets": self.offsets, "by_rating": self.by_rating, "histogram": self.histogram,
+                }, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, self.index_path)
+        except OSError:
+            return  # a read-only data directory just means no persisted index
+        self._saved_bytes = self.indexed_bytes
+
+    # Indexing
+    def refresh(self):
+        with self._lock:
+            if not self._loaded:
+                self._load()
+            if not os.path.exists(self.path):
+                self._reset()
+                return
+            size = os.path.getsize(self.path)
+            if size < self.indexed_bytes:
+                self._reset()  # the file was truncated or replaced
+            if size == self.indexed_bytes:
+                return
+            with open(self.path, "rb") as f:
+                if self.columns is None:
+                    header = self._read_record(f)
+                    if not header.endswith(b"\n"):
+                        return
+                    self.columns = next(csv.reader([header.decode("utf-8")]))
+                    self.indexed_bytes = f.tell()
+                while self._scan_block(f):
+                    pass
+            if self.indexed_bytes - self._saved_bytes >= self.SAVE_EVERY_BYTES:
+                self._save()
+
+    def _scan_block(self, f):
+        """Index the complete records in the next block; False when done."""
+        import numpy as np
+
+        block = self.SCAN_BLOCK
+        while True:
+            f.seek(self.indexed_bytes)
+            data = f.read(block)
+            buf = np.frombuffer(data, dtype=np.uint8)
+            newlines = np.flatnonzero(buf == ord("\n"))
+            quotes = np.flatnonzero(buf == ord('"'))
+            # A newline ends a record when an even number of quotes precede it.
+            ends = newlines[(np.searchsorted(quotes, newlines) & 1) == 0]
+            if len(ends) or len(data) < block:
+                break
+            block *= 2  # one record longer than the block
+        if not len(ends):
+            return False  # end of file, or a row still being written
+        starts = np.concatenate(([0], ends[:-1] + 1))
+
+        ratings = np.zeros(len(starts), dtype=np.int64)
+        column = self.columns.index("Rating") if "Rating" in self.columns else None
+        if column is not None:
+            # The rating sits between the column-th and (column+1)-th commas
+            # when no quote comes before it and it is one digit long.
+            commas = np.flatnonzero(buf == ord(","))
+            first = np.searchsorted(commas, starts)
+            before = first + column - 1
+            after = first + column
+            usable = after < len(commas)
+            field_end = commas[np.minimum(after, len(commas) - 1)] if len(commas) else starts
+            field_start = starts if column == 0 else (
+                commas[np.clip(before, 0, len(commas) - 1)] + 1 if len(commas) else starts)
+            usable &= field_end < ends
+            usable &= np.searchsorted(quotes, field_end) == np.searchsorted(quotes, starts)
+            usable &= field_end - field_start == 1
+            digit = buf[np.minimum(field_start, len(buf) - 1)].astype(np.int64) - ord("0")
+            fast = usable & (digit >= 1) & (digit <= 5)
+            ratings[fast] = digit[fast]
+            for i in np.flatnonzero(~fast):
+                # Quoted names, odd ratings: let the csv module decide.
+                try:
+                    rating = int(self._parse(data[starts[i]:ends[i] + 1]).get("Rating", ""))
+                except ValueError:
+                    continue
+                ratings[i] = rating if rating in self.by_rating else 0
+
+        first_row = len(self.offsets)
+        self.offsets.frombytes((starts + self.indexed_bytes).astype(np.int64).tobytes())
+        for rating in RATINGS:
+            rows = np.flatnonzero(ratings == rating)
+            if len(rows):
+                self.by_rating[rating].frombytes((rows + first_row).astype(np.int64).tobytes())
+                self.histogram[rating] += len(rows)
+        self.indexed_bytes += int(ends[-1]) + 1
+        return True
+
+    def summary(self):
+        self.refresh()
+        return _summary(self.histogram)
+
+    def _head_page(self, f, offset, limit):
+        # Rows offset..offset+limit (plus one look-ahead) read from the start
+        # of the file, for when the index has not been built yet.
+        header = self._read_record(f)
+        if self.columns is None:
+            self.columns = next(csv.reader([header.decode("utf-8")]))
+        records = []
+        for row in range(offset + limit + 1):
+            record = self._read_record(f)
+            if not record.endswith(b"\n"):
+                break
+            if row >= offset:
+                records.append(self._parse(record))
+        has_more = len(records) > limit
+        return FeedbackPage(_feedback_frame(records[:limit]), None, has_more)
+
+    def query(self, rating=None, search=None, offset=0, limit=50):
+        with open(self.path, "rb") as f:
+            if rating is None and not search:
+                # Appends never move earlier rows, so an index that already
+                # covers this page can serve it without catching up first.
+                with self._lock:
+                    if not self._loaded:
+                        self._load()
+                    size = os.fstat(f.fileno()).st_size
+                    covered = len(self.offsets) > offset + limit and size >= self.indexed_bytes
+                    current = size == self.indexed_bytes
+                    indexed = self.indexed_bytes > 0
+                if not covered and not indexed and offset + limit <= self.HEAD_ROWS:
+                    return self._head_page(f, offset, limit)
+                if not covered:
+                    self.refresh()
+                    current = True
+                page = self.offsets[offset:offset + limit]
+                records = []
+                for row in page:
+                    f.seek(row)
+                    records.append(self._parse(self._read_record(f)))
+                total = len(self.offsets) if current else None
+                has_more = offset + limit < len(self.offsets)
+                return FeedbackPage(_feedback_frame(records), total, has_more)
+            self.refresh()
+            if search:
+                return self._search(f, rating, search.lower(), offset, limit)
+            rows = self.by_rating.get(rating, array("q"))
+            page = rows[offset:offset + limit]
+            records = []
+            for row in page:
+                f.seek(self.offsets[row])
+                records.append(self._parse(self._read_record(f)))
+            return FeedbackPage(_feedback_frame(records), len(rows), offset + limit < len(rows))
+
+    def _search(self, f, rating, needle, offset, limit):
+        # Comments are not kept in memory, so a text search streams the file
+        # and stops as soon as the page (plus one look-ahead row) is filled.
+        records = []
+        skipped = 0
+        if self.offsets:
+            f.seek(self.offsets[0])
+        for _ in range(len(self.offsets)):
+            record = self._parse(self._read_record(f))
+            if rating is not None and record.get("Rating") != str(rating):
+                continue
+            if needle not in record.get("Comment", "").lower():
+                continue
+            if skipped < offset:
+                skipped += 1
+                continue
+            if len(records) == limit:
+                return FeedbackPage(_feedback_frame(records), None, True)
+            records.append(record)
+        return FeedbackPage(_feedback_frame(records), None, False)
+
+
+def _feedback_frame(records):
+    df = pd.DataFrame(records, columns=FEEDBACK_COLUMNS)
+    df["Rating"] = pd.to_numeric(df["Rating"], errors="coerce")
+    return df
+
+
+# ---------- CSV Backend ----------
+class CSVStorage:
+    def __init__(self, root="."):
+        self.root = root
+        self.users_file = os.path.join(root, "users.csv")
+        self.feedback_file = os.path.join(root, "feedback.csv")
+        self.timezones_file = os.path.join(root, "timezones.csv")
+        self._lock = threading.Lock()
+        self._user_index = None
+        self._user_index_key = None
+        self._user_rows = 0
+        self._feedback_index = FeedbackIndex(self.feedback_file)
+
+    def __getstate__(self):
+        # Locks and in-memory indexes stay behind when the backend is sent to
+        # a worker process; the copy rebuilds them on first use.
+        return {"root": self.root}
+
+    def __setstate__(self, state):
+        self.__init__(state["root"])
+
+    def planner_file(self, username):
+        return os.path.join(self.root, f"planner_{username}.csv")
+
+    def journal_file(self, username):
+        return os.path.join(self.root, f"planner_{username}.journal")
+
+    def badges_file(self, username):
+        return os.path.join(self.root, f"badges_{username}.csv")
+
+    def lock_file(self, name):
+        """Path of the lock file `name`, shared by every process using this directory."""
+        locks = os.path.join(self.root, ".locks")
+        os.makedirs(locks, exist_ok=True)
+        return os.path.join(locks, f"{name}.lock")
+
+    def badge_counters_file(self, username):
+        return os.path.join(self.root, f"badgestats_{username}.json")
+
+    # Users
+    def _users(self):
+        with self._lock:
+            return self._users_locked()
+
+    def _users_locked(self):
+        # The {username: hash} index is rebuilt only when users.csv's mtime or
+        # size changes, so lookups stay O(1) however many users exist.
+        if not os.path.exists(self.users_file):
+            return {}
+        stat = os.stat(self.users_file)
+        key = (stat.st_mtime_ns, stat.st_size)
+        if self._user_index_key != key:
+            # dtype=object keeps plain str cells; pandas' string dtype is
+            # several times slower to turn into a dict.
+            df = pd.read_csv(self.users_file, dtype=object, keep_default_na=False)
+            if 'username' in df.columns and 'password' in df.columns:
+                self._user_index = dict(zip(df['username'].tolist(), df['password'].tolist()))
+            else:
+                self._user_index = None
+            self._user_index_key = key
+            self._user_rows = len(df)
+        if self._user_index is None:
+            raise CorruptedStoreError("users.csv is missing the username/password columns")
+        return self._user_index
+
+    def get_password_hash(self, username):
+        return self._users().get(username)
+
+    def add_user(self, username, hashed_pw):
+        with self._lock, file_lock(self.lock_file("users")):
+            if username in self._users_locked():
+                raise UserExistsError(username)
+            self._append_user(username, hashed_pw)
+
+    def update_password(self, username, hashed_pw):
+        # Later rows win when users.csv is indexed, so an append is enough,
+        # until superseded rows pile up past USERS_COMPACT_ROWS.
+        with self._lock, file_lock(self.lock_file("users")):
+            self._append_user(username, hashed_pw)
+            users = self._users_locked()
+            if self._user_rows - len(users) > USERS_COMPACT_ROWS:
+                self._compact_users(users)
+
+    def _compact_users(self, users):
+        # Caller holds self._lock and the users file lock, so no other
+        # process appends while the file is rewritten.
+        tmp = f"{self.users_file}.tmp"
+        pd.DataFrame(list(users.items()), columns=["username", "password"]).to_csv(tmp, index=False)
+        os.replace(tmp, self.users_file)
+        stat = os.stat(self.users_file)
+        self._user_index_key = (stat.st_mtime_ns, stat.st_size)
+        self._user_rows = len(users)
+
+    def _append_user(self, username, hashed_pw):
+        # Caller holds self._lock and the users file lock.
+        df = pd.DataFrame([[username, hashed_pw]], columns=["username", "password"])
+        if os.path.exists(self.users_file):
+            stat = os.stat(self.users_file)
+            fresh = self._user_index_key == (stat.st_mtime_ns, stat.st_size)
+            df.to_csv(self.users_file, mode='a', header=False, index=False)
+        else:
+            fresh = False
+            df.to_csv(self.users_file, index=False)
+        if fresh and self._user_index is not None:
+            # Patch the index in place instead of re-reading the whole file.
+            stat = os.stat(self.users_file)
+            self._user_index[username] = hashed_pw
+            self._user_index_key = (stat.st_mtime_ns, stat.st_size)
+            self._user_rows += 1
+
+    def user_timezones(self):
+        """{username: IANA time zone name} for users who picked one."""
+        if not os.path.exists(self.timezones_file):
+            return {}
+        version = _file_version(self.timezones_file)
+        zones = DATA_CACHE.get(self.timezones_file, version)
+        if zones is None:
+            df = pd.read_csv(self.timezones_file, dtype=str, keep_default_na=False)
+            zones = dict(zip(df['username'], df['timezone']))
+            DATA_CACHE.put(self.timezones_file, zones, version)
+        return dict(zones)
+
+    def set_user_timezone(self, username, tz_name):
+        with self._lock:
+            zones = self.user_timezones()
+            zones[username] = tz_name
+            DATA_CACHE.invalidate(self.timezones_file)
+            pd.DataFrame(list(zones.items()), columns=["username", "timezone"]).to_csv(
+                self.timezones_file, index=False
+            )
+
+    # Wellness planner
+    def list_planner_users(self):
+        prefix = os.path.join(self.root, "planner_")
+        return [path[len(prefix):-len(".csv")] for path in glob.glob(f"{glob.escape(prefix)}*.csv")]
+
+    def user_versions(self):
+        """{username: version} for every user with planner or badge data.
+
+        A user's version changes whenever their planner, journal or badges
+        file does; one directory scan covers every user.
+        """
+        versions = {}
+        with os.scandir(self.root) as entries:
+            for entry in entries:
+                for prefix, suffix in _USER_FILES:
+                    if entry.name.startswith(prefix) and entry.name.endswith(suffix):
+                        stat = entry.stat()
+                        username = entry.name[len(prefix):-len(suffix)]
+                        versions.setdefault(username, []).append(f"{suffix}:{stat.st_mtime_ns}:{stat.st_size}")
+                        break
+        return {username: "|".join(sorted(parts)) for username, parts in versions.items()}
+
+    def load_tasks(self, username, cached=True):
+        # cached=False is for bulk scans that would only flush DATA_CACHE.
+        file = self.planner_file(username)
+        journal = self.journal_file(username)
+        if cached:
+            df = DATA_CACHE.get(file, _file_version(file, journal))
+            if df is not None:
+                return df.copy()
+        # Writers hold the lock exclusively, so the planner is never read
+        # half-rewritten or with a journal that belongs to the old file.
+        with self._planner_lock(username, shared=True):
+            version = _file_version(file, journal)
+            df = self._read_tasks(file, journal)
+        if not cached:
+            return df
+        DATA_CACHE.put(file, df, version)
+        return df.copy()
+
+    def _read_tasks(self, file, journal):
+        if os.path.exists(file):
+            df = pd.read_csv(file)
+            for col in TASK_COLUMNS:
+                if col not in df.columns:
+                    df[col] = "" if col != "completed" else False
+            df = df[TASK_COLUMNS].copy()
+        else:
+            df = pd.DataFrame(columns=TASK_COLUMNS)
+        if os.path.exists(journal):
+            # Only the last entry per row matters, and applying them one column
+            # at a time costs one pandas assignment per column, not per entry.
+            latest = {}
+            with open(journal, encoding="utf-8") as f:
+                for line in f:
+                    entry = json.loads(line)
+                    latest[entry["row"]] = entry
+            rows = [row for row in latest if row < len(df)]
+            for i, col in enumerate(TASK_COLUMNS):
+                if not rows:
+                    break
+                if col != "completed" and df[col].dtype.kind == "f":
+                    df[col] = df[col].astype(object)  # an all-empty column reads as float
+                df.iloc[rows, i] = [latest[row][col] for row in rows]
+        return df
+
+    def _planner_lock(self, username, shared=False):
+        return file_lock(self.lock_file(f"planner_{username}"), shared)
+
+    def save_tasks(self, username, df):
+        with self._planner_lock(username):
+            self._save_tasks_locked(username, df)
+
+    def _save_tasks_locked(self, username, df):
+        DATA_CACHE.invalidate(self.planner_file(username))
+        df.to_csv(self.planner_file(username), index=False)
+        if os.path.exists(self.journal_file(username)):
+            os.remove(self.journal_file(username))
+
+    def modify_tasks(self, username, change):
+        """Rewrite the user's planner as change(df), with no write in between.
+
+        change returns the new frame, or None to leave the planner alone;
+        modify_tasks returns the same.
+        """
+        with self._planner_lock(username):
+            df = change(self._read_tasks(self.planner_file(username), self.journal_file(username)))
+            if df is not None:
+                self._save_tasks_locked(username, df)
+        return df
+
+    def update_tasks(self, username, df, positions):
+        """Persist only the rows at the given positions of df."""
+        with self._planner_lock(username):
+            if not os.path.exists(self.planner_file(username)):
+                self._save_tasks_locked(username, df)
+                return
+            self._append_journal(username, df, positions)
+
+    def _append_journal(self, username, df, positions):
+        lines = []
+        for pos in positions:
+            row = df.iloc[pos]
+            entry = {"row": int(pos)}
+            for col in TASK_COLUMNS:
+                value = row[col]
+                entry[col] = _to_bool(value) if col == "completed" else (None if pd.isna(value) else str(value))
+            lines.append(json.dumps(entry) + "\n")
+        journal = self.journal_file(username)
+        DATA_CACHE.invalidate(self.planner_file(username))
+        with open(journal, "a", encoding="utf-8") as f:
+            f.write("".join(lines))
+        if os.path.getsize(journal) > JOURNAL_COMPACT_BYTES:
+            self._save_tasks_locked(username, self._read_tasks(self.planner_file(username), journal))
+
+    # Badges
+    def load_badges(self, username, cached=True):
+        file = self.badges_file(username)
+        if not cached:
+            return pd.read_csv(file) if os.path.exists(file) else pd.DataFrame(columns=BADGE_COLUMNS)
+        version = _file_version(file)
+        df = DATA_CACHE.get(file, version)
+        if df is None:
+            if os.path.exists(file):
+                df = pd.read_csv(file)
+            else:
+                df = pd.DataFrame(columns=BADGE_COLUMNS)
+            DATA_CACHE.put(file, df, version)
+        return df.copy()
+
+    def save_badges(self, username, df):
+        DATA_CACHE.invalidate(self.badges_file(username))
+        df.to_csv(self.badges_file(username), index=False)
+
+    def add_badges(self, username, rows):
+        """Append (badge, date) rows to the user's badge history."""
+        file = self.badges_file(username)
+        df = pd.DataFrame(rows, columns=BADGE_COLUMNS)
+        DATA_CACHE.invalidate(file)
+        if os.path.exists(file):
+            df.to_csv(file, mode='a', header=False, index=False)
+        else:
+            df.to_csv(file, index=False)
+
+    def load_badge_counters(self, username):
+        """The user's badge counters (see badges.py), or None if there are none yet."""
+        file = self.badge_counters_file(username)
+        if not os.path.exists(file):
+            return None
+        with open(file, encoding="utf-8") as f:
+            return json.load(f)
+
+    def save_badge_counters(self, username, counters):
+        file = self.badge_counters_file(username)
+        # A private temp file per write: two sessions of the same user must
+        # not write into one shared temp file and replace with a mix.
+        fd, tmp = tempfile.mkstemp(dir=self.root, prefix=f"{os.path.basename(file)}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(counters, f)
+            os.replace(tmp, file)
+        except BaseException:
+            os.remove(tmp)
+            raise
+
+    # Feedback
+    def add_feedback(self, entry):
+        self.add_feedback_batch([entry])
+
+    def add_feedback_batch(self, entries, fsync=False):
+        """Append entries to feedback.csv with a single write() call.
+
+        The file is opened with O_APPEND and the whole batch goes out in one
+        write, so concurrent writers cannot interleave partial rows.
+        """
+        df = pd.DataFrame(entries, columns=FEEDBACK_COLUMNS)
+        with self._lock:
+            DATA_CACHE.invalidate(self.feedback_file)
+            if not os.path.exists(self.feedback_file):
+                self._create_feedback_file(df.head(0).to_csv(index=False).encode("utf-8"))
+            data = df.to_csv(header=False, index=False).encode("utf-8")
+            fd = os.open(self.feedback_file, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, data)
+                if fsync:
+                    os.fsync(fd)
+            finally:
+                os.close(fd)
+
+    def _create_feedback_file(self, header):
+        # Another process may be creating it too. The header goes into a
+        # private file that is hard-linked into place, so exactly one header
+        # lands, and always before any rows.
+        tmp = f"{self.feedback_file}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(header)
+        try:
+            os.link(tmp, self.feedback_file)
+        except FileExistsError:
+            pass
+        finally:
+            os.remove(tmp)
+
+    def load_feedback(self):
+        if not os.path.exists(self.feedback_file):
+            return None
+        version = _file_version(self.feedback_file)
+        cached = DATA_CACHE.get(self.feedback_file, version)
+        if cached is None:
+            cached = pd.read_csv(self.feedback_file)
+            DATA_CACHE.put(self.feedback_file, cached, version)
+        return cached.copy()
+
+    def feedback_summary(self):
+        """Response count, average rating and {rating: count} histogram."""
+        return self._feedback_index.summary()
+
+    def query_feedback(self, rating=None, search=None, offset=0, limit=50):
+        """One page of feedback, optionally filtered by rating and comment text."""
+        if not os.path.exists(self.feedback_file):
+            return FeedbackPage(_feedback_frame([]), 0, False)
+        return self._feedback_index.query(rating, search, offset, limit)
+
+
+# ---------- SQLite Backend ----------
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    username TEXT PRIMARY KEY,
+    password TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS user_timezones (
+    username TEXT PRIMARY KEY,
+    timezone TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS tasks (
+    username TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    task TEXT,
+    completed INTEGER NOT NULL DEFAULT 0,
+    timestamp TEXT,
+    last_updated TEXT,
+    PRIMARY KEY (username, position)
+);
+CREATE TABLE IF NOT EXISTS badges (
+    id INTEGER PRIMARY KEY,
+    username TEXT NOT NULL,
+    badge TEXT NOT NULL,
+    date TEXT
+);
+CREATE INDEX IF NOT EXISTS badges_username ON badges (username);
+CREATE TABLE IF NOT EXISTS badge_counters (
+    username TEXT PRIMARY KEY,
+    counters TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS feedback (
+    id INTEGER PRIMARY KEY,
+    name TEXT,
+    rating INTEGER,
+    comment TEXT
+);
+CREATE INDEX IF NOT EXISTS feedback_rating ON feedback (rating);
+-- Rating histogram kept up to date by triggers instead of a GROUP BY per view.
+CREATE TABLE IF NOT EXISTS feedback_ratings (
+    rating INTEGER PRIMARY KEY,
+    count INTEGER NOT NULL
+);
+CREATE TRIGGER IF NOT EXISTS feedback_rating_insert AFTER INSERT ON feedback
+WHEN new.rating IS NOT NULL BEGIN
+    INSERT INTO feedback_ratings (rating, count) VALUES (new.rating, 1)
+    ON CONFLICT (rating) DO UPDATE SET count = count + 1;
+END;
+CREATE TRIGGER IF NOT EXISTS feedback_rating_delete AFTER DELETE ON feedback
+WHEN old.rating IS NOT NULL BEGIN
+    UPDATE feedback_ratings SET count = count - 1 WHERE rating = old.rating;
+END;
+CREATE TABLE IF NOT EXISTS storage_meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+-- Per-user change counter for analytics, bumped by triggers on every task or
+-- badge write; rows counts the user's task and badge rows. A user's row is
+-- never deleted, so version only ever grows within one changes epoch (see
+-- storage_meta), which is renewed whenever the counters start over.
+CREATE TABLE IF NOT EXISTS user_changes (
+    username TEXT PRIMARY KEY,
+    version INTEGER NOT NULL,
+    rows INTEGER NOT NULL
+);
+CREATE TRIGGER IF NOT EXISTS tasks_change_insert AFTER INSERT ON tasks BEGIN
+    INSERT INTO user_changes (username, version, rows) VALUES (new.username, 1, 1)
+    ON CONFLICT (username) DO UPDATE SET version = version + 1, rows = rows + 1;
+END;
+CREATE TRIGGER IF NOT EXISTS tasks_change_update AFTER UPDATE ON tasks BEGIN
+    UPDATE user_changes SET version = version + 1 WHERE username = new.username;
+END;
+CREATE TRIGGER IF NOT EXISTS tasks_change_delete AFTER DELETE ON tasks BEGIN
+    UPDATE user_changes SET version = version + 1, rows = rows - 1 WHERE username = old.username;
+END;
+CREATE TRIGGER IF NOT EXISTS badges_change_insert AFTER INSERT ON badges BEGIN
+    INSERT INTO user_changes (username, version, rows) VALUES (new.username, 1, 1)
+    ON CONFLICT (username) DO UPDATE SET version = version + 1, rows = rows + 1;
+END;
+CREATE TRIGGER IF NOT EXISTS badges_change_update AFTER UPDATE ON badges BEGIN
+    UPDATE user_changes SET version = version + 1 WHERE username = new.username;
+END;
+CREATE TRIGGER IF NOT EXISTS badges_change_delete AFTER DELETE ON badges BEGIN
+    UPDATE user_changes SET version = version + 1, rows = rows - 1 WHERE username = old.username;
+END;
+"""
+
+# Statements are kept as constants so sqlite3's per-connection statement
+# cache reuses the prepared form on every call.
+UPSERT_TASK = """
+INSERT INTO tasks (username, position, task, completed, timestamp, last_updated)
+VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT (username, position) DO UPDATE SET
+    task = excluded.task,
+    completed = excluded.completed,
+    timestamp = excluded.timestamp,
+    last_updated = excluded.last_updated
+"""
+
+
+class SQLiteStorage:
+    def __init__(self, path="health_calc.db"):
+        self.path = path
+        self._pool = ConnectionPool(path)
+        with self._conn() as conn:
+            conn.executescript(SCHEMA)
+            # Databases created before the histogram table existed need a backfill.
+            if not conn.execute("SELECT 1 FROM feedback_ratings LIMIT 1").fetchone():
+                conn.execute(
+                    "INSERT INTO feedback_ratings (rating, count) "
+                    "SELECT rating, COUNT(*) FROM feedback WHERE rating IS NOT NULL GROUP BY rating"
+                )
+            # Likewise for the per-user change counters. Counters that start
+            # over get a new epoch, so versions cached from before never match.
+            if not conn.execute("SELECT 1 FROM user_changes LIMIT 1").fetchone():
+                conn.execute(
+                    "INSERT INTO user_changes (username, version, rows) "
+                    "SELECT username, 1, COUNT(*) FROM "
+                    "(SELECT username FROM tasks UNION ALL SELECT username FROM badges) GROUP BY username"
+                )
+                conn.execute(
+                    "INSERT OR REPLACE INTO storage_meta (key, value) VALUES ('changes_epoch', ?)",
+                    (os.urandom(8).hex(),),
+                )
+            conn.execute(
+                "INSERT OR IGNORE INTO storage_meta (key, value) VALUES ('changes_epoch', ?)", (os.urandom(8).hex(),)
+            )
+
+    def __getstate__(self):
+        return {"path": self.path}
+
+    def __setstate__(self, state):
+        self.__init__(state["path"])
+
+    def lock_file(self, name):
+        """Path of the lock file `name`, shared by every process using this database."""
+        return f"{self.path}.{name}.lock"
+
+    def _conn(self):
+        # Streamlit starts a new thread for every rerun, so connections come
+        # from a small pool shared by all threads (see pools.py) rather than
+        # one per thread. Use as `with self._conn() as conn:`.
+        return self._pool.connection()
+
+    # Users
+    def get_password_hash(self, username):
+        with self._conn() as conn:
+            row = conn.execute("SELECT password FROM users WHERE username = ?", (username,)).fetchone()
+        return row[0] if row else None
+
+    def add_user(self, username, hashed_pw):
+        try:
+            with self._conn() as conn:
+                conn.execute("INSERT INTO users (username, password) VALUES (?, ?)", (username, hashed_pw))
+        except sqlite3.IntegrityError:
+            raise UserExistsError(username) from None
+
+    def update_password(self, username, hashed_pw):
+        with self._conn() as conn:
+            conn.execute("UPDATE users SET password = ? WHERE username = ?", (hashed_pw, username))
+
+    def user_timezones(self):
+        """{username: IANA time zone name} for users who picked one."""
+        with self._conn() as conn:
+            return dict(conn.execute("SELECT username, timezone FROM user_timezones").fetchall())
+
+    def set_user_timezone(self, username, tz_name):
+        with self._conn() as conn:
+            conn.execute(
+                "INSERT INTO user_timezones (username, timezone) VALUES (?, ?) "
+                "ON CONFLICT (username) DO UPDATE SET timezone = excluded.timezone",
+                (username, tz_name),
+            )
+
+    # Wellness planner
+    def list_planner_users(self):
+        with self._conn() as conn:
+            return [row[0] for row in conn.execute("SELECT DISTINCT username FROM tasks")]
+
+    def user_versions(self):
+        """{username: version} for every user with planner or badge data.
+
+        Read from the trigger-maintained user_changes table, so the cost
+        grows with the number of users, not of task and badge rows.
+        """
+        with self._conn() as conn:
+            epoch = conn.execute("SELECT value FROM storage_meta WHERE key = 'changes_epoch'").fetchone()[0]
+            return {
+                username: f"{epoch}:{version}"
+                for username, version in conn.execute("SELECT username, version FROM user_changes WHERE rows > 0")
+            }
+
+    def load_tasks(self, username, cached=True):
+        with self._conn() as conn:
+            return self._read_tasks(conn, username)
+
+    def _read_tasks(self, conn, username):
+        rows = conn.execute(
+            "SELECT task, completed, timestamp, last_updated FROM tasks WHERE username = ? ORDER BY position",
+            (username,),
+        ).fetchall()
+        df = pd.DataFrame(rows, columns=TASK_COLUMNS)
+        df['completed'] = df['completed'].astype(bool)
+        return df
+
+    def save_tasks(self, username, df):
+        with self._conn() as conn:
+            self._write_tasks(conn, username, df)
+
+    def _write_tasks(self, conn, username, df):
+        rows = [
+            (username, pos, row.task, int(_to_bool(row.completed)), row.timestamp, row.last_updated)
+            for pos, row in enumerate(df[TASK_COLUMNS].itertuples(index=False))
+        ]
+        conn.executemany(UPSERT_TASK, rows)
+        conn.execute("DELETE FROM tasks WHERE username = ? AND position >= ?", (username, len(rows)))
+
+    def modify_tasks(self, username, change):
+        """Rewrite the user's planner as change(df), with no write in between.
+
+        change returns the new frame, or None to leave the planner alone;
+        modify_tasks returns the same.
+        """
+        with self._conn() as conn:
+            # IMMEDIATE takes the write lock before the read, so an update
+            # from the page waits instead of being overwritten.
+            conn.execute("BEGIN IMMEDIATE")
+            df = change(self._read_tasks(conn, username))
+            if df is not None:
+                self._write_tasks(conn, username, df)
+        return df
+
+    def update_tasks(self, username, df, positions):
+        """Persist only the rows at the given positions of df."""
+        rows = []
+        for pos in positions:
+            row = df.iloc[pos]
+            rows.append((username, int(pos), row['task'], int(_to_bool(row['completed'])),
+                         row['timestamp'], row['last_updated']))
+        with self._conn() as conn:
+            conn.executemany(UPSERT_TASK, rows)
+
+    # Badges
+    def load_badges(self, username, cached=True):
+        with self._conn() as conn:
+            rows = conn.execute(
+                "SELECT badge, date FROM badges WHERE username = ? ORDER BY id", (username,)
+            ).fetchall()
+        return pd.DataFrame(rows, columns=BADGE_COLUMNS)
+
+    def save_badges(self, username, df):
+        rows = [(username, row.badge, row.date) for row in df[BADGE_COLUMNS].itertuples(index=False)]
+        with self._conn() as conn:
+            conn.execute("DELETE FROM badges WHERE username = ?", (username,))
+            conn.executemany("INSERT INTO badges (username, badge, date) VALUES (?, ?, ?)", rows)
+
+    def add_badges(self, username, rows):
+        """Append (badge, date) rows to the user's badge history."""
+        with self._conn() as conn:
+            conn.executemany(
+                "INSERT INTO badges (username, badge, date) VALUES (?, ?, ?)",
+                [(username, badge, date) for badge, date in rows],
+            )
+
+    def load_badge_counters(self, username):
+        """The user's badge counters (see badges.py), or None if there are none yet."""
+        with self._conn() as conn:
+            row = conn.execute("SELECT counters FROM badge_counters WHERE username = ?", (username,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def save_badge_counters(self, username, counters):
+        with self._conn() as conn:
+            conn.execute(
+                "INSERT INTO badge_counters (username, counters) VALUES (?, ?) "
+                "ON CONFLICT (username) DO UPDATE SET counters = excluded.counters",
+                (username, json.dumps(counters)),
+            )
+
+    # Feedback
+    def add_feedback(self, entry):
+        self.add_feedback_batch([entry])
+
+    def add_feedback_batch(self, entries, fsync=False):
+        """Insert entries in one transaction; fsync forces a full sync commit."""
+        with self._conn() as conn:
+            if fsync:
+                conn.execute("PRAGMA synchronous=FULL")
+            try:
+                conn.executemany(
+                    "INSERT INTO feedback (name, rating, comment) VALUES (?, ?, ?)",
+                    [(e["Name"], e["Rating"], e["Comment"]) for e in entries],
+                )
+                conn.commit()
+            finally:
+                if fsync:
+                    conn.execute("PRAGMA synchronous=NORMAL")
+
+    def load_feedback(self):
+        with self._conn() as conn:
+            rows = conn.execute("SELECT name, rating, comment FROM feedback ORDER BY id").fetchall()
+        if not rows:
+            return None
+        return pd.DataFrame(rows, columns=FEEDBACK_COLUMNS)
+
+    def feedback_summary(self):
+        """Response count, average rating and {rating: count} histogram."""
+        with self._conn() as conn:
+            rows = conn.execute("SELECT rating, count FROM feedback_ratings").fetchall()
+        return _summary({rating: count for rating, count in rows if rating in RATINGS})
+
+    def query_feedback(self, rating=None, search=None, offset=0, limit=50):
+        """One page of feedback, optionally filtered by rating and comment text."""
+        where, params = [], []
+        if rating is not None:
+            where.append("rating = ?")
+            params.append(rating)
+        if search:
+            where.append("comment LIKE ? ESCAPE '\\'")
+            escaped = search.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            params.append(f"%{escaped}%")
+        clause = f"WHERE {' AND '.join(where)}" if where else ""
+        with self._conn() as conn:
+            total = conn.execute(f"SELECT COUNT(*) FROM feedback {clause}", params).fetchone()[0]
+            rows = conn.execute(
+                f"SELECT name, rating, comment FROM feedback {clause} ORDER BY id LIMIT ? OFFSET ?",
+                params + [limit, offset],
+            ).fetchall()
+        return FeedbackPage(pd.DataFrame(rows, columns=FEEDBACK_COLUMNS), total, offset + limit < total)
+
+
+def open_storage():
+    """Return the backend selected by HEALTH_CALC_STORAGE (default: csv)."""
+    backend = os.environ.get("HEALTH_CALC_STORAGE", "csv").lower()
+    if backend == "csv":
+        return CSVStorage(os.environ.get("HEALTH_CALC_DATA_DIR", "."))
+    if backend == "sqlite":
+        return SQLiteStorage(os.environ.get("HEALTH_CALC_DB", "health_calc.db"))
+    raise ValueError(f"Unknown storage backend: {backend!r}")
+
+
+# ---------- CSV -> SQLite Migration ----------
+def migrate_csv_to_sqlite(csv_dir, db_path):
+    """Import every CSV file under csv_dir into the SQLite database at db_path."""
+    src = CSVStorage(csv_dir)
+    dst = SQLiteStorage(db_path)
+    counts = {"users": 0, "planners": 0, "badges": 0, "feedback": 0}
+
+    if os.path.exists(src.users_file):
+        users = src._users()
+        with dst._conn() as conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO users (username, password) VALUES (?, ?)", users.items()
+            )
+        counts["users"] = len(users)
+
+    for path in glob.glob(os.path.join(csv_dir, "planner_*.csv")):
+        username = os.path.basename(path)[len("planner_"):-len(".csv")]
+        dst.save_tasks(username, src.load_tasks(username))
+        counts["planners"] += 1
+
+    for path in glob.glob(os.path.join(csv_dir, "badges_*.csv")):
+        username = os.path.basename(path)[len("badges_"):-len(".csv")]
+        dst.save_badges(username, src.load_badges(username))
+        counts["badges"] += 1
+
+    for path in glob.glob(os.path.join(csv_dir, "badgestats_*.json")):
+        username = os.path.basename(path)[len("badgestats_"):-len(".json")]
+        dst.save_badge_counters(username, src.load_badge_counters(username))
+
+    for username, tz_name in src.user_timezones().items():
+        dst.set_user_timezone(username, tz_name)
+
+    feedback = src.load_feedback()
+    if feedback is not None:
+        # Blank, non-numeric or fractional ratings are kept as NULL, which the
+        # rating histogram ignores, rather than stopping the migration halfway.
+        ratings = pd.to_numeric(feedback["Rating"], errors="coerce")
+        ratings = ratings.where(ratings == ratings.round())
+        rows = [
+            (None if pd.isna(name) else name, None if pd.isna(rating) else int(rating),
+             None if pd.isna(comment) else comment)
+            for name, rating, comment in zip(feedback["Name"], ratings, feedback["Comment"])
+        ]
+        with dst._conn() as conn:
+            conn.execute("DELETE FROM feedback")
+            conn.executemany("INSERT INTO feedback (name, rating, comment) VALUES (?, ?, ?)", rows)
+        counts["feedback"] = len(rows)
+        counts["feedback without rating"] = int(ratings.isna().sum())
+
+    return counts
+
+
+# ---------- Benchmarks ----------
+def _percentiles(latencies):
+    latencies = sorted(latencies)
+    return {
+        "p50 (us)": round(latencies[len(latencies) // 2], 1),
+        "p99 (us)": round(latencies[int(len(latencies) * 0.99)], 1),
+    }
+
+
+def _timed_us(fn, args_list):
+    latencies = []
+    for args in args_list:
+        start = time.perf_counter()
+        fn(*args)
+        latencies.append((time.perf_counter() - start) * 1e6)
+    return latencies
+
+
+def bench_login(sizes=(1_000, 100_000, 1_000_000), lookups=2_000, seed=0):
+    """Username lookup latency as the user table grows, for both backends.
+
+    This times the storage side of a login (get_password_hash) and of a
+    registration (add_user followed by a lookup). The KDF itself is timed by
+    `python credentials.py bench`.
+    """
+    stored = "0" * 64  # the length of a legacy SHA-256 hash
+    rng = random.Random(seed)
+    results = []
+    for size in sizes:
+        hits = [(f"user{rng.randrange(size)}",) for _ in range(lookups)]
+        misses = [(f"nobody{i}",) for i in range(lookups)]
+        with tempfile.TemporaryDirectory() as root:
+            with open(os.path.join(root, "users.csv"), "w", encoding="utf-8") as f:
+                f.write("username,password\n")
+                f.writelines(f"user{i},{stored}\n" for i in range(size))
+            db = SQLiteStorage(os.path.join(root, "bench.db"))
+            with db._conn() as conn:
+                conn.executemany(
+                    "INSERT INTO users (username, password) VALUES (?, ?)",
+                    ((f"user{i}", stored) for i in range(size)),
+                )
+
+            for name, store in (("csv", CSVStorage(root)), ("sqlite", db)):
+                start = time.perf_counter()
+                store.get_password_hash("user0")
+                row = {"backend": name, "users": size,
+                       "first lookup (ms)": round((time.perf_counter() - start) * 1000, 1)}
+                for label, args_list in (("hit", hits), ("miss", misses)):
+                    for key, value in _percentiles(_timed_us(store.get_password_hash, args_list)).items():
+                        row[f"{label} {key}"] = value
+                registrations = [(f"new{i}", stored) for i in range(min(lookups, 200))]
+                register = _timed_us(
+                    lambda username, pw: (store.add_user(username, pw), store.get_password_hash(username)),
+                    registrations,
+                )
+                for key, value in _percentiles(register).items():
+                    row[f"register {key}"] = value
+                results.append(row)
+    return results
+
+
+def bench_backends(sessions=16, reruns=50, tasks=20, seed=0):
+    """p50/p99 of the per-rerun storage calls with concurrent sessions.
+
+    Every rerun runs on a new thread, as Streamlit's ScriptRunner does: a
+    login lookup, a planner load, one completed-task update and a badge load.
+    """
+    from datetime import datetime
+
+    now = datetime.now().isoformat()
+    results = []
+    with tempfile.TemporaryDirectory() as root:
+        for name, store in (("csv", CSVStorage(root)), ("sqlite", SQLiteStorage(os.path.join(root, "bench.db")))):
+            users = [f"{name}_user{i}" for i in range(sessions)]
+            for username in users:
+                store.add_user(username, "0" * 64)
+                store.save_tasks(username, pd.DataFrame(
+                    [[f"Task {j}", False, now, now] for j in range(tasks)], columns=TASK_COLUMNS,
+                ))
+            latencies = {"login": [], "load_tasks": [], "update_tasks": [], "load_badges": []}
+            lock = threading.Lock()
+
+            def rerun(username, rng):
+                timings = {}
+                start = time.perf_counter()
+                store.get_password_hash(username)
+                timings["login"] = time.perf_counter() - start
+                start = time.perf_counter()
+                df = store.load_tasks(username)
+                timings["load_tasks"] = time.perf_counter() - start
+                pos = rng.randrange(len(df))
+                df.loc[pos, "completed"] = not df.loc[pos, "completed"]
+                start = time.perf_counter()
+                store.update_tasks(username, df, [pos])
+                timings["update_tasks"] = time.perf_counter() - start
+                start = time.perf_counter()
+                store.load_badges(username)
+                timings["load_badges"] = time.perf_counter() - start
+                with lock:
+                    for op, seconds in timings.items():
+                        latencies[op].append(seconds * 1e6)
+
+            def session(username, i):
+                rng = random.Random(seed + i)
+                for _ in range(reruns):
+                    thread = threading.Thread(target=rerun, args=(username, rng))
+                    thread.start()
+                    thread.join()
+
+            threads = [threading.Thread(target=session, args=(u, i)) for i, u in enumerate(users)]
+            start = time.perf_counter()
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            elapsed = time.perf_counter() - start
+            row = {"backend": name, "reruns/s": round(sessions * reruns / elapsed, 1)}
+            for op, samples in latencies.items():
+                for key, value in _percentiles(samples).items():
+                    row[f"{op} {key}"] = value
+            if name == "sqlite":
+                row["connections opened"] = store._pool.created
+            results.append(row)
+    return results
+
+
+def bench_feedback(rows=1_000_000, seed=0):
+    """Time to the first feedback page on a large feedback.csv.
+
+    Cold is a process that has never seen the file; restart is a new
+    process that finds the persisted index. pd.read_csv is shown for scale.
+    """
+    rng = random.Random(seed)
+    comments = ["Great app", "Too slow", "Love the charts", "", '"Has, a comma"', '"Two\nlines"']
+    results = {"rows": rows}
+    with tempfile.TemporaryDirectory() as root:
+        path = os.path.join(root, "feedback.csv")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("Name,Rating,Comment\n")
+            f.writelines(f"user{i},{rng.randint(1, 5)},{rng.choice(comments)}\n" for i in range(rows))
+
+        def ms(fn):
+            start = time.perf_counter()
+            fn()
+            return round((time.perf_counter() - start) * 1000, 1)
+
+        results["pd.read_csv (ms)"] = ms(lambda: pd.read_csv(path))
+        cold = FeedbackIndex(path)
+        results["cold: first page (ms)"] = ms(lambda: cold.query(limit=50))
+        results["cold: summary, full scan (ms)"] = ms(cold.summary)
+        results["cold: rating filter page (ms)"] = ms(lambda: cold.query(rating=3, limit=50))
+        results["cold: last page (ms)"] = ms(lambda: cold.query(offset=rows - 50, limit=50))
+        results["index file (MB)"] = round(os.path.getsize(cold.index_path) / 2 ** 20, 1)
+
+        with open(path, "a", encoding="utf-8") as f:
+            f.writelines(f"late{i},5,\n" for i in range(1000))
+        restart = FeedbackIndex(path)
+        results["restart: first page (ms)"] = ms(lambda: restart.query(limit=50))
+        results["restart: summary, load + 1k-row tail (ms)"] = ms(restart.summary)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Health Assistant storage tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+    migrate = sub.add_parser("migrate", help="Import the CSV files into a SQLite database")
+    migrate.add_argument("--csv-dir", default=".")
+    migrate.add_argument("--db", default="health_calc.db")
+    login_p = sub.add_parser("bench-login", help="time username lookups at several user counts")
+    login_p.add_argument("--users", type=int, nargs="+", default=[1_000, 100_000, 1_000_000])
+    login_p.add_argument("--lookups", type=int, default=2_000)
+    backends_p = sub.add_parser("bench-backends", help="compare CSV and SQLite latency under concurrent sessions")
+    backends_p.add_argument("--sessions", type=int, default=16)
+    backends_p.add_argument("--reruns", type=int, default=50, help="reruns per session")
+    feedback_p = sub.add_parser("bench-feedback", help="time to the first feedback page on a large file")
+    feedback_p.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args(argv)
+
+    if args.command == "migrate":
+        counts = migrate_csv_to_sqlite(args.csv_dir, args.db)
+        print(", ".join(f"{n} {kind}" for kind, n in counts.items()), f"imported into {args.db}")
+    elif args.command == "bench-login":
+        for row in bench_login(args.users, args.lookups):
+            print(", ".join(f"{key}: {value}" for key, value in row.items()))
+    elif args.command == "bench-feedback":
+        for key, value in bench_feedback(args.rows).items():
+            print(f"{key}: {value}")
+    elif args.command == "bench-backends":
+        for row in bench_backends(args.sessions, args.reruns):
+            print(", ".join(f"{key}: {value}" for key, value in row.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+"""Symptom knowledge engine for the Symptom Checker.
+
+The catalog (symptoms.json, or the file named by HEALTH_CALC_SYMPTOMS) lists
+each symptom with synonyms, a score weight, a likely cause and a suggested
+remedy. It also lists combination rules that add an extra penalty and a note
+when all of their symptoms are selected together. SymptomCatalog is built
+once per process.
+
+search() looks words up in an inverted index from name and synonym tokens to
+symptoms. It falls back to prefix matches over the sorted vocabulary and
+then to one-typo matches through a deletion index, where every token is
+stored under each string that drops one character. score() sums the
+precomputed weights and checks only the combination rules that start with a
+selected symptom.
+
+    python symptoms.py bench --size 10000   # search/score latency on a synthetic catalog
+"""
+
+import argparse
+import bisect
+import json
+import os
+import random
+import re
+import time
+from collections import defaultdict
+from typing import NamedTuple
+
+from calculations import SYMPTOM_SCORE_MAX
+
+DEFAULT_CATALOG = os.path.join(os.path.dirname(os.path.abspath(__file__)), "symptoms.json")
+MAX_PREFIX_TOKENS = 200  # vocabulary entries scanned per prefix lookup
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# Match ranks, best first.
+_EXACT, _PREFIX, _TYPO = 0, 1, 2
+
+
+class Combination(NamedTuple):
+    symptoms: frozenset
+    penalty: int
+    note: str
+
+
+class SymptomScore(NamedTuple):
+    score: int
+    combinations: list  # Combination rules that fired
+
+
+def _tokens(text):
+    return _TOKEN_RE.findall(text.lower())
+
+
+def _deletes(token):
+    return {token[:i] + token[i + 1:] for i in range(len(token))}
+
+
+class SymptomCatalog:
+    def __init__(self, symptoms, combinations=()):
+        self.names = [s["name"] for s in symptoms]
+        self.ids = {name: i for i, name in enumerate(self.names)}
+        self.weights = [int(s.get("weight", 5)) for s in symptoms]
+        self.info = {s["name"]: (s.get("cause", "Unknown"), s.get("solution", "Consult a doctor.")) for s in symptoms}
+
+        index = defaultdict(set)
+        for i, s in enumerate(symptoms):
+            for text in [s["name"], *s.get("synonyms", ())]:
+                for token in _tokens(text):
+                    index[token].add(i)
+        self._index = dict(index)
+        self._vocab = sorted(self._index)
+        deletes = defaultdict(set)
+        for token in self._vocab:
+            if len(token) > 3:
+                for variant in _deletes(token):
+                    deletes[variant].add(token)
+        self._deletes = dict(deletes)
+
+        # Each rule is filed under its lowest-id symptom, so score() only
+        # checks rules that one of the selected symptoms could start.
+        self._combinations = defaultdict(list)
+        for rule in combinations:
+            members = frozenset(self.ids[name] for name in rule["symptoms"])
+            self._combinations[min(members)].append(
+                Combination(members, int(rule.get("penalty", 0)), rule.get("note", ""))
+            )
+
+    def __len__(self):
+        return len(self.names)
+
+    # Search
+    def _term_matches(self, term):
+        """{symptom id: rank} for one query word."""
+        matches = {i: _EXACT for i in self._index.get(term, ())}
+        for token in self._prefixed(term):  # "cramp" also finds "cramps"
+            for i in self._index[token]:
+                matches.setdefault(i, _PREFIX)
+        if not matches:
+            for token in self._typos(term):
+                for i in self._index[token]:
+                    matches.setdefault(i, _TYPO)
+        return matches
+
+    def _prefixed(self, term):
+        start = bisect.bisect_left(self._vocab, term)
+        end = min(len(self._vocab), start + MAX_PREFIX_TOKENS)
+        return [t for t in self._vocab[start:end] if t.startswith(term) and t != term]
+
+    def _typos(self, term):
+        if len(term) < 4:
+            return ()
+        found = set(self._deletes.get(term, ()))
+        for variant in _deletes(term):
+            if variant in self._index:
+                found.add(variant)
+            found.update(self._deletes.get(variant, ()))
+        return found
+
+    def search(self, query, limit=20):
+        """Symptom names matching every word of query, best matches first."""
+        terms = _tokens(query)
+        if not terms:
+            return self.names[:limit]
+        ranks = None
+        for term in terms:
+            matches = self._term_matches(term)
+            if ranks is None:
+                ranks = matches
+            else:
+                ranks = {i: max(rank, matches[i]) for i, rank in ranks.items() if i in matches}
+            if not ranks:
+                return []
+        phrase = " ".join(terms)
+        return [
+            self.names[i]
+            for i in sorted(ranks, key=lambda i: (
+                not self.names[i].startswith(phrase), ranks[i], len(self.names[i]), self.names[i],
+            ))[:limit]
+        ]
+
+    # Scoring
+    def score(self, selected):
+        """Weighted symptom score (out of SYMPTOM_SCORE_MAX) and the rules that fired."""
+        ids = {self.ids[name] for name in selected if name in self.ids}
+        penalty = sum(self.weights[i] for i in ids)
+        fired = [rule for i in ids for rule in self._combinations.get(i, ()) if rule.symptoms <= ids]
+        penalty += sum(rule.penalty for rule in fired)
+        return SymptomScore(max(SYMPTOM_SCORE_MAX - penalty, 0), fired)
+
+
+def load_catalog(path=None):
+    """Build the catalog from a JSON file (default: HEALTH_CALC_SYMPTOMS or symptoms.json)."""
+    path = path or os.environ.get("HEALTH_CALC_SYMPTOMS", DEFAULT_CATALOG)
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    return SymptomCatalog(data["symptoms"], data.get("combinations", ()))
+
+
+# ---------- Benchmark ----------
+def synthetic_catalog(size, seed=0):
+    rng = random.Random(seed)
+    syllables = ["ab", "ca", "de", "fi", "go", "hu", "ja", "ke", "li", "mo", "nu", "pa", "ra", "si", "to", "ve"]
+    body = ["head", "chest", "back", "skin", "throat", "joint", "stomach", "eye", "ear", "leg"]
+
+    def word():
+        return "".join(rng.choice(syllables) for _ in range(rng.randint(2, 4)))
+
+    names = set()
+    while len(names) < size:
+        names.add(f"{rng.choice(body)} {word()}" if rng.random() < 0.5 else word())
+    names = sorted(names)
+    symptoms = [
+        {"name": name, "synonyms": [word() for _ in range(rng.randint(0, 3))], "weight": rng.randint(1, 10)}
+        for name in names
+    ]
+    combinations = [
+        {"symptoms": rng.sample(names, rng.randint(2, 3)), "penalty": 5}
+        for _ in range(size // 5)
+    ]
+    return SymptomCatalog(symptoms, combinations), symptoms
+
+
+def bench(size=10_000, queries=2_000, seed=0):
+    start = time.perf_counter()
+    catalog, symptoms = synthetic_catalog(size, seed)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    rng = random.Random(seed + 1)
+    samples = {"exact": [], "prefix": [], "typo": []}
+    for _ in range(queries):
+        name = rng.choice(symptoms)["name"]
+        token = name.split()[-1]
+        samples["exact"].append(name)
+        samples["prefix"].append(token[:3])
+        i = rng.randrange(len(token))
+        samples["typo"].append(token[:i] + token[i + 1:])
+
+    results = {"catalog size": size, "build (ms)": round(build_ms, 1)}
+    for kind, texts in samples.items():
+        start = time.perf_counter()
+        for text in texts:
+            catalog.search(text)
+        results[f"search {kind} (us)"] = round((time.perf_counter() - start) * 1e6 / len(texts), 1)
+
+    selections = [rng.sample(catalog.names, rng.randint(1, 8)) for _ in range(queries)]
+    start = time.perf_counter()
+    for selected in selections:
+        catalog.score(selected)
+    results["score 1-8 symptoms (us)"] = round((time.perf_counter() - start) * 1e6 / len(selections), 1)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Symptom catalog tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+    bench_p = sub.add_parser("bench", help="time search and scoring on a synthetic catalog")
+    bench_p.add_argument("--size", type=int, default=10_000)
+    bench_p.add_argument("--queries", type=int, default=2_000)
+    args = parser.parse_args(argv)
+
+    for key, value in bench(args.size, args.queries).items():
+        print(f"{key}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Admin analytics rollups: change tracking and background refresh."""
+
+import time
+from datetime import datetime
+
+import pandas as pd
+import pytest
+
+from analytics import Rollups
+from storage import TASK_COLUMNS, CSVStorage, SQLiteStorage
+
+
+@pytest.fixture(params=["csv", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "csv":
+        return CSVStorage(str(tmp_path))
+    return SQLiteStorage(str(tmp_path / "health_calc.db"))
+
+
+def planner(*completed):
+    now = datetime.now().isoformat()
+    return pd.DataFrame([[f"task {i}", done, now, now] for i, done in enumerate(completed)], columns=TASK_COLUMNS)
+
+
+def wait_for(rollups, timeout=10):
+    deadline = time.monotonic() + timeout
+    while (rollups.refreshing or rollups.last_refresh is None) and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def test_versions_change_on_every_write(store):
+    store.save_tasks("ann", planner(True, False))
+    first = store.user_versions()["ann"]
+    store.update_tasks("ann", planner(True, True), [1])
+    second = store.user_versions()["ann"]
+    store.add_badges("ann", [("🏅 Week 1 Champ", datetime.now().isoformat())])
+    third = store.user_versions()["ann"]
+    assert len({first, second, third}) == 3
+
+
+def test_sqlite_change_counters(tmp_path):
+    path = str(tmp_path / "health_calc.db")
+    store = SQLiteStorage(path)
+    store.save_tasks("ann", planner(True))
+    store.add_badges("bob", [("🏅 Week 1 Champ", "2026-01-01")])
+    with store._conn() as conn:
+        conn.execute("DELETE FROM user_changes")  # as in a database from before the table
+    store = SQLiteStorage(path)
+    assert set(store.user_versions()) == {"ann", "bob"}
+    store.save_tasks("ann", planner())
+    assert set(store.user_versions()) == {"bob"}  # no rows left
+
+
+def test_background_refresh(store, tmp_path):
+    store.save_tasks("ann", planner(True, False))
+    rollups = Rollups(store, cache_path=str(tmp_path / "rollups.pkl"))
+    assert rollups.refresh_async(max_age=60)
+    wait_for(rollups)
+    assert rollups.counts() == (1, 2, 1)
+
+    store.save_tasks("bob", planner(True))
+    assert not rollups.refresh_async(max_age=60)  # the last refresh is fresh enough
+    assert rollups.refresh_async(max_age=0)
+    wait_for(rollups)
+    assert rollups.counts() == (2, 3, 2) and rollups.last_refresh["rescanned"] == 1
+
+    reloaded = Rollups(store, cache_path=str(tmp_path / "rollups.pkl"))
+    assert reloaded.refresh()["rescanned"] == 0 and reloaded.counts() == (2, 3, 2)
+
+
+def test_recreated_database_does_not_match_cached_summaries(tmp_path):
+    path = str(tmp_path / "health_calc.db")
+    cache = str(tmp_path / "rollups.pkl")
+    SQLiteStorage(path).save_tasks("ann", planner(True, False))
+    assert Rollups(SQLiteStorage(path), cache_path=cache).refresh()["rescanned"] == 1
+
+    (tmp_path / "health_calc.db").unlink()
+    for suffix in ("-wal", "-shm"):
+        (tmp_path / f"health_calc.db{suffix}").unlink(missing_ok=True)
+    store = SQLiteStorage(path)
+    store.save_tasks("ann", planner(False, False))  # same writes, so the same bare counter
+    rollups = Rollups(store, cache_path=cache)
+    assert rollups.refresh()["rescanned"] == 1
+    assert rollups.counts() == (1, 2, 0)
@@ -0,0 +1,28 @@
+"""Badge counters written by several sessions of one user at once."""
+
+import threading
+
+from storage import CSVStorage
+
+
+def test_concurrent_counter_saves_never_mix(tmp_path):
+    store = CSVStorage(str(tmp_path))
+    errors = []
+
+    def session(n):
+        counters = {"session": n, "completions": list(range(n * 50))}
+        try:
+            for _ in range(100):
+                store.save_badge_counters("ann", counters)
+                saved = store.load_badge_counters("ann")
+                assert saved["completions"] == list(range(saved["session"] * 50))
+        except Exception as exc:  # pragma: no cover - reported below
+            errors.append(exc)
+
+    threads = [threading.Thread(target=session, args=(n,)) for n in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert not errors
+    assert [p.name for p in tmp_path.iterdir() if p.name.endswith(".tmp")] == []
@@ -0,0 +1,36 @@
+"""The multi-session benchmark runs end to end and its comparison flags regressions."""
+
+import json
+import os
+import subprocess
+import sys
+
+import bench
+
+ROOT = os.path.dirname(bench.APP)
+
+
+def test_sessions_run_every_flow_without_errors(tmp_path):
+    report_path = tmp_path / "report.json"
+    # A subprocess, since the runner patches Streamlit's runtime for overlapping runs.
+    proc = subprocess.run(
+        [sys.executable, bench.__file__, "run", "--sessions", "3", "--iterations", "1", "--users", "5",
+         "--tasks", "5", "--feedback", "100", "--out", str(report_path)],
+        capture_output=True, text=True, cwd=tmp_path, timeout=300,
+        env=dict(os.environ, HEALTH_CALC_STORAGE="csv", HEALTH_CALC_DB=str(tmp_path / "bench.db")),
+    )
+    assert proc.returncode == 0, proc.stderr[-2000:]
+    report = json.loads(report_path.read_text())
+    assert report["errors"] == []
+    assert set(report["flows"]) == {"first load"} | {name for name, _ in bench.FLOWS}
+    assert report["flows"]["login"]["count"] == 3
+    assert report["meta"]["sessions"] == 3 and report["throughput_flows_per_s"] > 0
+
+
+def test_compare_flags_slower_flows():
+    with open(os.path.join(ROOT, "bench_baseline.json"), encoding="utf-8") as f:
+        baseline = json.load(f)
+    assert bench.compare(baseline, baseline, tolerance=0.15) == 0
+    slower = json.loads(json.dumps(baseline))
+    slower["flows"]["login"]["p95_ms"] *= 2
+    assert bench.compare(slower, baseline, tolerance=0.15) == 1
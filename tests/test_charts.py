@@ -0,0 +1,26 @@
+"""Health Charts rendering, including the all-zero scores of a new user."""
+
+import pytest
+from matplotlib.figure import Figure
+
+import charts
+
+
+@pytest.mark.parametrize("kind", charts.CHART_KINDS)
+@pytest.mark.parametrize("fmt", ["png", "svg"])
+def test_all_zero_scores_render(kind, fmt):
+    image = charts.render_chart(kind, (0, 0, 0), fmt)
+    assert image.startswith(b"\x89PNG" if fmt == "png" else b"<?xml")
+
+
+def test_all_zero_pie_is_a_placeholder():
+    fig = Figure()
+    charts._draw_pie(fig, (0, 0, 0))
+    assert [t.get_text() for t in fig.axes[0].texts] == ["No scores yet"]
+
+
+def test_every_reachable_score_renders():
+    charts.prewarm()
+    for scores in charts.all_scores():
+        for kind in charts.CHART_KINDS:
+            assert charts.CHART_CACHE.get(charts.chart_key(kind, scores)) is not None
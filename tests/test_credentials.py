@@ -0,0 +1,49 @@
+"""Password hashes: malformed stored values and superseded rows in users.csv."""
+
+import pytest
+
+import storage
+from credentials import Credentials, KDFParams, hash_password, verify_password
+from storage import CSVStorage
+
+FAST = KDFParams("scrypt", n=2 ** 4)
+OLD = KDFParams("scrypt", n=2 ** 5)
+
+
+@pytest.mark.parametrize("stored", [
+    "scrypt$x$8$1$AAAA$BBBB",  # cost is not a number
+    "scrypt$3$8$1$AAAA$BBBB",  # n is not a power of two
+    "scrypt$1099511627776$8$1$AAAA$BBBB",  # absurd cost
+    "scrypt$16$8$1$A$BBBB",  # bad base64
+    "pbkdf2_sha256$99999999999$AAAA$BBBB",
+    "pbkdf2_sha256$-1$AAAA$BBBB",
+])
+def test_malformed_hashes_never_match(tmp_path, stored):
+    assert verify_password("pw", stored) is False
+    store = CSVStorage(str(tmp_path))
+    store.add_user("ann", stored)
+    creds = Credentials(store, params=FAST, workers=1)
+    try:
+        assert creds.check("ann", "pw") is False
+    finally:
+        creds.close()
+
+
+def test_rehashes_compact_users_csv(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, "USERS_COMPACT_ROWS", 5)
+    store = CSVStorage(str(tmp_path))
+    for i in range(3):
+        store.add_user(f"user{i}", hash_password(f"pw{i}", OLD))
+    creds = Credentials(store, params=OLD, workers=1)
+    try:
+        for round_ in range(4):  # each round rehashes every user
+            creds.params = FAST if round_ % 2 == 0 else OLD
+            for i in range(3):
+                assert creds.check(f"user{i}", f"pw{i}")
+            with open(store.users_file, encoding="utf-8") as f:
+                assert len(f.readlines()) - 1 <= 3 + 5 + 1
+    finally:
+        creds.close()
+    assert creds.rehashed == 12
+    reopened = CSVStorage(str(tmp_path))
+    assert all(verify_password(f"pw{i}", reopened.get_password_hash(f"user{i}")) for i in range(3))
@@ -0,0 +1,127 @@
+"""FeedbackIndex: vectorized scan, persisted index and head-of-file pages."""
+
+import os
+import random
+
+import pandas as pd
+import pytest
+
+from storage import RATINGS, FeedbackIndex
+
+NAMES = ["ann", "bob", '"Smith, Jo"', '"Quote ""Q"" Name"', ""]
+RATING_TEXT = ["1", "2", "3", "4", "5", "", "10", "0", " 3", "x"]
+COMMENTS = ["Great app", "", '"Has, comma"', '"multi\nline\ncomment"', '"say ""hi"""', "trailing space "]
+
+
+def write_feedback(path, rows, seed=0, newline="\n", header=True):
+    rng = random.Random(seed)
+    with open(path, "a", encoding="utf-8", newline="") as f:
+        if header:
+            f.write("Name,Rating,Comment" + newline)
+        for _ in range(rows):
+            f.write(",".join((rng.choice(NAMES), rng.choice(RATING_TEXT), rng.choice(COMMENTS))) + newline)
+
+
+def expected(path):
+    df = pd.read_csv(path, dtype=str, keep_default_na=False, skip_blank_lines=False)
+    ratings = pd.to_numeric(df["Rating"], errors="coerce")
+    return df, {r: int((ratings == r).sum()) for r in RATINGS}
+
+
+def all_rows(index):
+    page = index.query(offset=0, limit=len(index.offsets) + 1)
+    return page.rows
+
+
+@pytest.mark.parametrize("newline", ["\n", "\r\n"])
+@pytest.mark.parametrize("block", [64, 4096, 16 * 1024 * 1024])
+def test_scan_matches_pandas(tmp_path, newline, block):
+    path = str(tmp_path / "feedback.csv")
+    write_feedback(path, 3_000, newline=newline)
+    index = FeedbackIndex(path)
+    index.SCAN_BLOCK = block
+    df, histogram = expected(path)
+
+    assert index.summary()["histogram"] == histogram
+    assert len(index.offsets) == len(df)
+    rows = all_rows(index)
+    assert rows["Name"].tolist() == df["Name"].tolist()
+    assert rows["Comment"].str.rstrip("\r").tolist() == df["Comment"].tolist()
+    for rating in RATINGS:
+        page = index.query(rating=rating, limit=10_000)
+        assert page.total == histogram[rating]
+        assert (page.rows["Rating"] == rating).all()
+
+
+def test_incremental_scan_and_partial_row(tmp_path):
+    path = str(tmp_path / "feedback.csv")
+    write_feedback(path, 500)
+    index = FeedbackIndex(path)
+    index.refresh()
+    complete = os.path.getsize(path)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('ann,5,"still being\nwritten')  # an unterminated row is left for later
+    index.refresh()
+    assert index.indexed_bytes == complete
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('"\n')
+    write_feedback(path, 200, seed=1, header=False)
+    assert index.summary()["histogram"] == expected(path)[1]
+    assert index.indexed_bytes == os.path.getsize(path)
+
+
+def test_index_is_persisted_and_reused(tmp_path, monkeypatch):
+    path = str(tmp_path / "feedback.csv")
+    write_feedback(path, 20_000)
+    monkeypatch.setattr(FeedbackIndex, "SAVE_EVERY_BYTES", 1024)
+    first = FeedbackIndex(path)
+    summary = first.summary()
+    assert os.path.exists(path + ".idx")
+
+    write_feedback(path, 100, seed=2, header=False)
+    second = FeedbackIndex(path)
+    scanned = []
+    original = FeedbackIndex._scan_block
+
+    def spy(self, f):
+        scanned.append(self.indexed_bytes)
+        return original(self, f)
+
+    monkeypatch.setattr(FeedbackIndex, "_scan_block", spy)
+    assert second.summary()["histogram"] == expected(path)[1]
+    assert summary["count"] < sum(expected(path)[1].values())
+    # Only the appended tail was scanned, starting where the saved index ended.
+    assert scanned[0] == first.indexed_bytes
+
+
+def test_replaced_file_ignores_stale_index(tmp_path, monkeypatch):
+    path = str(tmp_path / "feedback.csv")
+    write_feedback(path, 5_000)
+    monkeypatch.setattr(FeedbackIndex, "SAVE_EVERY_BYTES", 1024)
+    FeedbackIndex(path).refresh()
+    os.remove(path)
+    write_feedback(path, 6_000, seed=3)  # same header, different rows, larger
+    assert FeedbackIndex(path).summary()["histogram"] == expected(path)[1]
+
+
+def test_first_page_served_from_file_head(tmp_path, monkeypatch):
+    path = str(tmp_path / "feedback.csv")
+    write_feedback(path, 5_000)
+    monkeypatch.setattr(FeedbackIndex, "refresh", lambda self: pytest.fail("first page waited for a scan"))
+    index = FeedbackIndex(path)
+    page = index.query(offset=50, limit=50)
+    df, _ = expected(path)
+    assert page.rows["Name"].tolist() == df["Name"].tolist()[50:100]
+    assert page.total is None and page.has_more
+
+
+def test_indexed_pages_do_not_wait_for_new_rows(tmp_path, monkeypatch):
+    path = str(tmp_path / "feedback.csv")
+    write_feedback(path, 500)
+    index = FeedbackIndex(path)
+    index.refresh()
+    assert index.query(limit=50).total == 500
+    write_feedback(path, 10, seed=4, header=False)
+    monkeypatch.setattr(FeedbackIndex, "refresh", lambda self: pytest.fail("covered page waited for a scan"))
+    page = index.query(limit=50)
+    assert len(page.rows) == 50 and page.total is None and page.has_more
@@ -0,0 +1,116 @@
+"""Concurrent feedback submission: nothing lost, duplicated or corrupted."""
+
+import os
+import random
+import subprocess
+import sys
+import threading
+
+import pytest
+
+from feedback import FeedbackWriter
+from storage import CSVStorage, SQLiteStorage
+
+SUBMITTERS = 2_000
+PER_SUBMITTER = 5
+
+
+def entry(submitter, i):
+    # Commas, quotes and newlines make a torn or interleaved row show up as
+    # a parse error or a mismatched comment.
+    return {"Name": f"user {submitter}", "Rating": (submitter + i) % 5 + 1,
+            "Comment": f'#{submitter}-{i}, said "ok"\nline two'}
+
+
+def submit_all(writer, submitters, per_submitter, first=0):
+    barrier = threading.Barrier(submitters)
+    errors = []
+
+    def submitter(n):
+        try:
+            barrier.wait()
+            for i in range(per_submitter):
+                writer.submit(entry(n, i))
+        except Exception as exc:  # pragma: no cover - reported below
+            errors.append(exc)
+
+    threads = [threading.Thread(target=submitter, args=(first + n,)) for n in range(submitters)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert not errors
+
+
+def assert_intact(store, expected):
+    df = store.load_feedback()
+    assert len(df) == len(expected)
+    got = sorted(zip(df["Name"], df["Rating"].astype(int), df["Comment"]))
+    want = sorted((e["Name"], e["Rating"], e["Comment"]) for e in expected)
+    assert got == want
+    summary = store.feedback_summary()
+    assert summary["count"] == len(expected)
+    assert sum(summary["histogram"].values()) == len(expected)
+
+
+@pytest.fixture(params=["csv", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "csv":
+        return CSVStorage(str(tmp_path))
+    return SQLiteStorage(str(tmp_path / "health_calc.db"))
+
+
+def test_thousands_of_concurrent_submitters(store):
+    writer = FeedbackWriter(store, max_delay=0.05, fsync=False)
+    submit_all(writer, SUBMITTERS, PER_SUBMITTER)
+    writer.close()
+    assert writer.written == SUBMITTERS * PER_SUBMITTER
+    assert writer.stats()["queue depth"] == 0
+    assert_intact(store, [entry(n, i) for n in range(SUBMITTERS) for i in range(PER_SUBMITTER)])
+
+
+def test_failed_flushes_are_retried(tmp_path):
+    class FlakyStore(CSVStorage):
+        rng = random.Random(0)
+
+        def add_feedback_batch(self, entries, fsync=False):
+            if self.rng.random() < 0.3:
+                raise OSError("disk hiccup")
+            super().add_feedback_batch(entries, fsync)
+
+    store = FlakyStore(str(tmp_path))
+    writer = FeedbackWriter(store, max_batch=50, max_delay=0.01, fsync=False)
+    submit_all(writer, 500, 4)
+    writer.close()
+    assert writer.failed_flushes > 0
+    assert_intact(store, [entry(n, i) for n in range(500) for i in range(4)])
+
+
+WRITER_PROCESS = """
+import sys, threading
+sys.path[:0] = [{root!r}, {tests!r}]
+from feedback import FeedbackWriter
+from storage import CSVStorage
+from test_feedback_stress import submit_all
+writer = FeedbackWriter(CSVStorage({data!r}), max_delay=0.02, fsync=False)
+submit_all(writer, {submitters}, {per}, first={first})
+writer.close()
+"""
+
+
+def test_replicas_appending_to_one_csv(tmp_path):
+    # Several processes (replicas) with their own writer share feedback.csv;
+    # O_APPEND single-write batches must not interleave.
+    here = os.path.dirname(os.path.abspath(__file__))
+    processes, submitters = 4, 500
+    procs = [
+        subprocess.Popen([sys.executable, "-c", WRITER_PROCESS.format(
+            root=os.path.dirname(here), tests=here, data=str(tmp_path),
+            submitters=submitters, per=PER_SUBMITTER, first=p * submitters,
+        )])
+        for p in range(processes)
+    ]
+    assert all(p.wait(timeout=300) == 0 for p in procs)
+    assert_intact(CSVStorage(str(tmp_path)), [
+        entry(n, i) for n in range(processes * submitters) for i in range(PER_SUBMITTER)
+    ])
@@ -0,0 +1,194 @@
+"""Property checks for parse_height against the two parsers it replaced.
+
+The dashboard used to parse heights twice: height_to_inches split on the
+quote or "ft", and convert_height_to_cm ran re.match with two patterns.
+They disagree with each other on garbled input, so the properties are:
+
+* where both old parsers accept a string and agree, parse_height agrees;
+* where parse_height accepts a string, it never contradicts an old parser
+  that also accepted it, unless the two old parsers contradict each other;
+* parse_heights (vectorized) matches parse_height row for row.
+
+Inputs come from seeded generators, so failures reproduce exactly. The
+comparisons with the old parsers use strings shaped like a height (number,
+unit, stray sign or quote, number, unit) with random spacing and pieces left
+out. height_to_inches deletes every '"' and "in" before reading the
+digits, which glues unrelated digits together, so free-form junk would only
+measure that bug. The vectorized check uses free-form token soup as well.
+"""
+
+import random
+import re
+
+import pytest
+
+from calculations import Height, HeightParseError, parse_height, parse_heights
+
+CASES = 20_000
+
+
+# ---------- The replaced parsers, verbatim apart from the bare except ----------
+def old_height_to_inches(height_str):
+    try:
+        if "'" in height_str:
+            feet, inches = height_str.split("'")
+            inches = inches.replace('"', '').strip()
+            return int(feet) * 12 + int(inches)
+        elif "ft" in height_str:
+            parts = height_str.lower().replace("in", "").split("ft")
+            feet = int(parts[0].strip())
+            inches = int(parts[1].strip()) if len(parts) > 1 else 0
+            return feet * 12 + inches
+    except Exception:
+        return None
+
+
+def old_convert_height_to_cm(height_str):
+    feet = 0
+    inches = 0
+    match1 = re.match(r"(\d+)'(\d+)", height_str)
+    match2 = re.match(r"(\d+)\s*ft\s*(\d*)\s*in*", height_str)
+
+    if match1:
+        feet = int(match1.group(1))
+        inches = int(match1.group(2))
+    elif match2:
+        feet = int(match2.group(1))
+        inches = int(match2.group(2)) if match2.group(2) else 0
+    else:
+        return None
+
+    total_inches = feet * 12 + inches
+    return round(total_inches * 2.54, 2)
+
+
+# ---------- Generators ----------
+UNITS = ["'", '"', "''", "ft", "ft.", "feet", "foot", "in", "inch", "inches", "cm"]
+FEET_UNITS = ["'", "''", "ft", "ft.", "FT", "feet", "foot", "", "cm", '"']
+INCH_UNITS = ['"', "''", "in", "inch", "inches", "IN", ""]
+NOISE = [" ", "  ", "-", "+", ".", "'", '"', "x", "\t"]
+
+
+def _number(rng):
+    return str(rng.choice([rng.randint(0, 12), rng.randint(0, 999)]))
+
+
+def _space(rng):
+    return rng.choice(["", "", " ", "  ", "\t"])
+
+
+def height_shaped(rng):
+    """number, unit, optional stray character, optional number and unit."""
+    parts = [_number(rng), _space(rng), rng.choice(FEET_UNITS), _space(rng)]
+    if rng.random() < 0.4:
+        parts += [rng.choice(NOISE), _space(rng)]
+    if rng.random() < 0.7:
+        parts += [_number(rng), _space(rng), rng.choice(INCH_UNITS)]
+    return "".join(parts)
+
+
+def height_soup(rng):
+    """A free-form string of numbers, units, spaces and stray punctuation."""
+    parts = []
+    for _ in range(rng.randint(1, 6)):
+        roll = rng.random()
+        if roll < 0.4:
+            parts.append(_number(rng))
+        elif roll < 0.75:
+            parts.append(rng.choice(UNITS))
+        else:
+            parts.append(rng.choice(NOISE))
+        if rng.random() < 0.3:
+            parts.append(" " * rng.randint(1, 2))
+    return "".join(parts)
+
+
+def well_formed(rng):
+    """Feet and inches the way people type them."""
+    feet, inches = rng.randint(0, 8), rng.randint(0, 11)
+    sp = lambda: " " * rng.randint(0, 2)  # noqa: E731
+    if rng.random() < 0.15:
+        return f"{feet}{sp()}ft", feet * 12
+    return rng.choice([
+        f"{feet}'{inches}",
+        f"{feet}'{sp()}{inches}\"",
+        f"{feet}{sp()}'{sp()}{inches}",
+        f"{feet}{sp()}ft{sp()}{inches}{sp()}in",
+        f"{feet}ft{sp()}{inches}",
+    ]), feet * 12 + inches
+
+
+def _new(text):
+    try:
+        return parse_height(text)
+    except HeightParseError:
+        return None
+
+
+def _inches_from_cm(cm):
+    return None if cm is None else round(cm / 2.54)
+
+
+def generated(seed, count=CASES, shape=height_shaped):
+    rng = random.Random(seed)
+    return [shape(rng) for _ in range(count)]
+
+
+# ---------- Properties ----------
+def test_well_formed_heights_match_both_old_parsers():
+    rng = random.Random(1)
+    for _ in range(CASES):
+        text, expected = well_formed(rng)
+        new = _new(text)
+        assert new == Height(expected, round(expected * 2.54, 2)), text
+        assert old_height_to_inches(text) in (None, expected), text
+        assert old_convert_height_to_cm(text) in (None, round(expected * 2.54, 2)), text
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_agrees_where_old_parsers_agree(seed):
+    failures = []
+    for text in generated(seed):
+        inches = old_height_to_inches(text)
+        cm = old_convert_height_to_cm(text)
+        if inches is None or cm is None or round(inches * 2.54, 2) != cm:
+            continue
+        new = _new(text)
+        if new is None or new.inches != inches or new.cm != cm:
+            failures.append((text, inches, new))
+    assert not failures, failures[:10]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_never_contradicts_an_old_parser(seed):
+    failures = []
+    for text in generated(seed + 100):
+        new = _new(text)
+        if new is None:
+            continue
+        inches = old_height_to_inches(text)
+        cm_inches = _inches_from_cm(old_convert_height_to_cm(text))
+        if inches is not None and cm_inches is not None and inches != cm_inches:
+            continue  # the old parsers disagree; either answer is defensible
+        for old in (inches, cm_inches):
+            if old is not None and old != new.inches:
+                failures.append((text, inches, cm_inches, new))
+    assert not failures, failures[:10]
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_vectorized_matches_scalar(seed):
+    texts = generated(seed + 200, count=2_500) + generated(seed + 300, count=2_500, shape=height_soup)
+    frame = parse_heights(texts)
+    for text, inches, cm, error in zip(texts, frame["inches"], frame["cm"], frame["error"]):
+        new = _new(text)
+        if new is None:
+            assert error is not None, text
+        else:
+            assert error is None and inches == pytest.approx(new.inches) and cm == pytest.approx(new.cm), text
+
+
+@pytest.mark.parametrize("text", ["5'-3", "5' -3", "5'  +3", "165' +81", "5 ft -3", "5ft\t+2", '5\' "'])
+def test_signed_or_stray_inches_are_rejected(text):
+    with pytest.raises(HeightParseError):
+        parse_height(text)
@@ -0,0 +1,91 @@
+"""Metrics: disabled instrumentation is cheap; histograms and exports are right."""
+
+import json
+import math
+
+import pytest
+
+import metrics
+from metrics import BUCKETS_MS, Histogram
+
+# Disabled timed() and span() cost a few hundred ns per call; a Streamlit
+# rerun takes milliseconds, so even this generous bound is far below noise.
+DISABLED_NS_PER_CALL = 2_000
+
+
+@pytest.fixture(autouse=True)
+def clean_registry():
+    was_enabled = metrics.enabled()
+    metrics.reset()
+    yield
+    metrics.enable(was_enabled)
+    metrics.reset()
+
+
+def test_disabled_instrumentation_is_negligible():
+    metrics.enable(False)
+    overhead = metrics.measure_overhead(calls=200_000)
+    assert overhead["timed() ns/call"] < DISABLED_NS_PER_CALL
+    assert overhead["span() ns/call"] < DISABLED_NS_PER_CALL
+    assert metrics.METRICS == {}  # nothing was recorded
+
+
+def test_enabled_spans_record():
+    metrics.enable()
+
+    @metrics.timed("decorated")
+    def work():
+        return 42
+
+    assert work() == 42
+    with metrics.span("block"):
+        pass
+    metrics.observe("direct", 3.0)
+    assert {name: h.count for name, h in metrics.METRICS.items()} == {"decorated": 1, "block": 1, "direct": 1}
+
+
+def test_histogram_buckets_and_quantiles():
+    hist = Histogram("h")
+    for ms in [0.05] * 50 + [3] * 45 + [700] * 5:
+        hist.observe(ms)
+    assert hist.count == 100 and hist.max_ms == 700
+    assert hist.buckets[BUCKETS_MS.index(0.1)] == 50
+    assert hist.buckets[BUCKETS_MS.index(5)] == 45
+    assert hist.buckets[BUCKETS_MS.index(1000)] == 5
+    assert hist.quantile(0.5) == 0.1
+    assert hist.quantile(0.95) == 5
+    assert hist.quantile(0.99) == 700  # capped at the largest value seen
+    assert hist.stats()["mean (ms)"] == pytest.approx((0.05 * 50 + 3 * 45 + 700 * 5) / 100, abs=0.01)
+    hist.observe(10_000)
+    assert hist.buckets[-1] == 1 and BUCKETS_MS[-1] == math.inf
+    assert Histogram("empty").quantile(0.5) == 0.0
+
+
+def test_prometheus_export(tmp_path):
+    metrics.enable()
+    for ms in (0.3, 2, 2, 40):
+        metrics.observe('tool: "quoted"', ms)
+    path = tmp_path / "metrics.prom"
+    metrics.export(str(path))
+    lines = path.read_text().splitlines()
+    assert lines[1] == "# TYPE health_calc_span_ms histogram"
+    label = 'span="tool: \\"quoted\\""'
+    assert f'health_calc_span_ms_bucket{{{label},le="0.5"}} 1' in lines
+    assert f'health_calc_span_ms_bucket{{{label},le="2.5"}} 3' in lines
+    assert f'health_calc_span_ms_bucket{{{label},le="+Inf"}} 4' in lines
+    assert f"health_calc_span_ms_count{{{label}}} 4" in lines
+    assert f"health_calc_span_ms_sum{{{label}}} 44.300" in lines
+
+
+def test_jsonl_export_appends_snapshots(tmp_path):
+    metrics.enable()
+    path = str(tmp_path / "metrics.jsonl")
+    metrics.observe("a", 1.0)
+    metrics.export(path)
+    metrics.observe("a", 2.0)
+    metrics.observe("b", 9.0)
+    metrics.export(path)
+    with open(path, encoding="utf-8") as f:
+        snapshots = [json.loads(line) for line in f]
+    assert [{row["span"]: row["count"] for row in s["spans"]} for s in snapshots] == [{"a": 1}, {"a": 2, "b": 1}]
+    assert [row["span"] for row in snapshots[1]["spans"]] == ["b", "a"]  # slowest total first
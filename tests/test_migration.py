@@ -0,0 +1,26 @@
+"""CSV -> SQLite migration of existing data files."""
+
+from storage import SQLiteStorage, migrate_csv_to_sqlite
+
+
+def test_feedback_with_bad_ratings_migrates(tmp_path):
+    csv_dir = tmp_path / "csv"
+    csv_dir.mkdir()
+    (csv_dir / "feedback.csv").write_text(
+        "Name,Rating,Comment\n"
+        "ann,5,Great\n"
+        "bob,,no rating\n"
+        "cy,four,typed a word\n"
+        "dee,3.5,half\n"
+        "eve,2,\n",
+        encoding="utf-8",
+    )
+    counts = migrate_csv_to_sqlite(str(csv_dir), str(tmp_path / "health_calc.db"))
+    assert counts["feedback"] == 5 and counts["feedback without rating"] == 3
+
+    db = SQLiteStorage(str(tmp_path / "health_calc.db"))
+    df = db.load_feedback()
+    assert df["Name"].tolist() == ["ann", "bob", "cy", "dee", "eve"]
+    assert df["Rating"].tolist()[0] == 5 and df["Rating"].isna().sum() == 3
+    summary = db.feedback_summary()
+    assert summary["count"] == 2 and summary["histogram"][5] == 1 and summary["histogram"][2] == 1
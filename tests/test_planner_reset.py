@@ -0,0 +1,136 @@
+"""Daily planner reset: rollover, races with the page, one scheduler per directory."""
+
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+import pandas as pd
+import pytest
+
+import planner_reset
+from planner_reset import ResetScheduler, reset_user, rollover, run_daily_reset, seed_planners
+from storage import TASK_COLUMNS, CSVStorage, SQLiteStorage
+
+# HEALTH_CALC_ROLLOVER_USERS=50000 runs the rollover test at full size.
+ROLLOVER_USERS = int(os.environ.get("HEALTH_CALC_ROLLOVER_USERS", "1000"))
+
+
+@pytest.fixture(params=["csv", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "csv":
+        return CSVStorage(str(tmp_path))
+    return SQLiteStorage(str(tmp_path / "health_calc.db"))
+
+
+def local(*args):
+    """A naive server-local datetime as the app writes it, and the same instant in UTC."""
+    naive = datetime(*args)
+    return naive, naive.astimezone().astimezone(timezone.utc)
+
+
+def test_rollover_resets_each_user_once(store):
+    yesterday, _ = local(2026, 3, 9, 12)
+    names = seed_planners(store, 300, 4, yesterday.date())
+    _, just_after_midnight = local(2026, 3, 10, 0, 5)
+    checked_on = {}
+
+    first = run_daily_reset(store, now=just_after_midnight, checked_on=checked_on, executor="thread")
+    assert (first["checked"], first["reset"]) == (300, 300)
+    for name in names[:20]:
+        df = store.load_tasks(name)
+        assert not df["completed"].any()
+        assert (pd.to_datetime(df["last_updated"]).dt.date == just_after_midnight.astimezone().date()).all()
+
+    again = run_daily_reset(store, now=just_after_midnight + timedelta(minutes=15), checked_on=checked_on,
+                            executor="thread")
+    assert (again["checked"], again["reset"]) == (0, 0)
+    assert run_daily_reset(store, now=just_after_midnight, executor="thread")["reset"] == 0
+
+
+def test_each_user_resets_at_their_own_midnight(store):
+    # Last reset at 09:30 UTC: 23:30 in Kiritimati (UTC+14), 22:30 the day
+    # before in Pago Pago (UTC-11). An hour later only Kiritimati is past midnight.
+    last = datetime(2026, 3, 9, 9, 30, tzinfo=timezone.utc).astimezone().replace(tzinfo=None).isoformat()
+    for username, zone in (("kiri", "Pacific/Kiritimati"), ("pago", "Pacific/Pago_Pago")):
+        store.save_tasks(username, pd.DataFrame([["a", True, last, last]], columns=TASK_COLUMNS))
+        store.set_user_timezone(username, zone)
+    result = run_daily_reset(store, now=datetime(2026, 3, 9, 10, 30, tzinfo=timezone.utc), executor="thread")
+    assert result["reset"] == 1
+    assert not store.load_tasks("kiri")["completed"].any()
+    assert store.load_tasks("pago")["completed"].all()
+
+
+def test_unparseable_timestamps_count_as_stale(store):
+    store.save_tasks("u", pd.DataFrame([["a", True, "x", "not a date"]], columns=TASK_COLUMNS))
+    assert reset_user(store, "u", datetime.now(timezone.utc), timezone.utc)[0]
+    assert not store.load_tasks("u")["completed"].any()
+
+
+def test_process_pool_rollover(tmp_path):
+    store = CSVStorage(str(tmp_path))
+    seed_planners(store, 50, 3, (datetime.now() - timedelta(days=1)).date())
+    result = run_daily_reset(store, workers=2, batch_size=10)
+    assert result["reset"] == 50 and result["worker_peak_rss_mb"] > 0
+
+
+def test_page_updates_during_reset_are_not_lost(store):
+    # Each writer rewrites its own row's text through update_tasks (the
+    # page's path) while modify_tasks (the reset's path) keeps rewriting the
+    # whole planner. Without a lock, a rewrite that read before an update
+    # and wrote after it would put the old text back.
+    rows, rounds = 8, 60
+    store.save_tasks("u", pd.DataFrame([[f"row {i} v0", False, "t", "t"] for i in range(rows)], columns=TASK_COLUMNS))
+    stop = threading.Event()
+
+    def writer(i):
+        for version in range(1, rounds + 1):
+            df = store.load_tasks("u")
+            df.iloc[i, 0] = f"row {i} v{version}"
+            store.update_tasks("u", df, [i])
+
+    def resetter():
+        while not stop.is_set():
+            store.modify_tasks("u", lambda df: df.assign(completed=False, last_updated=str(time.time())))
+            time.sleep(0.001)
+
+    background = threading.Thread(target=resetter)
+    background.start()
+    writers = [threading.Thread(target=writer, args=(i,)) for i in range(rows)]
+    for t in writers:
+        t.start()
+    for t in writers:
+        t.join()
+    stop.set()
+    background.join()
+    assert store.load_tasks("u")["task"].tolist() == [f"row {i} v{rounds}" for i in range(rows)]
+
+
+def test_one_scheduler_per_data_directory(tmp_path, monkeypatch):
+    runs = []
+    monkeypatch.setattr(planner_reset, "run_daily_reset", lambda store, **kw: runs.append(store) or {})
+    first = ResetScheduler(CSVStorage(str(tmp_path)), interval=0.02).start()
+    second = ResetScheduler(CSVStorage(str(tmp_path)), interval=0.02).start()
+    try:
+        time.sleep(0.2)
+        assert first.is_leader != second.is_leader
+        leader, follower = (first, second) if first.is_leader else (second, first)
+        assert runs and all(store is leader.store for store in runs)
+        leader.stop()
+        deadline = time.monotonic() + 2
+        while not follower.is_leader and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert follower.is_leader  # takes over once the leader is gone
+    finally:
+        first.stop()
+        second.stop()
+
+
+def test_rollover_time_and_peak_memory(tmp_path):
+    store = CSVStorage(str(tmp_path))
+    result = rollover(store, ROLLOVER_USERS, tasks=5, batch_size=500)
+    assert result["reset"] == ROLLOVER_USERS
+    # Work is streamed in batches, so memory does not grow with the user count.
+    assert result["RSS growth, scheduler (MB)"] < 100
+    assert result["peak RSS, worker (MB)"] < 400
+    assert result["ms per user"] < 50
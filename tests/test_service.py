@@ -0,0 +1,120 @@
+"""Calculator service: endpoints, keep-alive handling and the load generator."""
+
+import http.client
+import json
+import threading
+import time
+
+import pytest
+
+import service
+from calculations import ideal_body_weight
+from service import CalculatorHandler, PooledHTTPServer
+
+
+@pytest.fixture
+def serve():
+    servers = []
+
+    def start(workers=4, idle_timeout=5.0):
+        server = PooledHTTPServer(("127.0.0.1", 0), CalculatorHandler, workers=workers, idle_timeout=idle_timeout)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def post(conn, path, payload):
+    conn.request("POST", path, json.dumps(payload).encode(), {"Content-Type": "application/json"})
+    response = conn.getresponse()
+    return response, json.loads(response.read())
+
+
+def connect(server, timeout=10):
+    return http.client.HTTPConnection("127.0.0.1", server.server_address[1], timeout=timeout)
+
+
+def test_single_and_batched_items(serve):
+    conn = connect(serve())
+    expected = {"ibw_kg": round(ideal_body_weight(67, "male"), 2)}
+    response, body = post(conn, "/ibw", {"height": "5'7", "gender": "male"})
+    assert response.status == 200 and body == expected
+    response, body = post(conn, "/ibw", [{"height_in": 67, "gender": "male"}, {"height": "tall", "gender": "male"}])
+    assert response.status == 200
+    assert body[0] == expected and "error" in body[1]
+    response, body = post(conn, "/caloric-needs", {"height": "170 cm", "weight": 70, "age": 30, "gender": "x"})
+    assert response.status == 400 and "gender" in body["error"]
+
+
+def test_idle_keep_alive_connection_frees_its_worker(serve):
+    server = serve(workers=1, idle_timeout=0.3)
+    idle = connect(server)
+    post(idle, "/exercise-plan", {"goal": "Muscle Gain"})  # kept alive, then left idle
+    start = time.monotonic()
+    response, _ = post(connect(server), "/exercise-plan", {"goal": "Muscle Gain"})
+    assert response.status == 200
+    assert time.monotonic() - start < 3  # waited for the idle timeout, not forever
+
+
+def test_replies_close_the_connection_while_others_wait(serve):
+    server = serve(workers=1)
+    conn = connect(server)
+    response, _ = post(conn, "/exercise-plan", {"goal": "Muscle Gain"})
+    assert response.getheader("Connection") is None
+    server.waiting = 1  # as if another connection were queued for the worker
+    try:
+        response, _ = post(conn, "/exercise-plan", {"goal": "Muscle Gain"})
+    finally:
+        server.waiting = 0
+    assert response.getheader("Connection") == "close" and response.will_close
+
+
+def test_load_generator_reports_each_concurrency_level():
+    rows = service.bench(concurrency=(1, 4), duration=0.5, workers=2)
+    assert [row["clients"] for row in rows] == [1, 4]
+    for row in rows:
+        assert row["requests"] > 0 and row["errors"] == 0
+        assert row["p50 (ms)"] <= row["p99 (ms)"]
+
+
+def test_symptom_score_matches_the_symptom_checker(serve):
+    from symptoms import load_catalog
+
+    conn = connect(serve())
+    selected = ["vomiting", "diarrhea"]
+    response, body = post(conn, "/symptom-score", {"symptoms": selected})
+    assert response.status == 200 and body == {"symptom_score": load_catalog().score(selected).score}
+    response, body = post(conn, "/symptom-score", [{"symptoms": ["fever"]}, {"symptoms": ["fever", "gout?"]}])
+    assert "symptom_score" in body[0] and "gout?" in body[1]["error"]
+
+
+@pytest.mark.parametrize("path, item", [
+    ("/ibw", {"height_in": "nan", "gender": "male"}),
+    ("/ibw", {"height_in": "inf", "gender": "female"}),
+    ("/caloric-needs", {"height_cm": 170, "weight": "nan", "age": 30, "gender": "male"}),
+    ("/caloric-needs", {"height_cm": "inf", "weight": 70, "age": 30, "gender": "male"}),
+    ("/caloric-needs", {"height_cm": 170, "weight": 1e308, "age": 30, "gender": "male"}),
+])
+def test_non_finite_numbers_fail_only_their_item(serve, path, item):
+    conn = connect(serve())
+    valid = {"height_in": 67, "height_cm": 170, "weight": 70, "age": 30, "gender": "male"}
+    response, body = post(conn, path, [item, valid])
+    assert response.status == 200
+    assert "finite" in body[0]["error"] and "error" not in body[1]
+    response, body = post(conn, path, item)
+    assert response.status == 400 and "finite" in body["error"]
+
+
+def test_scorer_failure_returns_500(serve, monkeypatch):
+    server = serve()
+
+    def broken(items):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(server.batchers["/exercise-plan"], "scorer", broken)
+    response, body = post(connect(server), "/exercise-plan", {"goal": "Muscle Gain"})
+    assert response.status == 500 and body == {"error": "internal error"}
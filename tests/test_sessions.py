@@ -0,0 +1,70 @@
+"""Session stores: signed tokens and expiry counted from the last use."""
+
+import time
+
+import pytest
+
+import sessions
+from sessions import MemorySessionStore, SQLiteSessionStore, new_session_id
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def make_store(request, tmp_path):
+    def make(max_idle):
+        if request.param == "memory":
+            return MemorySessionStore(max_idle=max_idle)
+        return SQLiteSessionStore(str(tmp_path / "sessions.db"), max_idle=max_idle, cache_seconds=0)
+    return make
+
+
+def test_tokens_round_trip_and_reject_forgeries(make_store):
+    store = make_store(60)
+    sid, other = new_session_id(), new_session_id()
+    token = store.sign(sid)
+    assert store.verify(token) == sid
+    assert store.verify(other + token[token.index("."):]) is None
+    assert store.verify(None) is None
+
+
+def test_loading_a_session_keeps_it_alive(make_store):
+    store = make_store(0.4)
+    sid = new_session_id()
+    store.save(sid, {"logged_in": True, "username": "ann"})
+    for _ in range(4):  # 0.8 s in all, twice max_idle, but never idle that long
+        time.sleep(0.2)
+        assert store.load(sid) == {"logged_in": True, "username": "ann"}
+    time.sleep(0.6)
+    assert store.load(sid) is None
+
+
+def test_expired_sessions_are_pruned_on_save(make_store):
+    store = make_store(0.2)
+    store.prune_interval = 0.1
+    old = new_session_id()
+    store.save(old, {"exercise_score": 25})
+    time.sleep(0.3)
+    store.save(new_session_id(), {"exercise_score": 25})
+    if isinstance(store, MemorySessionStore):
+        assert old not in store._sessions
+    else:
+        with store._conn() as conn:
+            assert conn.execute("SELECT COUNT(*) FROM sessions WHERE sid = ?", (old,)).fetchone()[0] == 0
+
+
+# Bounds for the multi-process check: generous for a loaded one-CPU machine,
+# and still far below a Streamlit rerun.
+UNCACHED_P50_US = 2_000
+UNCACHED_P99_US = 50_000
+CACHED_MEAN_US = 100
+
+
+def test_worker_processes_share_state():
+    # Four processes each own a slice of the sessions, rewrite it every round
+    # and read everyone else's; sessions.check counts inconsistent reads.
+    result = sessions.check(workers=4, sessions=100, rounds=10)
+    assert result["mismatches"] == 0
+    assert result["stale after run"] == 0
+    assert not result["forged token accepted"]
+    assert result["uncached load p50 (us)"] < UNCACHED_P50_US
+    assert result["uncached load p99 (us)"] < UNCACHED_P99_US
+    assert result["cached load mean (us)"] < CACHED_MEAN_US
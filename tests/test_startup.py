@@ -0,0 +1,56 @@
+"""Cold-start budget: the calculator pages must not load the heavy libraries."""
+
+import json
+import os
+import subprocess
+import sys
+
+import bench
+
+HEAVY = ("pandas", "numpy", "matplotlib")
+ROOT = os.path.dirname(bench.APP)
+
+# Generous enough for a slow CI machine; a regression that drags pandas or
+# matplotlib back into startup costs far more than the headroom.
+APP_IMPORT_BUDGET_S = 0.25
+TOTAL_IMPORT_BUDGET_S = 3.0
+FIRST_PAINT_BUDGET_S = 10.0
+
+
+def run_python(code, cwd):
+    proc = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, cwd=cwd,
+                          env=dict(os.environ, HEALTH_CALC_DATA_DIR=str(cwd)), timeout=120)
+    assert proc.returncode == 0, proc.stderr
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def test_module_level_imports_skip_heavy_libraries(tmp_path):
+    result = run_python(f"""
+import json, sys, time
+sys.path.insert(0, {ROOT!r})
+start = time.perf_counter()
+import streamlit
+third_party = time.perf_counter() - start
+exec({bench.app_imports()!r}, {{}})
+total = time.perf_counter() - start
+print(json.dumps({{"total": total, "app": total - third_party,
+                   "loaded": [m for m in {HEAVY!r} if m in sys.modules]}}))
+""", tmp_path)
+    assert result["loaded"] == []
+    assert result["app"] < APP_IMPORT_BUDGET_S
+    assert result["total"] < TOTAL_IMPORT_BUDGET_S
+
+
+def test_first_paint_skips_heavy_libraries(tmp_path):
+    result = run_python(f"""
+import json, sys, time
+from streamlit.testing.v1 import AppTest
+start = time.perf_counter()
+at = AppTest.from_file({bench.APP!r}, default_timeout=60)
+at.run()
+print(json.dumps({{"seconds": time.perf_counter() - start, "errors": [str(e.value) for e in at.exception],
+                   "loaded": [m for m in {HEAVY!r} if m in sys.modules]}}))
+""", tmp_path)
+    assert result["errors"] == []
+    assert result["loaded"] == []
+    assert result["seconds"] < FIRST_PAINT_BUDGET_S
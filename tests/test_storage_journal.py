@@ -0,0 +1,136 @@
+"""Row-level planner writes: journal append, replay and compaction."""
+
+import os
+
+import pandas as pd
+import pytest
+
+import storage
+from storage import TASK_COLUMNS, CSVStorage, SQLiteStorage
+
+
+def planner(n):
+    return pd.DataFrame(
+        [[f"Task {i}", False, "2026-01-01T08:00:00", "2026-01-01T08:00:00"] for i in range(n)],
+        columns=TASK_COLUMNS,
+    )
+
+
+def toggle(store, username, pos, when="2026-01-02T09:00:00"):
+    df = store.load_tasks(username)
+    df.loc[pos, "completed"] = not df.loc[pos, "completed"]
+    df.loc[pos, "last_updated"] = when
+    store.update_tasks(username, df, [pos])
+    return df
+
+
+def files_written(root):
+    return {name: os.stat(os.path.join(root, name)) for name in os.listdir(root)}
+
+
+@pytest.mark.parametrize("tasks", [10, 1000])
+def test_toggle_writes_one_journal_line(tmp_path, tasks):
+    store = CSVStorage(str(tmp_path))
+    store.save_tasks("ann", planner(tasks))
+    before = files_written(tmp_path)
+
+    toggle(store, "ann", tasks // 2)
+
+    after = files_written(tmp_path)
+    planner_csv = "planner_ann.csv"
+    assert (after[planner_csv].st_mtime_ns, after[planner_csv].st_size) == \
+        (before[planner_csv].st_mtime_ns, before[planner_csv].st_size)
+    written = sum(st.st_size for st in after.values()) - sum(st.st_size for st in before.values())
+    assert written == after["planner_ann.journal"].st_size
+    # One interaction costs one small line, however long the planner is.
+    assert written < 200
+
+
+def test_bytes_per_interaction_do_not_grow(tmp_path):
+    store = CSVStorage(str(tmp_path))
+    store.save_tasks("ann", planner(200))
+    journal = store.journal_file("ann")
+    sizes = []
+    for i in range(20):
+        before = os.path.getsize(journal) if os.path.exists(journal) else 0
+        toggle(store, "ann", i)
+        sizes.append(os.path.getsize(journal) - before)
+    assert max(sizes) - min(sizes) <= 4  # only the row number's width varies
+
+
+def test_replay_applies_last_entry_per_row(tmp_path):
+    store = CSVStorage(str(tmp_path))
+    store.save_tasks("ann", planner(5))
+    toggle(store, "ann", 1, "2026-01-02T09:00:00")
+    toggle(store, "ann", 3, "2026-01-02T10:00:00")
+    toggle(store, "ann", 1, "2026-01-02T11:00:00")  # back to not completed
+    with open(store.journal_file("ann"), "a", encoding="utf-8") as f:
+        # A row past the end of the planner (e.g. after a shorter save) is ignored.
+        f.write('{"row": 99, "task": "x", "completed": true, "timestamp": null, "last_updated": null}\n')
+
+    df = CSVStorage(str(tmp_path)).load_tasks("ann")  # fresh instance: no cache
+    assert len(df) == 5
+    assert df["completed"].tolist() == [False, False, False, True, False]
+    assert df.loc[1, "last_updated"] == "2026-01-02T11:00:00"
+    assert df.loc[3, "last_updated"] == "2026-01-02T10:00:00"
+
+
+def test_replay_into_empty_column(tmp_path):
+    store = CSVStorage(str(tmp_path))
+    df = planner(2)
+    df["last_updated"] = None
+    store.save_tasks("ann", df)
+    df = store.load_tasks("ann")
+    df["last_updated"] = df["last_updated"].astype(object)
+    df.loc[0, "last_updated"] = "2026-01-02T09:00:00"
+    store.update_tasks("ann", df, [0])
+    assert store.load_tasks("ann").loc[0, "last_updated"] == "2026-01-02T09:00:00"
+
+
+def test_journal_is_compacted(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, "JOURNAL_COMPACT_BYTES", 1000)
+    store = CSVStorage(str(tmp_path))
+    store.save_tasks("ann", planner(20))
+    journal = store.journal_file("ann")
+    for i in range(20):
+        toggle(store, "ann", i)
+        assert not os.path.exists(journal) or os.path.getsize(journal) <= 1000 + 200
+
+    assert all(CSVStorage(str(tmp_path)).load_tasks("ann")["completed"])
+    # Compaction folded the journal into the CSV at least once.
+    on_disk = pd.read_csv(store.planner_file("ann"))
+    assert on_disk["completed"].sum() > 0
+
+
+def test_save_discards_journal(tmp_path):
+    store = CSVStorage(str(tmp_path))
+    store.save_tasks("ann", planner(3))
+    toggle(store, "ann", 0)
+    store.save_tasks("ann", planner(4))
+    assert not os.path.exists(store.journal_file("ann"))
+    assert not store.load_tasks("ann")["completed"].any()
+
+
+def test_first_update_without_planner_saves(tmp_path):
+    store = CSVStorage(str(tmp_path))
+    store.update_tasks("ann", planner(2), [0])
+    assert len(store.load_tasks("ann")) == 2
+    assert not os.path.exists(store.journal_file("ann"))
+
+
+def test_add_badges_appends(tmp_path):
+    store = CSVStorage(str(tmp_path))
+    store.add_badges("ann", [("🏅 Week 1 Champ", "2026-01-01")])
+    size = os.path.getsize(store.badges_file("ann"))
+    store.add_badges("ann", [("🔥 Week Streak", "2026-01-02")])
+    assert os.path.getsize(store.badges_file("ann")) - size == len("🔥 Week Streak,2026-01-02\n".encode())
+    assert store.load_badges("ann")["badge"].tolist() == ["🏅 Week 1 Champ", "🔥 Week Streak"]
+
+
+@pytest.mark.parametrize("backend", ["csv", "sqlite"])
+def test_backends_agree_after_updates(tmp_path, backend):
+    store = CSVStorage(str(tmp_path)) if backend == "csv" else SQLiteStorage(str(tmp_path / "db.sqlite"))
+    store.save_tasks("ann", planner(6))
+    for pos in (0, 2, 2, 5):
+        toggle(store, "ann", pos)
+    assert store.load_tasks("ann")["completed"].tolist() == [True, False, False, False, False, True]
@@ -0,0 +1,56 @@
+"""Symptom Checker page: the selection survives reruns and tool switches."""
+
+import pytest
+from streamlit.testing.v1 import AppTest
+
+import bench
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("HEALTH_CALC_DATA_DIR", str(tmp_path))
+    monkeypatch.setenv("HEALTH_CALC_RESET_INTERVAL", "0")
+    monkeypatch.setenv("HEALTH_CALC_CHART_PREWARM", "0")
+    at = AppTest.from_file(bench.APP, default_timeout=60)
+    at.run()
+    return at
+
+
+def choose(at, tool):
+    next(box for box in at.sidebar.selectbox if box.label == "Choose a tool").select(tool).run()
+    assert not at.exception
+
+
+def picker(at):
+    return next(m for m in at.multiselect if m.label == "Select symptoms")
+
+
+def test_consecutive_picks_are_all_kept(app):
+    choose(app, "Symptom Checker")
+    for symptom in ("fever", "cold", "nausea"):
+        picker(app).select(symptom).run()
+    assert picker(app).value == ["fever", "cold", "nausea"]
+
+    next(t for t in app.text_input if t.label.startswith("Search symptoms")).input("head").run()
+    picker(app).select("headache").run()
+    assert picker(app).value == ["fever", "cold", "nausea", "headache"]
+
+    choose(app, "📊 Health Charts")
+    choose(app, "Symptom Checker")
+    assert picker(app).value == ["fever", "cold", "nausea", "headache"]
+
+
+def test_session_link_restores_scores_but_not_the_login(app, tmp_path):
+    app.session_state["logged_in"] = True
+    app.session_state["username"] = "ann"
+    choose(app, "Symptom Checker")
+    picker(app).select("fever").run()
+    token = app.query_params["session"]
+
+    shared = AppTest.from_file(bench.APP, default_timeout=60)
+    shared.query_params["session"] = token
+    shared.run()
+    assert not shared.exception
+    assert shared.session_state["selected_symptoms"] == ["fever"]
+    assert shared.session_state["logged_in"] is False and shared.session_state["username"] == ""